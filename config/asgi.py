@@ -13,4 +13,6 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
+# Em produção, com workers assíncronos (endpoints em /api/assincrono/):
+#   uvicorn config.asgi:application --host 0.0.0.0 --port $PORT --workers 2
 application = get_asgi_application()
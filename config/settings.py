@@ -42,7 +42,10 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     # Adicionado middleware do Whitenoise logo após o de segurança
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # (versão que também funciona no modo assíncrono, veja core/middleware.py)
+    'core.middleware.WhiteNoiseAssincronoMiddleware',
+    # Métricas por rota em /api/metrics/; só age com METRICAS_ATIVAS=true.
+    'core.metricas.MetricasMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -93,6 +96,110 @@ else:
     }
 
 
+# --- DJANGO REST FRAMEWORK ---
+REST_FRAMEWORK = {
+    # Filtros declarados em cada ViewSet pelo atributo 'filtros' (core/filters.py).
+    'DEFAULT_FILTER_BACKENDS': ['core.filters.FiltroDeclarativoBackend'],
+    # Paginação por cursor em todas as listas; o cliente pode pedir outro
+    # tamanho com '?page_size=' (até o máximo definido em core/pagination.py).
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.PaginacaoKeyset',
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', 50)),
+}
+
+
+# --- CACHE ---
+# Tempo (em segundos) que os indicadores do Dashboard ficam em cache.
+# Qualquer escrita nos modelos do app 'core' invalida o cache antes disso.
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', 60))
+
+# Cache das respostas de listas e detalhes da API (core/cache_respostas.py).
+# RESPOSTAS_CACHE_URL escolhe o backend:
+#   locmem://            memória do processo, com descarte LRU (padrão)
+#   file:///caminho      arquivos em disco, compartilhados entre processos
+#   redis://host:6379/0  Redis ou compatível (requer o pacote 'redis')
+#   dummy://             desliga o cache
+RESPOSTAS_CACHE_URL = os.environ.get('RESPOSTAS_CACHE_URL', 'locmem://')
+RESPOSTAS_CACHE_TIMEOUT = int(os.environ.get('RESPOSTAS_CACHE_TIMEOUT', 300))
+RESPOSTAS_CACHE_MAX_ENTRIES = int(os.environ.get('RESPOSTAS_CACHE_MAX_ENTRIES', 1000))
+
+# --- MÉTRICAS ---
+# Instrumentação das requisições exposta em /api/metrics/ (core/metricas.py).
+# Desligada por padrão. METRICAS_AMOSTRAGEM é a fração das requisições que
+# mede banco/consultas/serialização (ex.: 0.05 em produção); as demais só
+# contam e medem o tempo total. Com vários workers, METRICAS_CACHE_URL deve
+# ser compartilhado (file:// ou redis://) para somar todos os processos.
+# /api/metrics/ exige 'Authorization: Bearer <METRICAS_TOKEN>'; sem token, responde 403.
+METRICAS_ATIVAS = os.environ.get('METRICAS_ATIVAS', 'False').lower() == 'true'
+METRICAS_AMOSTRAGEM = float(os.environ.get('METRICAS_AMOSTRAGEM', 1.0))
+METRICAS_CACHE_URL = os.environ.get('METRICAS_CACHE_URL', 'locmem://')
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN', '')
+
+_BACKENDS_CACHE = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'rediss': 'django.core.cache.backends.redis.RedisCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def _cache_da_url(url, local_padrao, timeout=None, max_entries=None):
+    esquema, _, local = url.partition('://')
+    return {
+        'BACKEND': _BACKENDS_CACHE[esquema],
+        'LOCATION': url if esquema.startswith('redis') else (local or local_padrao),
+        'TIMEOUT': timeout,
+        # Limite de entradas (com descarte LRU na memória) para locmem e arquivo.
+        'OPTIONS': {} if esquema.startswith('redis') or max_entries is None else {'MAX_ENTRIES': max_entries},
+    }
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'respostas': _cache_da_url(
+        RESPOSTAS_CACHE_URL, 'respostas', timeout=RESPOSTAS_CACHE_TIMEOUT, max_entries=RESPOSTAS_CACHE_MAX_ENTRIES
+    ),
+    'metricas': _cache_da_url(METRICAS_CACHE_URL, 'metricas'),
+}
+
+# --- COBRANÇAS ---
+# Usados pelo comando 'atualizar_atrasos' (core/cobrancas.py).
+MULTA_ATRASO_PERCENTUAL = os.environ.get('MULTA_ATRASO_PERCENTUAL', '2')
+JUROS_MES_PERCENTUAL = os.environ.get('JUROS_MES_PERCENTUAL', '1')
+CARENCIA_ATRASO_DIAS = int(os.environ.get('CARENCIA_ATRASO_DIAS', 0))
+
+# --- EXTRATOS DE REPASSE ---
+# Percentual da administradora sobre o recebido (core/extratos.py). Depois de
+# alterar, rode 'python manage.py recalcular_resumos --apenas extratos'.
+TAXA_ADMINISTRACAO_PERCENTUAL = os.environ.get('TAXA_ADMINISTRACAO_PERCENTUAL', '10')
+
+# --- ARQUIVOS (DOCUMENTOS E COMPROVANTES) ---
+# Armazenamento dos arquivos enviados (core/armazenamento.py, core/arquivos.py).
+# ARQUIVOS_ENVIO_SERVIDOR entrega os downloads pelo servidor web em vez do
+# Python: 'x-sendfile' (Apache/lighttpd) ou 'x-accel-redirect' (nginx, com
+# uma location 'internal' em ARQUIVOS_PREFIXO_INTERNO apontando para a raiz).
+ARQUIVOS_BACKEND = os.environ.get('ARQUIVOS_BACKEND', 'core.armazenamento.ArmazenamentoLocal')
+ARQUIVOS_RAIZ = os.environ.get('ARQUIVOS_RAIZ', str(BASE_DIR / 'arquivos'))
+ARQUIVOS_TAMANHO_MAXIMO = int(os.environ.get('ARQUIVOS_TAMANHO_MAXIMO', 200 * 1024 * 1024))
+ARQUIVOS_ENVIO_SERVIDOR = os.environ.get('ARQUIVOS_ENVIO_SERVIDOR', '')
+ARQUIVOS_PREFIXO_INTERNO = os.environ.get('ARQUIVOS_PREFIXO_INTERNO', '/arquivos-internos/')
+# Envios parados há mais tempo que isso são apagados por 'limpar_arquivos'.
+ARQUIVOS_VALIDADE_ENVIO_HORAS = int(os.environ.get('ARQUIVOS_VALIDADE_ENVIO_HORAS', 48))
+
+# --- FOTOS DOS IMÓVEIS ---
+# Miniaturas e versões para a web são geradas fora da requisição
+# (core/fotos.py) por FOTOS_WORKERS threads em cada processo da aplicação.
+# Com 0, as fotos ficam na fila para o comando 'processar_fotos'.
+FOTOS_WORKERS = int(os.environ.get('FOTOS_WORKERS', 2))
+# Uma foto 'Processando' há mais tempo que isso (worker que caiu) volta à fila.
+FOTOS_PROCESSAMENTO_EXPIRA_MINUTOS = int(os.environ.get('FOTOS_PROCESSAMENTO_EXPIRA_MINUTOS', 10))
+FOTOS_TENTATIVAS_MAXIMAS = int(os.environ.get('FOTOS_TENTATIVAS_MAXIMAS', 3))
+# Espera antes de uma nova tentativa no pool; dobra a cada tentativa.
+FOTOS_ESPERA_NOVA_TENTATIVA_SEGUNDOS = float(os.environ.get('FOTOS_ESPERA_NOVA_TENTATIVA_SEGUNDOS', 30))
+
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
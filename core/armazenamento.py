@@ -0,0 +1,139 @@
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Backend de armazenamento dos arquivos (settings.ARQUIVOS_BACKEND). O padrão
+# é o disco local, com esta organização sob ARQUIVOS_RAIZ:
+#
+#   envios/<chave>                 upload em andamento (uma parte após a outra)
+#   conteudo/ab/cd/<sha256>        conteúdo concluído, endereçado pelo hash
+#   derivados/ab/cd/<sha256>/...   versões geradas a partir do conteúdo (ex.:
+#                                  miniaturas das fotos, core/fotos.py)
+#
+# Os dois diretórios ficam no mesmo sistema de arquivos, então concluir um
+# envio é só renomear o arquivo (os.replace, atômico). Tudo é lido e gravado
+# em blocos de TAMANHO_BLOCO: nenhum arquivo passa inteiro pela memória.
+#
+# Outro backend (ex.: um bucket) precisa oferecer os mesmos métodos; quem usa
+# o armazenamento é core/arquivos.py.
+# -----------------------------------------------------------------------------
+
+TAMANHO_BLOCO = 64 * 1024
+
+
+class ArmazenamentoLocal:
+    """Arquivos no disco local, sob 'raiz' (padrão: settings.ARQUIVOS_RAIZ)."""
+
+    def __init__(self, raiz=None):
+        self.raiz = Path(raiz or settings.ARQUIVOS_RAIZ)
+
+    def caminho_relativo(self, sha256):
+        return f'conteudo/{sha256[:2]}/{sha256[2:4]}/{sha256}'
+
+    def caminho(self, relativo):
+        return self.raiz / relativo
+
+    def caminho_conteudo(self, sha256):
+        return self.caminho(self.caminho_relativo(sha256))
+
+    def _caminho_envio(self, chave):
+        return self.raiz / 'envios' / str(chave)
+
+    # --- Envios ---
+
+    def gravar_parte(self, chave, inicio, fluxo, limite):
+        """
+        Grava até 'limite' bytes lidos de 'fluxo' a partir da posição 'inicio'
+        do envio e devolve quantos foram gravados. O que houver depois de
+        'inicio' (resto de uma parte interrompida) é descartado antes.
+        """
+        caminho = self._caminho_envio(chave)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        gravados = 0
+        with open(caminho, 'r+b' if caminho.exists() else 'wb') as destino:
+            destino.seek(inicio)
+            destino.truncate()
+            while gravados < limite:
+                bloco = fluxo.read(min(TAMANHO_BLOCO, limite - gravados))
+                if not bloco:
+                    break
+                destino.write(bloco)
+                gravados += len(bloco)
+        return gravados
+
+    def hash_do_envio(self, chave):
+        """SHA-256 do envio, lido em blocos."""
+        sha = hashlib.sha256()
+        with open(self._caminho_envio(chave), 'rb') as origem:
+            for bloco in iter(lambda: origem.read(TAMANHO_BLOCO), b''):
+                sha.update(bloco)
+        return sha.hexdigest()
+
+    def guardar(self, chave, sha256):
+        """
+        Move o envio concluído para o conteúdo endereçado por 'sha256'. Se esse
+        conteúdo já existe, o envio é só descartado (deduplicação).
+        """
+        origem = self._caminho_envio(chave)
+        destino = self.caminho_conteudo(sha256)
+        if destino.exists():
+            origem.unlink(missing_ok=True)
+            return
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(origem, destino)
+
+    def excluir_envio(self, chave):
+        self._caminho_envio(chave).unlink(missing_ok=True)
+
+    # --- Conteúdo ---
+
+    def abrir(self, sha256):
+        return open(self.caminho_conteudo(sha256), 'rb')
+
+    def excluir(self, sha256):
+        self.caminho_conteudo(sha256).unlink(missing_ok=True)
+        shutil.rmtree(self.raiz / self._pasta_derivados(sha256), ignore_errors=True)
+
+    # --- Derivados ---
+
+    def _pasta_derivados(self, sha256):
+        return f'derivados/{sha256[:2]}/{sha256[2:4]}/{sha256}'
+
+    def caminho_relativo_derivado(self, sha256, nome):
+        return f'{self._pasta_derivados(sha256)}/{nome}'
+
+    def existe_derivado(self, sha256, nome):
+        return self.caminho(self.caminho_relativo_derivado(sha256, nome)).exists()
+
+    def gravar_derivado(self, sha256, nome, dados):
+        """
+        Grava um derivado do conteúdo 'sha256'. Escreve num arquivo temporário
+        e renomeia: quem lê nunca vê um derivado pela metade.
+        """
+        destino = self.caminho(self.caminho_relativo_derivado(sha256, nome))
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        temporario = destino.with_name(f'.{nome}.{uuid.uuid4().hex}')
+        temporario.write_bytes(dados)
+        os.replace(temporario, destino)
+
+    def abrir_derivado(self, sha256, nome):
+        return open(self.caminho(self.caminho_relativo_derivado(sha256, nome)), 'rb')
+
+    def tamanho_derivado(self, sha256, nome):
+        """Tamanho em bytes do derivado, ou None se ele ainda não foi gerado."""
+        try:
+            return self.caminho(self.caminho_relativo_derivado(sha256, nome)).stat().st_size
+        except FileNotFoundError:
+            return None
+
+
+def armazenamento():
+    """O backend configurado em settings.ARQUIVOS_BACKEND."""
+    return import_string(settings.ARQUIVOS_BACKEND)()
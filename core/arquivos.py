@@ -0,0 +1,319 @@
+import mimetypes
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import ProtectedError
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header, quote_etag
+from rest_framework.negotiation import DefaultContentNegotiation
+
+from .armazenamento import TAMANHO_BLOCO, armazenamento
+from .condicional import mesmo_etag, nao_modificado
+from .models import Arquivo, Documento, EnvioArquivo, FotoImovel, Pagamento
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Armazenamento de documentos e comprovantes: upload em partes retomável,
+# deduplicação pelo hash do conteúdo e download em streaming.
+#
+# Upload (API em core/views.py):
+#   1. POST /api/arquivos/envios/ {"nome", "tamanho", "tipo_conteudo"} cria o
+#      envio e devolve a 'chave';
+#   2. PUT /api/arquivos/envios/<chave>/ com o corpo cru da parte e o
+#      cabeçalho 'Content-Range: bytes <início>-<fim>/<tamanho>'. O corpo vai
+#      direto para o disco, em blocos; a parte precisa começar exatamente em
+#      'recebido' (senão 409, com o 'recebido' atual);
+#   3. se a conexão cair, GET /api/arquivos/envios/<chave>/ informa até onde
+#      o arquivo chegou, e o cliente continua dali.
+# Quando a última parte chega, o hash SHA-256 é calculado (uma leitura do
+# disco) e o envio vira um Arquivo. Se o mesmo conteúdo já foi enviado antes,
+# o Arquivo existente é reaproveitado e a cópia nova é descartada: o PDF de
+# um contrato anexado a dez documentos ocupa o disco uma vez.
+#
+# Download: GET /api/arquivos/<id>/conteudo/ (ou documentos/<id>/arquivo/,
+# pagamentos/<id>/comprovante/). O ETag é o próprio hash (o conteúdo nunca
+# muda), há suporte a 'Range' / 'If-Range' (206, 416) e, com
+# settings.ARQUIVOS_ENVIO_SERVIDOR, o arquivo é entregue pelo servidor web
+# (X-Sendfile ou X-Accel-Redirect) sem passar pelo Python.
+#
+# O tipo do arquivo é o que o cliente declarou no envio, então não é
+# confiável: só PDF e imagens PNG/JPEG/WebP são exibidos no navegador
+# ('inline'). Qualquer outro tipo (HTML, SVG...) sai como
+# application/octet-stream e 'attachment', e toda resposta leva
+# 'Content-Security-Policy: sandbox', para que nada enviado por um usuário
+# rode scripts na origem da API.
+#
+# Arquivos sem documentos, pagamentos ou fotos (core/fotos.py) e envios
+# abandonados são apagados pelo comando 'limpar_arquivos'.
+# -----------------------------------------------------------------------------
+
+TIPO_PADRAO = 'application/octet-stream'
+TIPOS_EM_LINHA = frozenset({'application/pdf', 'image/png', 'image/jpeg', 'image/webp'})
+# O conteúdo de um Arquivo nunca muda: o navegador pode guardá-lo por um ano.
+CACHE_CONTROL_CONTEUDO = 'private, max-age=31536000, immutable'
+
+RE_CONTENT_RANGE = re.compile(r'bytes (\d+)-(\d+)/(\d+)')
+RE_RANGE = re.compile(r'bytes=(\d*)-(\d*)')
+
+
+class ConflitoEnvio(Exception):
+    """A parte não começa onde o envio parou (ou o envio já foi concluído)."""
+
+    def __init__(self, mensagem, envio):
+        super().__init__(mensagem)
+        self.envio = envio
+
+
+class SemNegociacao(DefaultContentNegotiation):
+    """Downloads respondem com o tipo do arquivo, qualquer que seja o 'Accept'."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+# --- Upload ---
+
+def dados_do_arquivo(arquivo):
+    return {
+        'id': arquivo.pk, 'nome': arquivo.nome, 'sha256': arquivo.sha256, 'tamanho': arquivo.tamanho,
+        'tipo_conteudo': arquivo.tipo_conteudo, 'url': f'/api/arquivos/{arquivo.pk}/conteudo/',
+    }
+
+
+def dados_do_envio(envio):
+    dados = {
+        'chave': str(envio.chave), 'nome': envio.nome, 'tamanho': envio.tamanho,
+        'recebido': envio.recebido, 'status': envio.status,
+    }
+    if envio.arquivo_id:
+        dados['arquivo'] = dados_do_arquivo(envio.arquivo)
+    return dados
+
+
+def iniciar_envio(nome, tamanho, tipo_conteudo=None):
+    """Cria um envio; ValueError se os dados forem inválidos."""
+    nome = (nome or '').strip()[:255]
+    if not nome:
+        raise ValueError("Informe o 'nome' do arquivo.")
+    try:
+        tamanho = int(tamanho)
+    except (TypeError, ValueError):
+        raise ValueError("Informe o 'tamanho' do arquivo em bytes.")
+    if tamanho <= 0 or tamanho > settings.ARQUIVOS_TAMANHO_MAXIMO:
+        raise ValueError(f'O tamanho deve estar entre 1 e {settings.ARQUIVOS_TAMANHO_MAXIMO} bytes.')
+    tipo = (tipo_conteudo or mimetypes.guess_type(nome)[0] or TIPO_PADRAO)[:100]
+    return EnvioArquivo.objects.create(nome=nome, tamanho=tamanho, tipo_conteudo=tipo)
+
+
+def interpretar_content_range(cabecalho, envio, tamanho_corpo):
+    """(início, quantidade) da parte enviada; ValueError se o cabeçalho não fecha."""
+    if not cabecalho:
+        # Sem Content-Range: o corpo continua de onde o envio parou.
+        return envio.recebido, tamanho_corpo
+    encontrado = RE_CONTENT_RANGE.fullmatch(cabecalho.strip())
+    if not encontrado:
+        raise ValueError("Use 'Content-Range: bytes <início>-<fim>/<tamanho>'.")
+    inicio, fim, total = (int(valor) for valor in encontrado.groups())
+    if total != envio.tamanho or fim < inicio or fim >= total:
+        raise ValueError(f'Intervalo inválido para um arquivo de {envio.tamanho} bytes.')
+    if fim - inicio + 1 != tamanho_corpo:
+        raise ValueError('O tamanho do corpo não confere com o Content-Range.')
+    return inicio, tamanho_corpo
+
+
+def receber_parte(envio, inicio, quantidade, fluxo):
+    """
+    Grava a parte [inicio, inicio + quantidade) lida de 'fluxo'. Conclui o
+    envio quando ele chega ao tamanho total. Devolve o envio atualizado.
+    """
+    if envio.status != 'Em Andamento':
+        raise ConflitoEnvio('O envio já foi concluído.', envio)
+    if inicio != envio.recebido:
+        raise ConflitoEnvio(f'A próxima parte deve começar no byte {envio.recebido}.', envio)
+    if inicio + quantidade > envio.tamanho:
+        raise ValueError(f'A parte passa do tamanho declarado ({envio.tamanho} bytes).')
+
+    gravados = armazenamento().gravar_parte(envio.chave, inicio, fluxo, quantidade)
+    # Só avança se ninguém gravou outra parte no mesmo ponto enquanto isso.
+    avancou = EnvioArquivo.objects.filter(pk=envio.pk, status='Em Andamento', recebido=inicio).update(
+        recebido=inicio + gravados, atualizado_em=timezone.now()
+    )
+    envio.refresh_from_db()
+    if not avancou:
+        raise ConflitoEnvio(f'A próxima parte deve começar no byte {envio.recebido}.', envio)
+    if envio.recebido == envio.tamanho:
+        concluir_envio(envio)
+    return envio
+
+
+def concluir_envio(envio):
+    """Transforma o envio completo em um Arquivo (novo ou um já existente)."""
+    backend = armazenamento()
+    sha256 = backend.hash_do_envio(envio.chave)
+    # Se outro envio com o mesmo conteúdo terminar ao mesmo tempo, o
+    # get_or_create acaba encontrando o Arquivo criado por ele.
+    arquivo, _ = Arquivo.objects.get_or_create(sha256=sha256, defaults={
+        'tamanho': envio.tamanho, 'tipo_conteudo': envio.tipo_conteudo, 'nome': envio.nome,
+    })
+    # Move (ou descarta, se o conteúdo já existe) só depois de gravar o registro.
+    backend.guardar(envio.chave, sha256)
+    EnvioArquivo.objects.filter(pk=envio.pk).update(status='Concluído', arquivo=arquivo, atualizado_em=timezone.now())
+    envio.status, envio.arquivo = 'Concluído', arquivo
+    return arquivo
+
+
+def guardar_upload(enviado):
+    """
+    Guarda um arquivo recebido de uma vez (multipart, request.FILES) pelo
+    mesmo caminho dos envios em partes e devolve o Arquivo.
+    """
+    envio = iniciar_envio(enviado.name, enviado.size, enviado.content_type)
+    enviado.seek(0)
+    receber_parte(envio, 0, envio.tamanho, enviado)
+    return envio.arquivo
+
+
+def cancelar_envio(envio):
+    armazenamento().excluir_envio(envio.chave)
+    envio.delete()
+
+
+# --- Download ---
+
+def intervalo_pedido(cabecalho, tamanho):
+    """
+    (início, fim) pedidos no cabeçalho 'Range', ou None para o arquivo todo
+    (sem Range, ou num formato que não atendemos, como vários intervalos).
+    ValueError se o intervalo está fora do arquivo (resposta 416).
+    """
+    encontrado = RE_RANGE.fullmatch((cabecalho or '').strip())
+    if not encontrado or not any(encontrado.groups()):
+        return None
+    inicio, fim = encontrado.groups()
+    if not inicio:
+        # 'bytes=-500': os últimos 500 bytes.
+        if int(fim) == 0:
+            raise ValueError('Intervalo vazio.')
+        return max(tamanho - int(fim), 0), tamanho - 1
+    inicio = int(inicio)
+    fim = min(int(fim), tamanho - 1) if fim else tamanho - 1
+    if inicio >= tamanho:
+        raise ValueError('Intervalo fora do arquivo.')
+    return (inicio, fim) if fim >= inicio else None
+
+
+def _ler_intervalo(abrir, inicio, fim):
+    with abrir() as origem:
+        origem.seek(inicio)
+        restante = fim - inicio + 1
+        while restante > 0:
+            bloco = origem.read(min(TAMANHO_BLOCO, restante))
+            if not bloco:
+                break
+            restante -= len(bloco)
+            yield bloco
+
+
+def resposta_conteudo(request, backend, relativo, abrir, etag, tamanho, tipo_conteudo, cabecalhos=None):
+    """
+    Resposta HTTP com um conteúdo imutável do armazenamento (inteiro, parcial
+    ou 304). 'relativo' é o caminho dentro da raiz (para o servidor web) e
+    'abrir' devolve o arquivo aberto para leitura.
+    """
+    etag = quote_etag(etag)
+    cabecalhos = {
+        'ETag': etag,
+        'Cache-Control': CACHE_CONTROL_CONTEUDO,
+        'Accept-Ranges': 'bytes',
+        'Content-Security-Policy': 'sandbox',
+        'X-Content-Type-Options': 'nosniff',
+        **(cabecalhos or {}),
+    }
+    if nao_modificado(request, etag, None):
+        return HttpResponse(status=304, headers=cabecalhos)
+
+    servidor = settings.ARQUIVOS_ENVIO_SERVIDOR.lower()
+    if servidor:
+        # O servidor web entrega o arquivo (e trata o Range) sozinho.
+        if servidor == 'x-accel-redirect':
+            cabecalhos['X-Accel-Redirect'] = settings.ARQUIVOS_PREFIXO_INTERNO + relativo
+        else:
+            cabecalhos['X-Sendfile'] = str(backend.caminho(relativo))
+        return HttpResponse(content_type=tipo_conteudo, headers=cabecalhos)
+
+    intervalo = None
+    if_range = request.headers.get('If-Range')
+    # If-Range com outra versão: responde o arquivo inteiro.
+    if 'Range' in request.headers and (not if_range or mesmo_etag(etag, if_range)):
+        try:
+            intervalo = intervalo_pedido(request.headers['Range'], tamanho)
+        except ValueError:
+            cabecalhos['Content-Range'] = f'bytes */{tamanho}'
+            return HttpResponse(status=416, headers=cabecalhos)
+
+    if intervalo is None:
+        # FileResponse usa o wsgi.file_wrapper (sendfile) quando o servidor oferece.
+        resposta = FileResponse(abrir(), content_type=tipo_conteudo)
+    else:
+        inicio, fim = intervalo
+        resposta = StreamingHttpResponse(_ler_intervalo(abrir, inicio, fim), status=206, content_type=tipo_conteudo)
+        resposta['Content-Range'] = f'bytes {inicio}-{fim}/{tamanho}'
+        resposta['Content-Length'] = fim - inicio + 1
+    for nome, valor in cabecalhos.items():
+        resposta[nome] = valor
+    return resposta
+
+
+def tipo_em_linha(tipo_conteudo):
+    """O tipo (sem parâmetros), se ele pode ser exibido no navegador; senão None."""
+    tipo = (tipo_conteudo or '').split(';')[0].strip().lower()
+    return tipo if tipo in TIPOS_EM_LINHA else None
+
+
+def resposta_download(request, arquivo, anexo=False):
+    """Resposta HTTP com o conteúdo de um Arquivo."""
+    backend = armazenamento()
+    tipo = tipo_em_linha(arquivo.tipo_conteudo)
+    return resposta_conteudo(
+        request, backend, backend.caminho_relativo(arquivo.sha256), lambda: backend.abrir(arquivo.sha256),
+        arquivo.sha256, arquivo.tamanho, tipo or TIPO_PADRAO,
+        {'Content-Disposition': content_disposition_header(anexo or tipo is None, arquivo.nome)},
+    )
+
+
+# --- Limpeza ---
+
+def limpar_arquivos(agora=None, dry_run=False):
+    """
+    Apaga os envios parados há mais de ARQUIVOS_VALIDADE_ENVIO_HORAS e os
+    arquivos mais antigos que isso sem nenhum documento, pagamento ou foto.
+    Devolve {'envios': n, 'arquivos': n}.
+    """
+    limite = (agora or timezone.now()) - timedelta(hours=settings.ARQUIVOS_VALIDADE_ENVIO_HORAS)
+    backend = armazenamento()
+    envios = EnvioArquivo.objects.filter(status='Em Andamento', atualizado_em__lt=limite)
+    orfaos = Arquivo.objects.filter(criado_em__lt=limite).exclude(
+        pk__in=Documento.objects.filter(arquivo__isnull=False).values('arquivo_id')
+    ).exclude(
+        pk__in=Pagamento.objects.filter(comprovante__isnull=False).values('comprovante_id')
+    ).exclude(pk__in=FotoImovel.objects.values('arquivo_id'))
+    resultado = {'envios': envios.count(), 'arquivos': orfaos.count()}
+    if dry_run:
+        return resultado
+    for chave in envios.values_list('chave', flat=True).iterator():
+        backend.excluir_envio(chave)
+    envios.delete()
+    for pk, sha256 in list(orfaos.values_list('pk', 'sha256')):
+        # Apaga o registro antes do disco: um envio novo do mesmo conteúdo
+        # volta a criar os dois.
+        try:
+            excluidos, _ = Arquivo.objects.filter(pk=pk).delete()
+        except ProtectedError:
+            # Anexado a um documento, pagamento ou foto depois da contagem.
+            resultado['arquivos'] -= 1
+            continue
+        if excluidos:
+            backend.excluir(sha256)
+    return resultado
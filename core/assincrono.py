@@ -0,0 +1,160 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+
+from .condicional import aplicar_validadores, aversoes_das_tabelas, modelos_exibidos, nao_modificado, validadores
+from .consultas import campos_da_requisicao, nomes_dos_campos, planejar_serializer
+from .dashboard import aobter_estatisticas
+from .leitura_rapida import leitor_rapido
+from .views import DashboardView
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Versões assíncronas (ASGI) das leituras mais usadas (só GET e HEAD; os
+# demais métodos recebem 405):
+#
+#     GET /api/assincrono/<endpoint>/          (lista, ex.: /api/assincrono/pagamentos/)
+#     GET /api/assincrono/<endpoint>/<id>/     (detalhe)
+#     GET /api/assincrono/dashboard/
+#
+# Elas respondem o mesmo JSON dos endpoints normais, com os mesmos filtros,
+# '?fields=', cursor de paginação e ETag/304, mas leem o banco com o ORM
+# assíncrono ('async for', aget, aaggregate). Servidas pelo uvicorn
+# (config.asgi), uma consulta lenta não prende o worker: enquanto ela espera
+# o banco, o mesmo processo atende outras requisições.
+#
+# Autenticação, permissões e throttling são os da view normal (o initial()
+# do DRF roda antes de qualquer leitura). Filtros e consultas são montados
+# pelo próprio ViewSet do endpoint (nada disso acessa o banco); só a leitura
+# das linhas muda. O cache de respostas
+# (core/cache_respostas.py) continua só nos endpoints normais.
+# -----------------------------------------------------------------------------
+
+
+def _json(dados, codigo=status.HTTP_200_OK):
+    return HttpResponse(JSONRenderer().render(dados), status=codigo, content_type='application/json')
+
+
+def _instanciar(view_class, request, acao=None, **kwargs):
+    """Cria a view como o router faria (Request com autenticadores, parsers etc.)."""
+    extras = {'action': acao, 'action_map': {'get': acao}} if acao else {}
+    view = view_class(args=(), kwargs=kwargs, format_kwarg=None, **extras)
+    view.headers = {}
+    view.request = view.initialize_request(request, **kwargs)
+    return view
+
+
+def _resposta_de_erro(view, erro):
+    """Como o handle_exception do DRF: 401 com WWW-Authenticate, se houver."""
+    cabecalhos = {}
+    if isinstance(erro, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        autenticar = view.get_authenticate_header(view.request)
+        if autenticar:
+            cabecalhos['WWW-Authenticate'] = autenticar
+        else:
+            erro.status_code = status.HTTP_403_FORBIDDEN
+    if getattr(erro, 'wait', None):
+        cabecalhos['Retry-After'] = str(int(erro.wait))
+    resposta = _json({'detail': erro.detail} if isinstance(erro.detail, str) else erro.detail, erro.status_code)
+    for nome, valor in cabecalhos.items():
+        resposta[nome] = valor
+    return resposta
+
+
+async def _verificar(view):
+    """
+    Roda o initial() da view (autenticação, permissões e throttling), como o
+    endpoint normal. Devolve a resposta de erro, ou None se a requisição pode
+    seguir. Fica numa thread: autenticar pode consultar o banco (sessão).
+    """
+    try:
+        await sync_to_async(view.initial)(view.request)
+    except exceptions.APIException as erro:
+        return _resposta_de_erro(view, erro)
+    return None
+
+
+async def _responder(view, gerar_dados):
+    """Confere o ETag (304) e, se o cliente não tem a versão atual, gera os dados."""
+    serializer_class = view.get_serializer_class()
+    campos = campos_da_requisicao(view.request, nomes_dos_campos(serializer_class))
+    plano = planejar_serializer(serializer_class, None, campos)
+    versoes = await aversoes_das_tabelas(modelos_exibidos(view.queryset.model, plano))
+    assinatura, ultima_alteracao = validadores(view.request, 'json', versoes)
+    etag = quote_etag(assinatura)
+
+    if nao_modificado(view.request, etag, ultima_alteracao):
+        resposta = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        try:
+            resposta = _json(await gerar_dados(serializer_class, campos))
+        except exceptions.APIException as erro:
+            return _resposta_de_erro(view, erro)
+    return aplicar_validadores(resposta, etag, ultima_alteracao)
+
+
+@require_safe
+async def listar(request, viewset):
+    view = _instanciar(viewset, request, 'list')
+    erro = await _verificar(view)
+    if erro is not None:
+        return erro
+
+    async def gerar_dados(serializer_class, campos):
+        queryset = view.filter_queryset(view.get_queryset())
+        leitor = leitor_rapido(serializer_class, campos) if view.lista_rapida else None
+        if leitor is not None:
+            campos_ordenacao = [campo.lstrip('-') for campo in getattr(view, 'ordenacao', ())]
+            queryset = leitor.preparar(queryset, campos_ordenacao)
+
+        paginador = view.paginator
+        if paginador is None:
+            linhas = [linha async for linha in queryset]
+        else:
+            linhas = await paginador.apaginate_queryset(queryset, view.request, view)
+
+        if leitor is not None:
+            itens = leitor.converter(linhas)
+        else:
+            # Serializers sem caminho por values(): o ORM já trouxe as linhas,
+            # a conversão roda fora do loop de eventos.
+            itens = await sync_to_async(lambda: view.get_serializer(linhas, many=True).data)()
+        return itens if paginador is None else paginador.get_paginated_response(itens).data
+
+    return await _responder(view, gerar_dados)
+
+
+@require_safe
+async def detalhar(request, viewset, pk):
+    view = _instanciar(viewset, request, 'retrieve', pk=pk)
+    erro = await _verificar(view)
+    if erro is not None:
+        return erro
+
+    async def gerar_dados(serializer_class, campos):
+        # Os mesmos filtros do get_object() do endpoint normal.
+        queryset = view.filter_queryset(view.get_queryset()).filter(pk=pk)
+        leitor = leitor_rapido(serializer_class, campos) if view.lista_rapida else None
+        if leitor is not None:
+            linha = await leitor.preparar(queryset).afirst()
+            if linha is None:
+                raise exceptions.NotFound()
+            return leitor.converter([linha])[0]
+
+        objeto = await queryset.afirst()
+        if objeto is None:
+            raise exceptions.NotFound()
+        return await sync_to_async(lambda: view.get_serializer(objeto).data)()
+
+    return await _responder(view, gerar_dados)
+
+
+@require_safe
+async def dashboard(request):
+    erro = await _verificar(_instanciar(DashboardView, request))
+    if erro is not None:
+        return erro
+    return _json(await aobter_estatisticas())
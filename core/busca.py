@@ -0,0 +1,154 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .consultas import planejar_str
+from .models import Imovel, Locador, Locatario, Fiador, Intermediario, Contrato
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Busca textual em imóveis, pessoas e contratos: GET /api/busca/?q=silva
+#
+# - No Postgres, cada tabela tem uma coluna 'busca' (tsvector) GERADA pelo
+#   próprio banco a partir dos campos abaixo, com índice GIN (migração 0009).
+#   Como a coluna é gerada, ela nunca fica desatualizada, nem em operações em
+#   massa. Cada termo vira uma busca por prefixo ('silv:*'), e o ranking usa
+#   ts_rank com os pesos A/B/C de cada campo. O CPF/CNPJ também é procurado
+#   por trecho (LIKE), com índice de trigramas (pg_trgm).
+# - Em outros bancos (SQLite no desenvolvimento) a busca usa icontains e o
+#   ranking é calculado no Python com os mesmos pesos.
+#
+# Em ambos os casos, cada tabela devolve no máximo MAXIMO_CANDIDATOS linhas
+# antes do ranking, e a resposta é limitada a 'limite' resultados: termos
+# muito comuns ("rua") não fazem a consulta percorrer a tabela inteira.
+# -----------------------------------------------------------------------------
+
+LIMITE_PADRAO_BUSCA = 20
+LIMITE_MAXIMO_BUSCA = 50
+MAXIMO_CANDIDATOS = 500
+TAMANHO_MINIMO = 2
+# Mesmos pesos padrão do ts_rank do Postgres.
+PESOS = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+PESSOAS = [('nome', 'A'), ('email', 'B'), ('cpf_cnpj', 'B')]
+
+# (tipo, modelo, [(campo, peso)], campo exibido como detalhe)
+FONTES = [
+    ('imoveis', Imovel, [('endereco', 'A'), ('descricao', 'C')], 'status_imovel'),
+    ('locadores', Locador, PESSOAS, 'email'),
+    ('locatarios', Locatario, PESSOAS, 'email'),
+    ('fiadores', Fiador, PESSOAS, 'email'),
+    ('intermediarios', Intermediario, PESSOAS, 'email'),
+    ('contratos', Contrato, [('clausulas_especificas', 'C')], 'status_contrato'),
+]
+TIPOS = [tipo for tipo, *_ in FONTES]
+
+# Contratos também são encontrados pelo endereço do imóvel, com este fator
+# sobre o ranking do imóvel.
+FATOR_CONTRATO_POR_IMOVEL = 0.9
+
+TS_QUERY = "(to_tsquery('portuguese', %s) || to_tsquery('simple', %s))"
+
+
+def termos_da_busca(texto):
+    return [termo for termo in re.findall(r'\w+', (texto or '').lower()) if termo]
+
+
+def _usa_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def _queryset_exibicao(modelo, detalhe, extras=()):
+    return planejar_str(modelo).aplicar(modelo.objects.all(), [detalhe, *extras])
+
+
+def _buscar_postgres(modelo, campos, detalhe, termos, texto, limite):
+    tabela = modelo._meta.db_table
+    consulta = ' & '.join(f'{termo}:*' for termo in termos)
+    # Sem o nome da tabela: dentro da subconsulta, 'busca' é a coluna dela.
+    filtro = Q(RawSQL(f'busca @@ {TS_QUERY}', (consulta, consulta), output_field=BooleanField()))
+    if any(campo == 'cpf_cnpj' for campo, _ in campos) and any(c.isdigit() for c in texto):
+        filtro |= Q(cpf_cnpj__contains=texto.strip())
+    candidatos = modelo.objects.filter(filtro).values('pk')[:MAXIMO_CANDIDATOS]
+    ranking = RawSQL(f'ts_rank({tabela}.busca, {TS_QUERY})', (consulta, consulta), output_field=FloatField())
+    objetos = _queryset_exibicao(modelo, detalhe).filter(pk__in=candidatos).annotate(
+        rank=ranking
+    ).order_by('-rank', 'pk')[:limite]
+    # Trecho de CPF/CNPJ sem correspondência no tsvector: rank 0 vira o peso B.
+    return [(objeto, objeto.rank or PESOS['B']) for objeto in objetos]
+
+
+def _pontuar(objeto, campos, termos):
+    total = 0.0
+    for termo in termos:
+        melhor = 0.0
+        for campo, peso in campos:
+            valor = (getattr(objeto, campo) or '').lower()
+            if termo in valor:
+                # Início de palavra vale mais que um trecho no meio dela.
+                inicio = valor.startswith(termo) or f' {termo}' in valor
+                melhor = max(melhor, PESOS[peso] * (1.0 if inicio else 0.5))
+        total += melhor
+    return total / len(termos)
+
+
+def _buscar_simples(modelo, campos, detalhe, termos, texto, limite):
+    filtro = Q()
+    for termo in termos:
+        qualquer_campo = Q()
+        for campo, _ in campos:
+            qualquer_campo |= Q(**{f'{campo}__icontains': termo})
+        filtro &= qualquer_campo
+    queryset = _queryset_exibicao(modelo, detalhe, [campo for campo, _ in campos])
+    objetos = queryset.filter(filtro).order_by('pk')[:MAXIMO_CANDIDATOS]
+    pontuados = [(objeto, _pontuar(objeto, campos, termos)) for objeto in objetos]
+    pontuados.sort(key=lambda item: -item[1])
+    return pontuados[:limite]
+
+
+def _resultado(tipo, objeto, detalhe, rank):
+    return {
+        'tipo': tipo,
+        'id': objeto.pk,
+        'titulo': str(objeto),
+        'detalhe': getattr(objeto, detalhe),
+        'rank': round(rank, 4),
+    }
+
+
+def buscar(texto, limite=LIMITE_PADRAO_BUSCA, tipos=None):
+    """Devolve os resultados mais relevantes para 'texto', de todas as fontes."""
+    termos = termos_da_busca(texto)
+    if len(''.join(termos)) < TAMANHO_MINIMO:
+        return []
+    buscar_na_fonte = _buscar_postgres if _usa_postgres() else _buscar_simples
+    tipos = set(tipos or TIPOS)
+
+    resultados = []
+    imoveis_encontrados = []
+    for tipo, modelo, campos, detalhe in FONTES:
+        if tipo not in tipos and not (tipo == 'imoveis' and 'contratos' in tipos):
+            continue
+        encontrados = buscar_na_fonte(modelo, campos, detalhe, termos, texto, limite)
+        if tipo == 'imoveis':
+            imoveis_encontrados = encontrados
+            if tipo not in tipos:
+                continue
+        resultados.extend(_resultado(tipo, objeto, detalhe, rank) for objeto, rank in encontrados)
+
+    if 'contratos' in tipos and imoveis_encontrados:
+        rank_do_imovel = {imovel.pk: rank for imovel, rank in imoveis_encontrados}
+        ja_incluidos = {item['id'] for item in resultados if item['tipo'] == 'contratos'}
+        contratos = _queryset_exibicao(Contrato, 'status_contrato', ['imovel_id']).filter(
+            imovel_id__in=rank_do_imovel
+        ).exclude(pk__in=ja_incluidos).order_by('pk')[:limite]
+        resultados.extend(
+            _resultado('contratos', contrato, 'status_contrato',
+                       rank_do_imovel[contrato.imovel_id] * FATOR_CONTRATO_POR_IMOVEL)
+            for contrato in contratos
+        )
+
+    resultados.sort(key=lambda item: (-item['rank'], item['tipo'], item['id']))
+    return resultados[:limite]
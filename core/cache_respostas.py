@@ -0,0 +1,73 @@
+from django.apps import apps
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Cache das respostas de listas e detalhes (GET) de todos os ViewSets.
+#
+# A chave junta o modelo, a URL pedida (filtros, ?fields=, cursor, e também
+# esquema e host, que aparecem nos links next/previous) e a versão de cada
+# tabela exibida na resposta (veja core/condicional.py). Toda escrita
+# incrementa a versão da tabela (core/signals.py), então a chave muda e a
+# resposta antiga simplesmente deixa de ser usada; não há nada para apagar.
+# Como a lista de Contratos exibe o endereço do Imóvel, a chave dela inclui
+# também a versão da tabela de Imóveis: editar um imóvel invalida as listas
+# de contratos, pagamentos, manutenções etc. que o mostram.
+#
+# O backend é o cache 'respostas' de settings.CACHES (memória com LRU,
+# arquivos ou Redis, via RESPOSTAS_CACHE_URL). Os acertos e faltas de cada
+# modelo são contados no próprio cache e expostos em /api/cache/.
+# -----------------------------------------------------------------------------
+
+ALIAS_CACHE = 'respostas'
+EVENTOS = ('acertos', 'faltas')
+
+
+def _cache():
+    return caches[ALIAS_CACHE]
+
+
+def _contar(model, evento):
+    chave = f'contador:{evento}:{model._meta.label_lower}'
+    cache = _cache()
+    try:
+        cache.incr(chave)
+    except ValueError:
+        # Primeiro evento (ou contador descartado): começa em 1.
+        if not cache.add(chave, 1, timeout=None):
+            cache.incr(chave)
+
+
+def obter_ou_gerar(model, assinatura, gerar_resposta):
+    """Devolve a resposta guardada para 'assinatura' ou gera e guarda uma nova."""
+    cache = _cache()
+    chave = f'resposta:{model._meta.label_lower}:{assinatura}'
+    dados = cache.get(chave)
+    if dados is not None:
+        _contar(model, 'acertos')
+        return Response(dados)
+
+    _contar(model, 'faltas')
+    resposta = gerar_resposta()
+    if resposta.status_code == status.HTTP_200_OK:
+        cache.set(chave, resposta.data)
+    return resposta
+
+
+def estatisticas():
+    """Acertos, faltas e taxa de acerto por modelo."""
+    modelos = [model._meta.label_lower for model in apps.get_app_config('core').get_models()]
+    contadores = _cache().get_many([f'contador:{evento}:{tabela}' for tabela in modelos for evento in EVENTOS])
+    resultado = {}
+    for tabela in modelos:
+        acertos = contadores.get(f'contador:acertos:{tabela}', 0)
+        faltas = contadores.get(f'contador:faltas:{tabela}', 0)
+        if acertos or faltas:
+            resultado[tabela] = {
+                'acertos': acertos,
+                'faltas': faltas,
+                'taxa_acerto': round(acertos / (acertos + faltas), 4),
+            }
+    return resultado
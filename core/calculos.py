@@ -0,0 +1,55 @@
+import calendar
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import DateField
+from django.db.models.functions import Coalesce, TruncMonth
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Funções de datas, percentuais e valores usadas por vários relatórios
+# (Dashboard, extratos, ocupação, rentabilidade). Os meses são sempre
+# representados pelo primeiro dia (date(2025, 2, 1) = fevereiro de 2025).
+# -----------------------------------------------------------------------------
+
+CENTAVOS = Decimal('0.01')
+
+
+def primeiro_dia(dia):
+    return dia.replace(day=1)
+
+
+def ultimo_dia(mes):
+    return mes.replace(day=calendar.monthrange(mes.year, mes.month)[1])
+
+
+def somar_meses(mes, quantidade):
+    ano, indice = divmod(mes.month - 1 + quantidade, 12)
+    return date(mes.year + ano, indice + 1, 1)
+
+
+def meses_entre(inicio, fim):
+    """Primeiro dia de cada mês que tem algum dia entre 'inicio' e 'fim'."""
+    mes = primeiro_dia(inicio)
+    while mes <= fim:
+        yield mes
+        mes = somar_meses(mes, 1)
+
+
+def mes_do_pagamento():
+    """Expressão do ORM: a competência do pagamento (ou o mês da data_pagamento)."""
+    return Coalesce('competencia', TruncMonth('data_pagamento'), output_field=DateField())
+
+
+def data_da_manutencao():
+    """Expressão do ORM: a data de conclusão da manutenção (ou a da solicitação)."""
+    return Coalesce('data_conclusao', 'data_solicitacao', output_field=DateField())
+
+
+def percentual(parte, total):
+    return round(float(parte) / float(total) * 100, 2) if total else None
+
+
+def formatar_valor(decimal):
+    """Formata somas monetárias como o DecimalField do DRF ('1234.50')."""
+    return str((decimal or Decimal('0')).quantize(CENTAVOS))
@@ -0,0 +1,232 @@
+import logging
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DateField, DecimalField, F, Func, IntegerField, Q, Sum, Value
+from django.db.models.functions import Now, Round
+from django.utils import timezone
+
+from .calculos import primeiro_dia, ultimo_dia
+from .models import Contrato, Pagamento
+from .signals import registrar_alteracao
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Geração automática das cobranças mensais. Para um mês de competência, cria
+# um Pagamento 'Pendente' para cada contrato 'Ativo' vigente naquele mês,
+# com o valor do aluguel contratado e o vencimento no dia combinado.
+#
+# - Idempotente: a restrição única (contrato, competencia) impede duplicatas,
+#   e a consulta já exclui os contratos que têm o pagamento do mês. Rodar de
+#   novo o mesmo mês é praticamente gratuito.
+# - Memória limitada: os contratos são lidos em lotes pela chave primária
+#   (WHERE id > último_id LIMIT n), só com as colunas necessárias, e cada lote
+#   é gravado com um único bulk_create na sua própria transação.
+# -----------------------------------------------------------------------------
+
+TAMANHO_LOTE = 2000
+FORMA_PAGAMENTO_PADRAO = 'Boleto'
+
+logger = logging.getLogger(__name__)
+
+
+def interpretar_mes(texto):
+    """Converte 'AAAA-MM' (ou 'AAAA-MM-DD') no primeiro dia do mês."""
+    if not texto:
+        return primeiro_dia(timezone.localdate())
+    partes = str(texto).split('-')
+    try:
+        return date(int(partes[0]), int(partes[1]), 1)
+    except (IndexError, ValueError):
+        raise ValueError("Informe o mês no formato AAAA-MM.")
+
+
+def contratos_sem_cobranca(competencia):
+    """Contratos ativos vigentes no mês que ainda não têm o pagamento dele."""
+    return Contrato.objects.filter(
+        status_contrato='Ativo', data_inicio__lte=ultimo_dia(competencia), data_fim__gte=competencia,
+    ).exclude(
+        id__in=Pagamento.objects.filter(competencia=competencia).values('contrato_id')
+    )
+
+
+def _gravar_lote(competencia, ids, pagamentos):
+    """Grava o lote e devolve quantos pagamentos foram de fato inseridos."""
+    # Trava os contratos do lote: outra execução do mesmo mês espera esta
+    # terminar, e a diferença das contagens é só o que este lote inseriu.
+    list(Contrato.objects.select_for_update().filter(id__in=ids).values_list('id', flat=True))
+    existentes = Pagamento.objects.filter(competencia=competencia, contrato_id__in=ids)
+    antes = existentes.count()
+    # ignore_conflicts pula os contratos que ganharam o pagamento do mês
+    # depois da consulta (ex.: execuções simultâneas).
+    Pagamento.objects.bulk_create(pagamentos, ignore_conflicts=True)
+    return existentes.count() - antes
+
+
+def gerar_pagamentos_do_mes(competencia, tamanho_lote=TAMANHO_LOTE, forma_pagamento=FORMA_PAGAMENTO_PADRAO):
+    """
+    Cria os pagamentos pendentes do mês e devolve um resumo da execução.
+    """
+    inicio = time.perf_counter()
+    competencia = primeiro_dia(competencia)
+    ultimo_dia_do_mes = ultimo_dia(competencia).day
+    base = contratos_sem_cobranca(competencia).order_by('id').values_list(
+        'id', 'valor_aluguel', 'data_vencimento_pagamento'
+    )
+
+    criados = 0
+    lotes = 0
+    ultimo_id = 0
+    while True:
+        lote = list(base.filter(id__gt=ultimo_id)[:tamanho_lote])
+        if not lote:
+            break
+        ultimo_id = lote[-1][0]
+        pagamentos = [
+            Pagamento(
+                contrato_id=contrato_id,
+                competencia=competencia,
+                # Dia 31 em fevereiro vira o último dia do mês.
+                data_pagamento=competencia.replace(day=min(max(dia or 1, 1), ultimo_dia_do_mes)),
+                valor_pago=valor,
+                forma_pagamento=forma_pagamento,
+                status_pagamento='Pendente',
+            )
+            for contrato_id, valor, dia in lote
+        ]
+        with transaction.atomic():
+            criados += _gravar_lote(competencia, [contrato_id for contrato_id, _, _ in lote], pagamentos)
+        lotes += 1
+
+    if criados:
+        registrar_alteracao(Pagamento)
+    return {
+        'competencia': competencia.isoformat(),
+        'criados': criados,
+        'lotes': lotes,
+        'segundos': round(time.perf_counter() - inicio, 3),
+    }
+
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Atualização dos pagamentos em atraso. Sem carregar objetos no Python:
+#
+#   UPDATE core_pagamento
+#      SET status_pagamento = 'Em Atraso',
+#          multa_juros = ROUND(valor_pago * multa + valor_pago * juros_dia * dias_de_atraso, 2)
+#    WHERE id IN (<lote de ids>)
+#
+# Os candidatos são os pagamentos 'Pendente' já vencidos (após a carência) e
+# os 'Em Atraso' cuja multa/juros mudou desde a última execução (o juro cresce
+# por dia). Os ids são lidos em lotes pela chave primária, e cada UPDATE roda
+# na sua própria transação curta, para não travar a tabela por muito tempo.
+# -----------------------------------------------------------------------------
+
+MULTA_ATRASO_PERCENTUAL = Decimal(str(getattr(settings, 'MULTA_ATRASO_PERCENTUAL', '2')))
+JUROS_MES_PERCENTUAL = Decimal(str(getattr(settings, 'JUROS_MES_PERCENTUAL', '1')))
+CARENCIA_DIAS = int(getattr(settings, 'CARENCIA_ATRASO_DIAS', 0))
+TAMANHO_LOTE_ATRASOS = 5000
+
+
+class DiasDesde(Func):
+    """
+    Dias corridos entre uma data de referência e uma coluna de data
+    (referencia - coluna), calculado pelo próprio banco.
+    """
+    template = '(%(expressions)s)'
+    arg_joiner = ' - '
+    output_field = IntegerField()
+
+    def __init__(self, referencia, expressao, **extra):
+        super().__init__(Value(referencia, output_field=DateField()), expressao, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, template='CAST(julianday(%(expressions)s) AS INTEGER)',
+            arg_joiner=') - julianday(', **extra_context
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='DATEDIFF(%(expressions)s)', arg_joiner=', ', **extra_context)
+
+
+def expressao_multa_juros(hoje):
+    """Multa fixa + juros simples pro rata dia sobre o valor devido."""
+    multa = MULTA_ATRASO_PERCENTUAL / 100
+    juros_dia = JUROS_MES_PERCENTUAL / 100 / 30
+    decimal = DecimalField(max_digits=10, decimal_places=2)
+    return Round(
+        F('valor_pago') * Value(multa, output_field=decimal)
+        + F('valor_pago') * Value(juros_dia, output_field=DecimalField(max_digits=12, decimal_places=8))
+        * DiasDesde(hoje, F('data_pagamento')),
+        2,
+        output_field=decimal,
+    )
+
+
+def pagamentos_para_atualizar(hoje):
+    limite = hoje - timedelta(days=CARENCIA_DIAS)
+    return Pagamento.objects.alias(nova_multa=expressao_multa_juros(hoje)).filter(
+        Q(status_pagamento='Pendente', data_pagamento__lt=limite)
+        | (Q(status_pagamento='Em Atraso') & ~Q(multa_juros=F('nova_multa')))
+    )
+
+
+def atualizar_atrasos(hoje=None, dry_run=False, tamanho_lote=TAMANHO_LOTE_ATRASOS):
+    """
+    Marca como 'Em Atraso' os pagamentos vencidos e recalcula multa/juros.
+    Com dry_run=True, apenas informa o que seria alterado.
+    """
+    inicio = time.perf_counter()
+    hoje = hoje or timezone.localdate()
+    limite = hoje - timedelta(days=CARENCIA_DIAS)
+    candidatos = pagamentos_para_atualizar(hoje)
+
+    if dry_run:
+        resumo = candidatos.aggregate(
+            novos_em_atraso=Count('id', filter=Q(status_pagamento='Pendente')),
+            multas_recalculadas=Count('id', filter=Q(status_pagamento='Em Atraso')),
+            multa_juros_total=Sum(expressao_multa_juros(hoje)),
+        )
+        resumo['multa_juros_total'] = str(resumo['multa_juros_total'] or Decimal('0.00'))
+        resumo.update(dry_run=True, data_referencia=hoje.isoformat(), segundos=round(time.perf_counter() - inicio, 3))
+        return resumo
+
+    novos = 0
+    recalculados = 0
+    lotes = 0
+    ultimo_id = 0
+    ids_candidatos = candidatos.order_by('id').values_list('id', flat=True)
+    while True:
+        ids = list(ids_candidatos.filter(id__gt=ultimo_id)[:tamanho_lote])
+        if not ids:
+            break
+        ultimo_id = ids[-1]
+        with transaction.atomic():
+            lote = Pagamento.objects.filter(id__in=ids)
+            # Primeiro o recálculo dos que já estavam em atraso, depois a virada
+            # dos pendentes: assim contamos separadamente cada tipo de alteração.
+            recalculados += lote.filter(status_pagamento='Em Atraso').update(
+                multa_juros=expressao_multa_juros(hoje), data_atualizacao=Now()
+            )
+            novos += lote.filter(status_pagamento='Pendente', data_pagamento__lt=limite).update(
+                status_pagamento='Em Atraso', multa_juros=expressao_multa_juros(hoje), data_atualizacao=Now()
+            )
+        lotes += 1
+
+    if novos or recalculados:
+        registrar_alteracao(Pagamento)
+    resumo = {
+        'dry_run': False,
+        'data_referencia': hoje.isoformat(),
+        'novos_em_atraso': novos,
+        'multas_recalculadas': recalculados,
+        'lotes': lotes,
+        'segundos': round(time.perf_counter() - inicio, 3),
+    }
+    logger.info('Atualização de atrasos: %s', resumo)
+    return resumo
@@ -0,0 +1,135 @@
+import hashlib
+from functools import partial
+
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache_respostas import obter_ou_gerar
+from .consultas import campos_da_requisicao, nomes_dos_campos, planejar_serializer
+from .models import VersaoTabela
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Requisições condicionais (ETag / Last-Modified) nas listas e nos detalhes.
+#
+# O ETag NÃO é calculado a partir do corpo da resposta: ele vem da URL pedida
+# (absoluta, com esquema e host) e da versão de cada tabela que aparece nela
+# (a do próprio modelo e a dos modelos exibidos pelo __str__, ex.: Imovel
+# numa lista de Contratos). As versões ficam em VersaoTabela e são
+# incrementadas a cada escrita (core/signals.py). Conferir se nada mudou
+# custa UMA consulta pela chave primária; se o navegador já tem a versão
+# atual, a resposta é 304 sem tocar na tabela principal e sem serializar
+# nada. Se não tem, a mesma assinatura é a chave do cache de respostas
+# compartilhado entre os clientes.
+# -----------------------------------------------------------------------------
+
+
+def modelos_exibidos(model, plano):
+    """O modelo e todos os modelos relacionados lidos pelo plano de consulta."""
+    modelos = {model}
+    for caminho in [*plano.select_related, *plano.prefetch_related]:
+        atual = model
+        for parte in caminho.split('__'):
+            atual = atual._meta.get_field(parte).related_model
+            modelos.add(atual)
+    return modelos
+
+
+def versoes_das_tabelas(modelos):
+    """[(tabela, versão, data_atualizacao)] dos modelos, em ordem estável."""
+    tabelas = sorted(model._meta.label_lower for model in modelos)
+    encontradas = {
+        tabela: (versao, data)
+        for tabela, versao, data in VersaoTabela.objects.filter(tabela__in=tabelas).values_list(
+            'tabela', 'versao', 'data_atualizacao'
+        )
+    }
+    return [(tabela, *encontradas.get(tabela, (0, None))) for tabela in tabelas]
+
+
+async def aversoes_das_tabelas(modelos):
+    """Igual a versoes_das_tabelas, com o ORM assíncrono."""
+    tabelas = sorted(model._meta.label_lower for model in modelos)
+    encontradas = {
+        tabela: (versao, data)
+        async for tabela, versao, data in VersaoTabela.objects.filter(tabela__in=tabelas).values_list(
+            'tabela', 'versao', 'data_atualizacao'
+        )
+    }
+    return [(tabela, *encontradas.get(tabela, (0, None))) for tabela in tabelas]
+
+
+def validadores(request, formato, versoes):
+    """(assinatura, última alteração) de uma leitura, a partir das versões das tabelas."""
+    assinatura = '|'.join([
+        # URL absoluta: as listas trazem links next/previous com esquema e
+        # host, então a mesma rota por outro host é outra resposta.
+        request.build_absolute_uri(),
+        formato,
+        # A data entra junto para que uma versão nunca se repita, nem
+        # depois de restaurar um backup do banco.
+        *(f'{tabela}:{versao}:{data.isoformat() if data else ""}' for tabela, versao, data in versoes),
+    ])
+    assinatura = hashlib.md5(assinatura.encode(), usedforsecurity=False).hexdigest()
+    ultima_alteracao = max((data for _, _, data in versoes if data), default=None)
+    return assinatura, ultima_alteracao
+
+
+def nao_modificado(request, etag, ultima_alteracao):
+    """Se o cliente já tem a versão atual (If-None-Match / If-Modified-Since)."""
+    if 'If-None-Match' in request.headers:
+        return mesmo_etag(etag, request.headers['If-None-Match'])
+    desde = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return bool(desde and ultima_alteracao and int(ultima_alteracao.timestamp()) <= desde)
+
+
+def aplicar_validadores(resposta, etag, ultima_alteracao):
+    """ETag, Last-Modified e Cache-Control de uma resposta 200/304."""
+    if resposta.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+        resposta['ETag'] = etag
+        if ultima_alteracao:
+            resposta['Last-Modified'] = http_date(ultima_alteracao.timestamp())
+        # O navegador guarda a resposta, mas revalida (barato) a cada uso.
+        patch_cache_control(resposta, private=True, no_cache=True)
+    return resposta
+
+
+def mesmo_etag(etag, cabecalho):
+    """Comparação "fraca" (RFC 9110): W/"x" e "x" são equivalentes."""
+    etags = [valor.removeprefix('W/') for valor in parse_etags(cabecalho)]
+    return '*' in etags or etag in etags
+
+
+class RequisicaoCondicionalMixin:
+    """
+    Adiciona ETag/Last-Modified (e respostas 304) ao list e ao retrieve, e
+    guarda as respostas no cache de respostas (core/cache_respostas.py).
+    """
+    cache_respostas = True
+
+    def _validadores(self, request):
+        serializer_class = self.get_serializer_class()
+        campos = campos_da_requisicao(request, nomes_dos_campos(serializer_class))
+        plano = planejar_serializer(serializer_class, None, campos)
+        versoes = versoes_das_tabelas(modelos_exibidos(self.queryset.model, plano))
+        return validadores(request, request.accepted_renderer.format, versoes)
+
+    def _responder_condicional(self, request, gerar_resposta):
+        assinatura, ultima_alteracao = self._validadores(request)
+        etag = quote_etag(assinatura)
+        if nao_modificado(request, etag, ultima_alteracao):
+            resposta = Response(status=status.HTTP_304_NOT_MODIFIED)
+        elif self.cache_respostas:
+            # A mesma assinatura serve de chave do cache de respostas.
+            resposta = obter_ou_gerar(self.queryset.model, assinatura, gerar_resposta)
+        else:
+            resposta = gerar_resposta()
+        return aplicar_validadores(resposta, etag, ultima_alteracao)
+
+    def list(self, request, *args, **kwargs):
+        return self._responder_condicional(request, partial(super().list, request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._responder_condicional(request, partial(super().retrieve, request, *args, **kwargs))
@@ -0,0 +1,184 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Planejador de consultas. Olhando os campos declarados em um serializer, ele
+# descobre quais relacionamentos serão lidos e monta o queryset com:
+#
+#   - select_related(): para chaves estrangeiras exibidas (ex.: o 'contrato'
+#     de um Pagamento, exibido com o __str__ do Contrato);
+#   - prefetch_related(): para relações "muitos" (listas aninhadas);
+#   - only(): para buscar no banco apenas as colunas que serão usadas.
+#
+# Como o __str__ de um modelo pode acessar outros modelos (ex.: o __str__ de
+# Pagamento lê 'contrato.locatario.nome'), cada modelo declara em CAMPOS_STR
+# os caminhos que seu __str__ usa. Assim, listar N pagamentos custa um número
+# fixo de consultas, e não 2N+1.
+#
+# O plano é calculado uma vez por serializer (e por recorte de campos pedido
+# com '?fields='/'?exclude=') e reaproveitado. Campos novos adicionados aos
+# serializers entram no plano automaticamente.
+# -----------------------------------------------------------------------------
+
+
+class PlanoConsulta:
+    """Resultado do planejamento: o que aplicar sobre o queryset."""
+
+    def __init__(self):
+        self.select_related = set()
+        self.prefetch_related = {}
+        self.only = set()
+        # Se algum campo não puder ser mapeado para colunas (ex.: métodos),
+        # não usamos only() para não gerar uma consulta extra por linha.
+        self.usar_only = True
+
+    def aplicar(self, queryset, campos_extras=()):
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related.values())
+        if self.usar_only:
+            queryset = queryset.only(*sorted(self.only | set(campos_extras)))
+        return queryset
+
+
+def _campos_str(model, prefixo, plano):
+    """Inclui no plano as colunas e relações usadas pelo __str__ do modelo."""
+    caminhos = getattr(model, 'CAMPOS_STR', None)
+    if caminhos is None:
+        # Sem a declaração, não sabemos o que o __str__ lê: carregamos tudo.
+        plano.usar_only = False
+        return
+    plano.only.add(f'{prefixo}{model._meta.pk.name}')
+    for caminho in caminhos:
+        partes = caminho.split('__')
+        atual = model
+        for posicao, parte in enumerate(partes[:-1]):
+            relacao = '__'.join(partes[:posicao + 1])
+            plano.select_related.add(f'{prefixo}{relacao}')
+            plano.only.add(f'{prefixo}{relacao}')
+            atual = atual._meta.get_field(parte).related_model
+        plano.only.add(f'{prefixo}{caminho}')
+
+
+def campos_da_requisicao(request, disponiveis):
+    """
+    Lê '?fields=' e '?exclude=' de uma leitura (GET/HEAD) e devolve o conjunto
+    de campos a exibir, ou None quando o cliente não pediu nenhum recorte.
+    Escritas sempre usam todos os campos, para não afetar a validação.
+    """
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None
+    pedidos = request.query_params.get('fields')
+    excluidos = request.query_params.get('exclude')
+    if not pedidos and not excluidos:
+        return None
+    campos = set(disponiveis)
+    if pedidos:
+        campos &= {nome.strip() for nome in pedidos.split(',')}
+    if excluidos:
+        campos -= {nome.strip() for nome in excluidos.split(',')}
+    return frozenset(campos)
+
+
+def _planejar(serializer, model, prefixo, plano, campos=None):
+    plano.only.add(f'{prefixo}{model._meta.pk.name}')
+
+    for nome, campo in serializer.fields.items():
+        if campo.write_only or (campos is not None and nome not in campos):
+            continue
+        origem = campo.source
+        if origem == '*' or '.' in origem:
+            plano.usar_only = False
+            continue
+        try:
+            field = model._meta.get_field(origem)
+        except FieldDoesNotExist:
+            # Propriedade ou método do modelo: não sabemos quais colunas usa.
+            plano.usar_only = False
+            continue
+
+        if isinstance(campo, serializers.ListSerializer) or isinstance(campo, serializers.ManyRelatedField):
+            # Relações "muitos": uma consulta extra para todas as linhas.
+            filho = getattr(campo, 'child', None) or getattr(campo, 'child_relation', None)
+            relacionado = field.related_model
+            if isinstance(filho, serializers.BaseSerializer):
+                subplano = planejar_serializer(type(filho), relacionado)
+                # A chave estrangeira de volta é necessária para agrupar o prefetch.
+                remoto = field.remote_field.attname if field.auto_created else None
+                extras = (remoto,) if remoto else ()
+                plano.prefetch_related[f'{prefixo}{origem}'] = Prefetch(
+                    f'{prefixo}{origem}', queryset=subplano.aplicar(relacionado.objects.all(), extras)
+                )
+            else:
+                plano.prefetch_related[f'{prefixo}{origem}'] = f'{prefixo}{origem}'
+            if field.concrete:
+                plano.only.add(f'{prefixo}{origem}')
+            continue
+
+        if isinstance(campo, serializers.BaseSerializer):
+            # Serializer aninhado para uma chave estrangeira: mesmo JOIN.
+            plano.select_related.add(f'{prefixo}{origem}')
+            plano.only.add(f'{prefixo}{origem}')
+            _planejar(campo, field.related_model, f'{prefixo}{origem}__', plano)
+            continue
+
+        if isinstance(campo, serializers.PrimaryKeyRelatedField):
+            # Só o id é exibido, e ele já está na própria tabela.
+            plano.only.add(f'{prefixo}{origem}')
+            continue
+
+        if isinstance(campo, serializers.RelatedField):
+            # StringRelatedField e afins: exibem o __str__ do objeto relacionado.
+            plano.select_related.add(f'{prefixo}{origem}')
+            plano.only.add(f'{prefixo}{origem}')
+            _campos_str(field.related_model, f'{prefixo}{origem}__', plano)
+            continue
+
+        plano.only.add(f'{prefixo}{origem}')
+
+
+@lru_cache(maxsize=None)
+def nomes_dos_campos(serializer_class):
+    """Nomes de todos os campos do serializer (para validar ?fields=)."""
+    return tuple(serializer_class().fields.keys())
+
+
+@lru_cache(maxsize=None)
+def planejar_str(model):
+    """Plano mínimo para exibir apenas o __str__ de cada linha do modelo."""
+    plano = PlanoConsulta()
+    _campos_str(model, '', plano)
+    return plano
+
+
+@lru_cache(maxsize=1024)
+def planejar_serializer(serializer_class, model=None, campos=None):
+    """
+    Calcula (uma vez) o plano de consulta para um serializer. 'campos' limita
+    o plano aos campos pedidos em '?fields='/'?exclude='.
+    """
+    model = model or serializer_class.Meta.model
+    plano = PlanoConsulta()
+    _planejar(serializer_class(), model, '', plano, campos)
+    return plano
+
+
+class ConsultaOtimizadaMixin:
+    """
+    Mixin para ViewSets: aplica ao queryset o plano derivado do serializer
+    (restrito aos campos pedidos pelo cliente, se houver).
+    Os campos de 'ordenacao' (paginação) são sempre carregados.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        campos = campos_da_requisicao(self.request, nomes_dos_campos(serializer_class))
+        plano = planejar_serializer(serializer_class, None, campos)
+        campos_ordenacao = [campo.lstrip('-') for campo in getattr(self, 'ordenacao', ())]
+        return plano.aplicar(queryset, campos_ordenacao)
@@ -0,0 +1,143 @@
+import hashlib
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .cache_respostas import ALIAS_CACHE
+from .calculos import formatar_valor
+from .condicional import aversoes_das_tabelas, versoes_das_tabelas
+from .models import Imovel, Contrato, Pagamento, Manutencao
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Este módulo calcula os números exibidos no Dashboard. Em vez de baixar as
+# tabelas inteiras e contar no navegador, cada tabela é resumida com UMA
+# única consulta de agregação (COUNT/SUM condicionais com 'filter=Q(...)').
+# O resultado fica em cache por alguns segundos, no cache 'respostas'
+# (compartilhado entre os workers, se configurado). A chave inclui a versão
+# de cada tabela do Dashboard (VersaoTabela, a mesma dos ETags): qualquer
+# escrita muda a chave em todos os processos, sem precisar apagar nada.
+#
+# A versão assíncrona (usada pelo endpoint ASGI, core/assincrono.py) NÃO roda
+# as agregações em paralelo: o ORM assíncrono do Django executa cada consulta
+# com sync_to_async(thread_sensitive=True), numa única thread. Por isso ela
+# faz uma só passagem para essa thread com as quatro agregações, em vez de
+# quatro passagens que só disputariam a mesma thread.
+# -----------------------------------------------------------------------------
+
+DASHBOARD_CACHE_KEY = 'core:dashboard'
+MODELOS_DO_DASHBOARD = (Imovel, Contrato, Pagamento, Manutencao)
+DASHBOARD_CACHE_TIMEOUT = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 60)
+
+
+def _contagens_por_status(campo, choices):
+    """Gera um COUNT condicional para cada opção de status do modelo."""
+    # Os apelidos usam a posição da opção, pois o SQL não aceita espaços neles.
+    return {
+        f'status_{posicao}': Count('id', filter=Q(**{campo: valor}))
+        for posicao, (valor, _) in enumerate(choices)
+    }
+
+
+def _separar_status(resultado, choices):
+    return {valor: resultado.pop(f'status_{posicao}') for posicao, (valor, _) in enumerate(choices)}
+
+
+def _agregacoes():
+    """
+    [(nome, queryset, agregações, função que formata o resultado)], uma
+    entrada por tabela do Dashboard.
+    """
+    hoje = timezone.localdate()
+
+    def imoveis(resultado):
+        resultado['por_status'] = _separar_status(resultado, Imovel.STATUS_IMOVEL_CHOICES)
+        return resultado
+
+    def contratos(resultado):
+        resultado['por_status'] = _separar_status(resultado, Contrato.STATUS_CONTRATO_CHOICES)
+        resultado['ativos'] = resultado['por_status']['Ativo']
+        resultado['aluguel_mensal_ativo'] = formatar_valor(resultado['aluguel_mensal_ativo'])
+        return resultado
+
+    def pagamentos(resultado):
+        resultado['por_status'] = _separar_status(resultado, Pagamento.STATUS_PAGAMENTO_CHOICES)
+        resultado['pendentes'] = resultado['por_status']['Pendente']
+        resultado['em_atraso'] = resultado['por_status']['Em Atraso']
+        for chave in ('valor_pendente', 'valor_em_atraso', 'multa_juros_em_atraso'):
+            resultado[chave] = formatar_valor(resultado[chave])
+        return resultado
+
+    def manutencoes(resultado):
+        resultado['por_status'] = _separar_status(resultado, Manutencao.STATUS_MANUTENCAO_CHOICES)
+        resultado['custo_total'] = formatar_valor(resultado['custo_total'])
+        return resultado
+
+    return [
+        ('imoveis', Imovel.objects.all(), dict(
+            total=Count('id'),
+            **_contagens_por_status('status_imovel', Imovel.STATUS_IMOVEL_CHOICES),
+        ), imoveis),
+        ('contratos', Contrato.objects.all(), dict(
+            total=Count('id'),
+            aluguel_mensal_ativo=Sum('valor_aluguel', filter=Q(status_contrato='Ativo')),
+            vencendo_30_dias=Count('id', filter=Q(
+                status_contrato='Ativo', data_fim__gte=hoje, data_fim__lte=hoje + timedelta(days=30)
+            )),
+            **_contagens_por_status('status_contrato', Contrato.STATUS_CONTRATO_CHOICES),
+        ), contratos),
+        ('pagamentos', Pagamento.objects.all(), dict(
+            total=Count('id'),
+            valor_pendente=Sum('valor_pago', filter=Q(status_pagamento='Pendente')),
+            valor_em_atraso=Sum('valor_pago', filter=Q(status_pagamento='Em Atraso')),
+            multa_juros_em_atraso=Sum('multa_juros', filter=Q(status_pagamento='Em Atraso')),
+            **_contagens_por_status('status_pagamento', Pagamento.STATUS_PAGAMENTO_CHOICES),
+        ), pagamentos),
+        ('manutencoes', Manutencao.objects.all(), dict(
+            total=Count('id'),
+            custo_total=Sum('custo_manutencao'),
+            **_contagens_por_status('status_manutencao', Manutencao.STATUS_MANUTENCAO_CHOICES),
+        ), manutencoes),
+    ]
+
+
+def calcular_estatisticas():
+    """
+    Calcula os indicadores do Dashboard com uma consulta agregada por tabela.
+    """
+    estatisticas = {
+        nome: formatar(queryset.aggregate(**agregacoes))
+        for nome, queryset, agregacoes, formatar in _agregacoes()
+    }
+    estatisticas['gerado_em'] = timezone.now().isoformat()
+    return estatisticas
+
+
+async def acalcular_estatisticas():
+    """Igual a calcular_estatisticas, numa única ida à thread do banco."""
+    return await sync_to_async(calcular_estatisticas)()
+
+
+def _chave(versoes):
+    assinatura = '|'.join(f'{tabela}:{versao}:{data.isoformat() if data else ""}' for tabela, versao, data in versoes)
+    return f'{DASHBOARD_CACHE_KEY}:{hashlib.md5(assinatura.encode(), usedforsecurity=False).hexdigest()}'
+
+
+def obter_estatisticas():
+    """Retorna as estatísticas do cache ou as recalcula se necessário."""
+    chave = _chave(versoes_das_tabelas(MODELOS_DO_DASHBOARD))
+    return caches[ALIAS_CACHE].get_or_set(chave, calcular_estatisticas, DASHBOARD_CACHE_TIMEOUT)
+
+
+async def aobter_estatisticas():
+    cache = caches[ALIAS_CACHE]
+    chave = _chave(await aversoes_das_tabelas(MODELOS_DO_DASHBOARD))
+    estatisticas = await cache.aget(chave)
+    if estatisticas is None:
+        estatisticas = await acalcular_estatisticas()
+        await cache.aset(chave, estatisticas, DASHBOARD_CACHE_TIMEOUT)
+    return estatisticas
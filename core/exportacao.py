@@ -0,0 +1,202 @@
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Exportação em CSV ou XLSX de qualquer recurso, no endpoint
+#
+#     GET /api/pagamentos/exportar/?formato=csv&status_pagamento=Pago
+#
+# - Usa os mesmos filtros, recorte de campos (?fields=) e plano de consulta
+#   (select_related dos rótulos) da listagem normal.
+# - As linhas são lidas com QuerySet.iterator(chunk_size=...) — no Postgres,
+#   um cursor no servidor — e enviadas aos poucos com StreamingHttpResponse.
+#   A memória do worker fica constante e o download começa na hora, mesmo
+#   com milhões de linhas.
+# - O XLSX é montado em streaming (zip sem "seek"), sem bibliotecas extras.
+# - No CSV, textos que começam com '=', '+', '-', '@' (ou tab/CR) ganham um
+#   apóstrofo na frente: o Excel os executaria como fórmula ("CSV injection").
+#   As colunas numéricas ficam como estão, para '-300.00' continuar número.
+# - O separador do CSV (?separador=) só pode ser um de SEPARADORES; qualquer
+#   outro é 400 antes de a resposta começar (aspas ou quebras de linha
+#   quebrariam o arquivo no meio do download).
+# -----------------------------------------------------------------------------
+
+TAMANHO_CHUNK = 2000
+TAMANHO_BLOCO = 64 * 1024
+CAMPOS_NUMERICOS = (serializers.IntegerField, serializers.DecimalField, serializers.FloatField)
+CARACTERES_INVALIDOS_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+INICIO_DE_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+SEPARADORES = (',', ';', '\t', '|')
+
+
+class _Eco:
+    """Objeto com write() que só devolve o que recebe (padrão da doc do Django)."""
+
+    def write(self, valor):
+        return valor
+
+
+class _BufferZip:
+    """Destino do zipfile sem seek(): acumula os bytes até serem enviados."""
+
+    def __init__(self):
+        self.partes = []
+
+    def write(self, dados):
+        self.partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def drenar(self):
+        dados = b''.join(self.partes)
+        self.partes.clear()
+        return dados
+
+
+def _texto_seguro(valor):
+    if isinstance(valor, str) and valor.startswith(INICIO_DE_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def gerar_csv(cabecalho, linhas, separador=',', numericas=()):
+    escritor = csv.writer(_Eco(), delimiter=separador)
+    # BOM para o Excel reconhecer o arquivo como UTF-8 (acentos).
+    bloco = ['\ufeff', escritor.writerow([_texto_seguro(nome) for nome in cabecalho])]
+    tamanho = 0
+    for linha in linhas:
+        texto = escritor.writerow([
+            '' if valor is None else valor if indice in numericas else _texto_seguro(valor)
+            for indice, valor in enumerate(linha)
+        ])
+        bloco.append(texto)
+        tamanho += len(texto)
+        if tamanho >= TAMANHO_BLOCO:
+            yield ''.join(bloco).encode('utf-8')
+            bloco, tamanho = [], 0
+    if bloco:
+        yield ''.join(bloco).encode('utf-8')
+
+
+def _celula(valor, numerica):
+    if valor is None or valor == '':
+        return '<c/>'
+    if numerica:
+        return f'<c><v>{valor}</v></c>'
+    texto = escape(CARACTERES_INVALIDOS_XML.sub('', str(valor)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+XLSX_ESTATICOS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Dados" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def gerar_xlsx(cabecalho, linhas, numericas=()):
+    buffer = _BufferZip()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as arquivo:
+        for nome, conteudo in XLSX_ESTATICOS.items():
+            arquivo.writestr(nome, conteudo)
+        with arquivo.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as planilha:
+            planilha.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            planilha.write(('<row>' + ''.join(_celula(nome, False) for nome in cabecalho) + '</row>').encode())
+            for linha in linhas:
+                celulas = ''.join(_celula(valor, indice in numericas) for indice, valor in enumerate(linha))
+                planilha.write(f'<row>{celulas}</row>'.encode('utf-8'))
+                if sum(len(parte) for parte in buffer.partes) >= TAMANHO_BLOCO:
+                    yield buffer.drenar()
+            planilha.write(b'</sheetData></worksheet>')
+    yield buffer.drenar()
+
+
+FORMATOS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+
+
+class ExportacaoMixin:
+    """Adiciona a ação 'exportar' (CSV/XLSX em streaming) ao ViewSet."""
+
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def exportar(self, request):
+        formato = request.query_params.get('formato', 'csv').lower()
+        if formato not in FORMATOS:
+            raise ValidationError({'formato': [f"Use um destes: {', '.join(FORMATOS)}."]})
+        separador = request.query_params.get('separador', ',')
+        if formato == 'csv' and separador not in SEPARADORES:
+            raise ValidationError({'separador': ["Use um destes: ',', ';', '|' ou tab."]})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        ordenacao = getattr(self, 'ordenacao', None)
+        if ordenacao:
+            queryset = queryset.order_by(*ordenacao)
+        serializer = self.get_serializer()
+        campos = [nome for nome, campo in serializer.fields.items() if not campo.write_only]
+        numericas = {
+            indice for indice, nome in enumerate(campos)
+            if isinstance(serializer.fields[nome], CAMPOS_NUMERICOS)
+        }
+
+        def linhas():
+            for objeto in queryset.iterator(chunk_size=TAMANHO_CHUNK):
+                dados = serializer.to_representation(objeto)
+                yield [dados.get(nome) for nome in campos]
+
+        if formato == 'csv':
+            conteudo = gerar_csv(campos, linhas(), separador, numericas)
+        else:
+            conteudo = gerar_xlsx(campos, linhas(), numericas)
+
+        tipo, extensao = FORMATOS[formato]
+        resposta = StreamingHttpResponse(conteudo, content_type=tipo)
+        nome = f'{self.basename}-{timezone.localdate().isoformat()}.{extensao}'
+        resposta['Content-Disposition'] = f'attachment; filename="{nome}"'
+        return resposta
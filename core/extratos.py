@@ -0,0 +1,215 @@
+from collections import defaultdict
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DateField, Exists, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import TruncMonth
+
+from .calculos import CENTAVOS, data_da_manutencao, mes_do_pagamento, ultimo_dia
+from .models import Contrato, ExtratoMensal, Manutencao, Pagamento
+from .resumos import registrar_resumo
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Extratos mensais de repasse por locador (tabela ExtratoMensal). Para cada
+# locador e mês:
+#
+#   repasse = aluguéis e multas recebidos (pagamentos 'Pago' dos contratos dele)
+#           - taxa de administração (TAXA_ADMINISTRACAO_PERCENTUAL do recebido)
+#           - condomínio e IPTU do imóvel, uma vez por pagamento recebido
+#           - custo das manutenções 'Concluído' dos imóveis dele no mês
+#
+# O mês do pagamento é a 'competencia' (ou o mês de 'data_pagamento', se ela
+# estiver vazia). A manutenção entra no mês da conclusão (ou da solicitação)
+# e vai para o locador do contrato do imóvel vigente naquela data.
+#
+# A tabela é atualizada de forma INCREMENTAL: cada alteração de Pagamento,
+# Manutencao ou Contrato descobre quais pares (locador, mês) ela afeta, antes
+# e depois da gravação, e só esses extratos são recalculados (duas consultas
+# de agregação pelos índices, mais a gravação; veja core/resumos.py).
+# Cobranças pendentes e em atraso não afetam nenhum extrato, então a geração
+# de cobranças e a atualização de atrasos (core/cobrancas.py) não custam nada.
+#
+# Condomínio e IPTU são os valores do imóvel no momento do cálculo: alterar o
+# imóvel não reescreve extratos antigos. Para recalcular tudo (ex.: depois de
+# mudar a taxa), use o comando 'recalcular_resumos'.
+# -----------------------------------------------------------------------------
+
+TAXA_ADMINISTRACAO_PERCENTUAL = Decimal(str(getattr(settings, 'TAXA_ADMINISTRACAO_PERCENTUAL', '10')))
+TAMANHO_LOTE = 2000
+
+ZERO = Decimal('0')
+
+# Campos do contrato que mudam a atribuição de pagamentos e manutenções.
+CAMPOS_CONTRATO = ('locador_id', 'imovel_id', 'data_inicio')
+
+
+def _locador_da_manutencao():
+    """Locador do contrato mais recente do imóvel iniciado até a data da manutenção."""
+    return Subquery(
+        Contrato.objects.filter(imovel_id=OuterRef('imovel_id'), data_inicio__lte=OuterRef('data_ref'))
+        .order_by('-data_inicio', '-id').values('locador_id')[:1]
+    )
+
+
+def _pagamentos():
+    return Pagamento.objects.annotate(locador_ref=F('contrato__locador_id'), mes_ref=mes_do_pagamento())
+
+
+def _pagamentos_recebidos():
+    return _pagamentos().filter(status_pagamento='Pago')
+
+
+def _manutencoes_concluidas():
+    return Manutencao.objects.filter(status_manutencao='Concluído').annotate(data_ref=data_da_manutencao()).annotate(
+        locador_ref=_locador_da_manutencao(), mes_ref=TruncMonth('data_ref', output_field=DateField())
+    )
+
+
+def _pares(queryset):
+    return {(locador, mes) for locador, mes in queryset.values_list('locador_ref', 'mes_ref') if locador}
+
+
+def _pares_das_manutencoes_do_contrato(ids):
+    """
+    Pares que um contrato pode tirar ou dar a um locador: cada mês com
+    manutenção concluída no imóvel a partir do início do contrato, para cada
+    locador com contrato no imóvel. A manutenção vai para o contrato mais
+    recente iniciado até a data dela; criar, excluir ou mover o início de um
+    contrato a tira de um locador e a dá a outro, e os dois extratos mudam.
+    Como os pares cobrem todos os locadores do imóvel, calculá-los antes e
+    depois da gravação (ou só depois, num bulk_create) basta.
+    """
+    vigentes = Contrato.objects.filter(pk__in=ids, imovel_id=OuterRef('imovel_id'), data_inicio__lte=OuterRef('data_ref'))
+    # Uma consulta só: a junção com os contratos do imóvel dá os locadores.
+    return set(Manutencao.objects.filter(
+        status_manutencao='Concluído', imovel_id__in=Contrato.objects.filter(pk__in=ids).values('imovel_id'),
+    ).annotate(data_ref=data_da_manutencao()).filter(Exists(vigentes)).annotate(
+        mes_ref=TruncMonth('data_ref', output_field=DateField())
+    ).values_list('imovel__contratos__locador_id', 'mes_ref').order_by().distinct())
+
+
+def pares_afetados(model, ids, novos=False):
+    """Pares (locador_id, mês) cujos extratos dependem das linhas 'ids' de 'model'."""
+    if not ids:
+        return set()
+    if model is Pagamento:
+        return _pares(_pagamentos_recebidos().filter(pk__in=ids))
+    if model is Manutencao:
+        return _pares(_manutencoes_concluidas().filter(pk__in=ids))
+    if model is Contrato:
+        pares = set() if novos else _pares(_pagamentos_recebidos().filter(contrato_id__in=ids))
+        return pares | _pares_das_manutencoes_do_contrato(ids)
+    return set()
+
+
+# --- Cálculo ---
+
+def _somar(receitas, custos):
+    """Linhas de ExtratoMensal a partir das somas por (locador, mês)."""
+    linhas = []
+    for locador_id, mes in sorted(receitas.keys() | custos.keys()):
+        receita = receitas.get((locador_id, mes), {})
+        aluguel = receita.get('aluguel') or ZERO
+        multa_juros = receita.get('multa_juros') or ZERO
+        condominio = receita.get('condominio') or ZERO
+        iptu = receita.get('iptu') or ZERO
+        manutencoes = custos.get((locador_id, mes)) or ZERO
+        taxa = ((aluguel + multa_juros) * TAXA_ADMINISTRACAO_PERCENTUAL / 100).quantize(CENTAVOS)
+        linhas.append(ExtratoMensal(
+            locador_id=locador_id, mes=mes, pagamentos=receita.get('pagamentos', 0),
+            aluguel_recebido=aluguel, multa_juros=multa_juros, condominio=condominio, iptu=iptu,
+            manutencoes=manutencoes, taxa_administracao=taxa,
+            valor_repasse=aluguel + multa_juros - taxa - condominio - iptu - manutencoes,
+        ))
+    return linhas
+
+
+def _calcular(pagamentos, manutencoes):
+    # O status entra nas somas (CASE WHEN), não no WHERE: assim o banco filtra
+    # pelo índice (contrato, competencia), bem mais seletivo que o de status.
+    recebido = Q(status_pagamento='Pago')
+    receitas = {
+        (linha.pop('locador_ref'), linha.pop('mes_ref')): linha
+        for linha in pagamentos.values('locador_ref', 'mes_ref').annotate(
+            pagamentos=Count('id', filter=recebido),
+            aluguel=Sum('valor_pago', filter=recebido),
+            multa_juros=Sum('multa_juros', filter=recebido),
+            condominio=Sum('contrato__imovel__condominio_valor', filter=recebido),
+            iptu=Sum('contrato__imovel__iptu_valor', filter=recebido),
+        ).order_by()
+        if linha['pagamentos']
+    }
+    custos = {
+        (locador_id, mes): custo
+        for locador_id, mes, custo in manutencoes.exclude(locador_ref=None).values('locador_ref', 'mes_ref').annotate(
+            custo=Sum('custo_manutencao')
+        ).order_by().values_list('locador_ref', 'mes_ref', 'custo')
+    }
+    return receitas, custos
+
+
+def recalcular_extratos(pares):
+    """Recalcula os extratos dos pares (locador_id, mês) informados."""
+    pares = {(locador_id, mes) for locador_id, mes in pares if locador_id and mes}
+    if not pares:
+        return 0
+    locadores_por_mes = defaultdict(set)
+    for locador_id, mes in pares:
+        locadores_por_mes[mes].add(locador_id)
+    locadores = {locador_id for locador_id, _ in pares}
+    meses = sorted(locadores_por_mes)
+
+    # Filtros pelas colunas (e índices) originais, não pelas expressões do mês.
+    pagamentos = _pagamentos().filter(
+        Q(competencia__in=meses)
+        | (Q(competencia=None) & reduce(or_, (Q(data_pagamento__range=(mes, ultimo_dia(mes))) for mes in meses))),
+        # Pelos contratos: usa o índice (contrato, competencia) dos pagamentos.
+        contrato_id__in=Contrato.objects.filter(locador_id__in=locadores).values('id'),
+    )
+    manutencoes = _manutencoes_concluidas().filter(
+        reduce(or_, (
+            Q(data_conclusao__range=(mes, ultimo_dia(mes)))
+            | Q(data_conclusao=None, data_solicitacao__range=(mes, ultimo_dia(mes)))
+            for mes in meses
+        )),
+        imovel_id__in=Contrato.objects.filter(locador_id__in=locadores).values('imovel_id'),
+    )
+    receitas, custos = _calcular(pagamentos, manutencoes)
+    linhas = [linha for linha in _somar(receitas, custos) if (linha.locador_id, linha.mes) in pares]
+
+    # Sem savepoint: dentro de outra transação, o recálculo é parte dela.
+    with transaction.atomic(savepoint=False):
+        ExtratoMensal.objects.filter(reduce(or_, (
+            Q(mes=mes, locador_id__in=ids) for mes, ids in locadores_por_mes.items()
+        ))).delete()
+        ExtratoMensal.objects.bulk_create(linhas)
+    return len(linhas)
+
+
+def reconstruir_extratos(tamanho_lote=TAMANHO_LOTE):
+    """Apaga e recalcula todos os extratos com uma agregação por tabela."""
+    receitas, custos = _calcular(_pagamentos_recebidos(), _manutencoes_concluidas())
+    linhas = _somar(receitas, custos)
+    with transaction.atomic():
+        ExtratoMensal.objects.all().delete()
+        ExtratoMensal.objects.bulk_create(linhas, batch_size=tamanho_lote)
+    return len(linhas)
+
+
+# --- Leitura ---
+
+def extrato_do_mes(locador, mes):
+    """O extrato do locador no mês (zerado, sem gravar, se não houve movimento)."""
+    extrato = ExtratoMensal.objects.filter(locador=locador, mes=mes).first() or ExtratoMensal(mes=mes)
+    extrato.locador = locador
+    return extrato
+
+
+registrar_resumo(
+    'extratos', pares_afetados=pares_afetados, recalcular=recalcular_extratos,
+    reconstruir=reconstruir_extratos, campos_contrato=CAMPOS_CONTRATO,
+)
@@ -0,0 +1,82 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import exceptions
+from rest_framework.filters import BaseFilterBackend
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Filtro declarativo para os ViewSets. Cada ViewSet declara um dicionário
+# 'filtros' dizendo quais campos podem ser filtrados e com quais lookups:
+#
+#     filtros = {
+#         'status_pagamento': ['exact', 'in'],
+#         'contrato_id': ['exact', 'in'],
+#         'data_pagamento': ['gte', 'lte'],
+#     }
+#
+# Isso habilita, por exemplo:
+#     /api/pagamentos/?status_pagamento=Pendente
+#     /api/pagamentos/?status_pagamento__in=Pendente,Em Atraso
+#     /api/pagamentos/?contrato_id=3&data_pagamento__gte=2025-01-01
+#
+# Os valores são convertidos com o próprio campo do modelo (datas, números,
+# IDs) e o filtro é aplicado no banco, onde os campos filtráveis têm índice.
+# -----------------------------------------------------------------------------
+
+LOOKUPS_SUPORTADOS = {'exact', 'in', 'gt', 'gte', 'lt', 'lte', 'isnull'}
+VERDADEIRO = {'true', '1', 'sim'}
+FALSO = {'false', '0', 'nao', 'não'}
+
+
+def _converter(field, bruto):
+    """Converte o texto da URL para o tipo Python do campo do modelo."""
+    # Para chaves estrangeiras ('contrato_id'), o tipo é o da chave primária alvo.
+    alvo = field.target_field if field.is_relation else field
+    return alvo.to_python(bruto)
+
+
+def _converter_booleano(bruto):
+    valor = bruto.lower()
+    if valor in VERDADEIRO:
+        return True
+    if valor in FALSO:
+        return False
+    raise DjangoValidationError("Use 'true' ou 'false'.")
+
+
+class FiltroDeclarativoBackend(BaseFilterBackend):
+    """
+    Aplica ao queryset os filtros declarados em 'view.filtros' que estiverem
+    presentes na query string. Valores inválidos geram erro 400.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        filtros = getattr(view, 'filtros', None)
+        if not filtros:
+            return queryset
+
+        condicoes = {}
+        erros = {}
+        for campo, lookups in filtros.items():
+            field = queryset.model._meta.get_field(campo)
+            for lookup in lookups:
+                if lookup not in LOOKUPS_SUPORTADOS:
+                    raise ValueError(f"Lookup '{lookup}' não suportado em '{campo}'.")
+                parametro = campo if lookup == 'exact' else f'{campo}__{lookup}'
+                bruto = request.query_params.get(parametro)
+                if bruto is None or bruto == '':
+                    continue
+                try:
+                    if lookup == 'in':
+                        valor = [_converter(field, item.strip()) for item in bruto.split(',') if item.strip()]
+                    elif lookup == 'isnull':
+                        valor = _converter_booleano(bruto)
+                    else:
+                        valor = _converter(field, bruto)
+                except DjangoValidationError as erro:
+                    erros[parametro] = erro.messages
+                    continue
+                condicoes[f'{campo}__{lookup}'] = valor
+
+        if erros:
+            raise exceptions.ValidationError(erros)
+        return queryset.filter(**condicoes)
@@ -0,0 +1,366 @@
+import io
+import logging
+import mimetypes
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .armazenamento import armazenamento
+from .arquivos import resposta_conteudo
+from .models import FotoImovel, Imovel
+from .signals import registrar_alteracao
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Fotos dos imóveis: o original fica guardado como um Arquivo (core/arquivos.py)
+# e as versões reduzidas são geradas em segundo plano.
+#
+#   POST /api/imoveis/<id>/fotos/   multipart com 'arquivo' (a imagem), ou
+#                                   {"arquivo": <id>} de um upload em partes;
+#                                   responde 202 com a foto 'Pendente'.
+#   GET  /api/imoveis/<id>/fotos/   galeria do imóvel (URLs das variantes).
+#
+# A requisição só grava o original e cria a FotoImovel. Depois do commit, a
+# foto vai para um pool de FOTOS_WORKERS threads no próprio processo; com
+# FOTOS_WORKERS = 0, quem processa é o comando 'processar_fotos' (ex.: um
+# worker separado ou o cron). Threads bastam: o Pillow solta o GIL ao
+# decodificar, redimensionar e codificar, então as fotos andam em paralelo.
+# Cada foto é 'reservada' com um UPDATE condicional (Pendente -> Processando),
+# então vários workers (threads ou processos) nunca processam a mesma foto.
+# Se a foto falha (por qualquer exceção: nenhuma fica presa em 'Processando')
+# e ainda tem tentativas, o pool a recebe de novo depois de uma espera que
+# dobra a cada tentativa (FOTOS_ESPERA_NOVA_TENTATIVA_SEGUNDOS).
+#
+# Cada original é decodificado uma vez: a versão 'web' sai dele e a
+# 'miniatura' sai da versão 'web', já pequena. Para JPEG, o draft() do Pillow
+# decodifica direto numa escala reduzida. As variantes são WebP e ficam no
+# armazenamento como derivados do hash do original, então o mesmo original
+# em dois imóveis é processado uma vez só.
+#
+# As URLs das variantes (/api/imagens/<sha256>/<variante>-v<versão>.webp)
+# nunca mudam de conteúdo: são servidas com cache imutável de um ano. Mudou
+# o tamanho ou a qualidade? Suba VERSAO_VARIANTES e rode
+# 'processar_fotos --reprocessar': as URLs novas substituem as antigas.
+#
+# A lista de imóveis não lê as fotos: Imovel.miniatura guarda a URL da
+# miniatura da primeira foto pronta e é atualizada aqui (atualizar_capas).
+# -----------------------------------------------------------------------------
+
+VERSAO_VARIANTES = 1
+FORMATO = 'WEBP'
+TIPO_CONTEUDO = 'image/webp'
+# Falhas esperadas de um arquivo ruim; as demais também são tratadas, mas
+# vão para o log com o traceback.
+ERROS_DE_IMAGEM = (OSError, ValueError, Image.DecompressionBombError)
+
+logger = logging.getLogger(__name__)
+
+# (largura, altura, recortar, qualidade). A miniatura é recortada no tamanho
+# exato (a tabela tem células iguais); a versão web só é reduzida.
+VARIANTES = {
+    'web': (1600, 1200, False, 82),
+    'miniatura': (320, 240, True, 75),
+}
+
+# Orientações do EXIF em que a imagem está deitada (largura e altura trocam).
+ORIENTACOES_DEITADAS = {5, 6, 7, 8}
+TAMANHO_ERRO = 255
+TIPOS_DE_FOTO = frozenset({'image/jpeg', 'image/png', 'image/webp', 'image/gif'})
+RE_SHA256 = re.compile(r'[0-9a-f]{64}')
+
+_pool = None
+_trava_pool = threading.Lock()
+
+
+def nome_variante(variante):
+    return f'{variante}-v{VERSAO_VARIANTES}.webp'
+
+
+NOMES_VARIANTES = {nome_variante(variante): variante for variante in VARIANTES}
+
+
+def url_variante(sha256, variante):
+    return f'/api/imagens/{sha256}/{nome_variante(variante)}'
+
+
+def _url_da_miniatura(coluna_sha256):
+    """A URL da miniatura montada no próprio banco, a partir da coluna do hash."""
+    return Concat(Value('/api/imagens/'), coluna_sha256, Value(f"/{nome_variante('miniatura')}"))
+
+
+def eh_imagem(tipo_conteudo, nome=''):
+    """
+    Se o tipo informado (ou, se ele for genérico, o deduzido do nome) é de
+    uma imagem aceita como foto. SVG não entra: pode conter scripts.
+    """
+    if not tipo_conteudo or tipo_conteudo == 'application/octet-stream':
+        tipo_conteudo = mimetypes.guess_type(nome)[0] or ''
+    return tipo_conteudo.split(';')[0].strip().lower() in TIPOS_DE_FOTO
+
+
+def dados_da_foto(foto):
+    pronta = foto.status == 'Pronta'
+    sha256 = foto.arquivo.sha256
+    return {
+        'id': foto.pk, 'imovel': foto.imovel_id, 'legenda': foto.legenda, 'ordem': foto.ordem,
+        'status': foto.status, 'largura': foto.largura, 'altura': foto.altura,
+        'miniatura': url_variante(sha256, 'miniatura') if pronta else None,
+        'web': url_variante(sha256, 'web') if pronta else None,
+        'original': f'/api/arquivos/{foto.arquivo_id}/conteudo/',
+        'erro': foto.erro or None,
+    }
+
+
+# --- Fila ---
+
+def _executor():
+    global _pool
+    with _trava_pool:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(settings.FOTOS_WORKERS, thread_name_prefix='fotos')
+        return _pool
+
+
+def _processar_em_segundo_plano(pk):
+    try:
+        return processar_foto(pk)
+    finally:
+        # Cada thread do pool tem as suas conexões com o banco.
+        connections.close_all()
+
+
+def _processar_no_pool(pk):
+    """Processa uma foto agendada e, se falhou com tentativas sobrando, a agenda de novo."""
+    try:
+        situacao = processar_foto(pk)
+        if situacao == 'Pendente':
+            tentativas = FotoImovel.objects.values_list('tentativas', flat=True).get(pk=pk)
+            agendar([pk], atraso=settings.FOTOS_ESPERA_NOVA_TENTATIVA_SEGUNDOS * 2 ** (tentativas - 1))
+        return situacao
+    finally:
+        connections.close_all()
+
+
+def agendar(ids, atraso=0):
+    """
+    Manda as fotos para o pool depois do commit, após 'atraso' segundos
+    (nada, se FOTOS_WORKERS = 0).
+    """
+    if settings.FOTOS_WORKERS <= 0:
+        return
+
+    def enviar():
+        executor = _executor()
+        for pk in ids:
+            executor.submit(_processar_no_pool, pk)
+
+    def enviar_depois():
+        temporizador = threading.Timer(atraso, enviar)
+        temporizador.daemon = True
+        temporizador.start()
+    transaction.on_commit(enviar_depois if atraso > 0 else enviar)
+
+
+def adicionar_foto(imovel, arquivo, legenda='', ordem=None):
+    """Cria a foto (ao fim da galeria, se 'ordem' não vier) e agenda o processamento."""
+    if ordem is None:
+        ordem = FotoImovel.objects.filter(imovel=imovel).count()
+    foto = FotoImovel.objects.create(imovel=imovel, arquivo=arquivo, legenda=legenda[:255], ordem=ordem)
+    agendar([foto.pk])
+    return foto
+
+
+def _reservar(pk):
+    """Marca a foto como 'Processando'; False se outro worker chegou antes."""
+    return bool(FotoImovel.objects.filter(pk=pk, status='Pendente').update(
+        status='Processando', tentativas=F('tentativas') + 1, atualizado_em=timezone.now()
+    ))
+
+
+def liberar_travadas(agora=None):
+    """Devolve à fila as fotos 'Processando' há mais de FOTOS_PROCESSAMENTO_EXPIRA_MINUTOS."""
+    limite = (agora or timezone.now()) - timedelta(minutes=settings.FOTOS_PROCESSAMENTO_EXPIRA_MINUTOS)
+    return FotoImovel.objects.filter(status='Processando', atualizado_em__lt=limite).update(
+        status='Pendente', atualizado_em=timezone.now()
+    )
+
+
+def reprocessar(ids=None):
+    """Põe de volta na fila as fotos com erro ou com variantes de outra versão."""
+    fotos = FotoImovel.objects.filter(Q(status='Erro') | Q(status='Pronta', versao__lt=VERSAO_VARIANTES))
+    if ids is not None:
+        fotos = fotos.filter(pk__in=ids)
+    return fotos.update(status='Pendente', tentativas=0, erro='', atualizado_em=timezone.now())
+
+
+# --- Processamento ---
+
+def _dimensoes(imagem):
+    """Largura e altura da imagem como ela é exibida (orientação do EXIF)."""
+    largura, altura = imagem.size
+    if imagem.getexif().get(0x0112) in ORIENTACOES_DEITADAS:
+        return altura, largura
+    return largura, altura
+
+
+def _codificar(imagem, qualidade):
+    saida = io.BytesIO()
+    imagem.save(saida, FORMATO, quality=qualidade, method=4)
+    return saida.getvalue()
+
+
+def gerar_variantes(origem):
+    """
+    Lê a imagem de 'origem' (um arquivo aberto) e devolve
+    ((largura, altura), {nome do arquivo: bytes}) com todas as variantes.
+    """
+    with Image.open(origem) as imagem:
+        dimensoes = _dimensoes(imagem)
+        maior_lado = max(max(largura, altura) for largura, altura, _, _ in VARIANTES.values())
+        # JPEG: decodifica direto numa escala menor (1/2, 1/4, 1/8), se couber.
+        imagem.draft('RGB', (maior_lado, maior_lado))
+        imagem = ImageOps.exif_transpose(imagem)
+        modo = 'RGBA' if imagem.mode in ('RGBA', 'LA') or 'transparency' in imagem.info else 'RGB'
+        atual = imagem.convert(modo)
+
+    variantes = {}
+    # Da maior para a menor: cada variante parte da anterior, já reduzida.
+    for variante, (largura, altura, recortar, qualidade) in sorted(
+        VARIANTES.items(), key=lambda item: -item[1][0] * item[1][1]
+    ):
+        if recortar:
+            reduzida = ImageOps.fit(atual, (largura, altura), Image.Resampling.LANCZOS)
+        else:
+            reduzida = atual.copy()
+            reduzida.thumbnail((largura, altura), Image.Resampling.LANCZOS)
+        variantes[nome_variante(variante)] = _codificar(reduzida, qualidade)
+        atual = reduzida
+    return dimensoes, variantes
+
+
+def processar_foto(pk):
+    """
+    Gera (ou reaproveita) as variantes de uma foto 'Pendente'. Devolve o
+    status final, ou None se a foto não estava na fila.
+    """
+    if not _reservar(pk):
+        return None
+    foto = FotoImovel.objects.select_related('arquivo').get(pk=pk)
+    sha256 = foto.arquivo.sha256
+    backend = armazenamento()
+    try:
+        with backend.abrir(sha256) as origem:
+            faltando = [nome for nome in NOMES_VARIANTES if not backend.existe_derivado(sha256, nome)]
+            if faltando:
+                dimensoes, variantes = gerar_variantes(origem)
+                for nome in faltando:
+                    backend.gravar_derivado(sha256, nome, variantes[nome])
+            else:
+                # O mesmo original já foi processado para outra foto: só as dimensões.
+                with Image.open(origem) as imagem:
+                    dimensoes = _dimensoes(imagem)
+    except Exception as erro:
+        # Arquivo que não é imagem (UnidentifiedImageError é um OSError),
+        # truncado, grande demais para decodificar com segurança, ou um erro
+        # inesperado: a foto volta à fila ou fica com 'Erro', nunca 'Processando'.
+        if not isinstance(erro, ERROS_DE_IMAGEM):
+            logger.exception('Erro inesperado ao processar a foto %s', pk)
+        situacao = 'Pendente' if foto.tentativas < settings.FOTOS_TENTATIVAS_MAXIMAS else 'Erro'
+        FotoImovel.objects.filter(pk=pk).update(
+            status=situacao, erro=f'{type(erro).__name__}: {erro}'[:TAMANHO_ERRO], atualizado_em=timezone.now()
+        )
+        registrar_alteracao(FotoImovel)
+        return situacao
+
+    FotoImovel.objects.filter(pk=pk).update(
+        status='Pronta', largura=dimensoes[0], altura=dimensoes[1], versao=VERSAO_VARIANTES, erro='',
+        atualizado_em=timezone.now(),
+    )
+    registrar_alteracao(FotoImovel)
+    atualizar_capas([foto.imovel_id])
+    return 'Pronta'
+
+
+def processar_pendentes(workers=1, limite=None):
+    """
+    Processa a fila (fotos 'Pendente') com 'workers' threads. Devolve
+    {status final: quantidade}.
+    """
+    liberar_travadas()
+    ids = FotoImovel.objects.filter(status='Pendente').order_by('atualizado_em', 'id').values_list('pk', flat=True)
+    ids = list(ids[:limite] if limite else ids)
+    if workers <= 1:
+        resultados = [processar_foto(pk) for pk in ids]
+    else:
+        with ThreadPoolExecutor(workers, thread_name_prefix='fotos') as executor:
+            resultados = list(executor.map(_processar_em_segundo_plano, ids))
+    contagem = {}
+    for situacao in resultados:
+        if situacao:
+            contagem[situacao] = contagem.get(situacao, 0) + 1
+    return contagem
+
+
+# --- Capa dos imóveis ---
+
+def atualizar_capas(imovel_ids):
+    """Recalcula Imovel.miniatura (primeira foto pronta, pela ordem) num só UPDATE."""
+    capa = FotoImovel.objects.filter(imovel_id=OuterRef('pk'), status='Pronta').order_by('ordem', 'id')
+    alterados = Imovel.objects.filter(pk__in=imovel_ids).update(
+        miniatura=Subquery(capa.annotate(url=_url_da_miniatura('arquivo__sha256')).values('url')[:1])
+    )
+    if alterados:
+        registrar_alteracao(Imovel)
+    return alterados
+
+
+# --- API ---
+
+def atualizar_foto(foto, dados):
+    """Altera legenda e/ou ordem da foto; ValueError se os dados forem inválidos."""
+    if 'legenda' in dados:
+        foto.legenda = str(dados['legenda'] or '')[:255]
+    if 'ordem' in dados:
+        foto.ordem = interpretar_ordem(dados['ordem'])
+    foto.save(update_fields=['legenda', 'ordem', 'atualizado_em'])
+    if 'ordem' in dados:
+        atualizar_capas([foto.imovel_id])
+    return foto
+
+
+def excluir_foto(foto):
+    """Exclui a foto. O original fica até o 'limpar_arquivos', se ninguém mais o usar."""
+    foto.delete()
+    atualizar_capas([foto.imovel_id])
+
+
+def interpretar_ordem(valor):
+    try:
+        ordem = int(valor)
+    except (TypeError, ValueError):
+        raise ValueError("A 'ordem' deve ser um número inteiro.")
+    if not 0 <= ordem <= 32767:
+        raise ValueError("A 'ordem' deve estar entre 0 e 32767.")
+    return ordem
+
+
+def resposta_variante(request, sha256, nome):
+    """Resposta com a variante (imutável), ou None se ela não existe."""
+    if nome not in NOMES_VARIANTES or not RE_SHA256.fullmatch(sha256):
+        return None
+    backend = armazenamento()
+    tamanho = backend.tamanho_derivado(sha256, nome)
+    if tamanho is None:
+        return None
+    return resposta_conteudo(
+        request, backend, backend.caminho_relativo_derivado(sha256, nome),
+        lambda: backend.abrir_derivado(sha256, nome), f'{sha256}-{nome}', tamanho, TIPO_CONTEUDO,
+    )
@@ -0,0 +1,350 @@
+import codecs
+import csv
+import hashlib
+import itertools
+import json
+import re
+import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+
+from .lote import ListaEmLoteSerializer, _carregar_chaves_estrangeiras
+from .models import Importacao
+from .serializers import (
+    ChaveEstrangeiraField,
+    ImovelSerializer,
+    LocadorSerializer,
+    LocatarioSerializer,
+    FiadorSerializer,
+    IntermediarioSerializer,
+    ContratoSerializer,
+    PagamentoSerializer,
+    ManutencaoSerializer,
+    DocumentoSerializer,
+)
+from .resumos import afeta_resumos, atualizar_resumos
+from .signals import registrar_alteracao
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Importação em massa de arquivos CSV ou JSON (lista ou uma linha por objeto),
+# pelo comando 'python manage.py importar_dados' ou por upload em
+# 'POST <endpoint>/importar/'.
+#
+# - O arquivo é lido em streaming e processado em blocos de N linhas.
+# - Cada bloco é validado pelos serializers do app. As referências a outros
+#   registros podem usar o id ('locador_id') ou uma chave natural
+#   ('locador__cpf_cnpj', 'locador__email', 'imovel__endereco'), resolvida com
+#   UMA consulta por coluna e por bloco. Campos únicos também são conferidos
+#   com uma consulta por bloco, e não por linha.
+# - Cada bloco é gravado com bulk_create numa transação que também grava o
+#   ponto de retomada (modelo Importacao). Se a importação for interrompida,
+#   rodar de novo o mesmo arquivo continua do último bloco confirmado.
+# - Se o banco recusar o bloco (ex.: um cpf_cnpj gravado em paralelo depois
+#   da conferência), ele é refeito linha a linha, cada uma num savepoint, e
+#   só as linhas em conflito são relatadas como erro.
+# -----------------------------------------------------------------------------
+
+TAMANHO_LOTE = 1000
+TAMANHO_LEITURA = 64 * 1024
+MAXIMO_ERROS_RELATORIO = 100
+
+RECURSOS = {
+    'imoveis': ImovelSerializer,
+    'locadores': LocadorSerializer,
+    'locatarios': LocatarioSerializer,
+    'fiadores': FiadorSerializer,
+    'intermediarios': IntermediarioSerializer,
+    'contratos': ContratoSerializer,
+    'pagamentos': PagamentoSerializer,
+    'manutencoes': ManutencaoSerializer,
+    'documentos': DocumentoSerializer,
+}
+
+FORMATOS = {'.csv': 'csv', '.json': 'json', '.jsonl': 'json', '.ndjson': 'json'}
+SEPARADORES_JSON = re.compile(r'[\s,\[\]]*')
+AMBIGUO = object()
+
+
+# --- Leitura dos arquivos ----------------------------------------------------
+
+def formato_do_arquivo(nome, formato=None):
+    if formato:
+        formato = formato.lower()
+    else:
+        extensao = nome[nome.rfind('.'):].lower() if '.' in nome else ''
+        formato = FORMATOS.get(extensao)
+    if formato not in ('csv', 'json'):
+        raise ValueError('Formato não reconhecido. Use um arquivo .csv ou .json.')
+    return formato
+
+
+def ler_csv(arquivo):
+    """Gera um dicionário por linha. Aceita ',' ou ';' como separador."""
+    linhas = codecs.getreader('utf-8-sig')(arquivo)
+    cabecalho = next(linhas, '')
+    separador = ';' if cabecalho.count(';') > cabecalho.count(',') else ','
+    for linha in csv.DictReader(itertools.chain([cabecalho], linhas), delimiter=separador):
+        # Células vazias ficam de fora: o campo assume o padrão do modelo.
+        yield {
+            chave.strip(): valor for chave, valor in linha.items()
+            if chave and valor not in ('', None)
+        }
+
+
+def ler_json(arquivo):
+    """Gera os objetos de uma lista JSON ou de um arquivo com um objeto por linha."""
+    leitor = codecs.getreader('utf-8-sig')(arquivo)
+    decodificador = json.JSONDecoder()
+    buffer = ''
+    posicao = 0
+    fim = False
+    while True:
+        parte = leitor.read(TAMANHO_LEITURA)
+        fim = not parte
+        buffer = buffer[posicao:] + parte
+        posicao = 0
+        while True:
+            posicao = SEPARADORES_JSON.match(buffer, posicao).end()
+            if posicao >= len(buffer):
+                break
+            try:
+                objeto, posicao_final = decodificador.raw_decode(buffer, posicao)
+            except json.JSONDecodeError:
+                if fim:
+                    raise ValueError('JSON inválido perto do fim do arquivo.')
+                break  # Objeto incompleto: lê mais um pedaço do arquivo.
+            posicao = posicao_final
+            yield objeto
+        if fim:
+            return
+
+
+def hash_do_arquivo(arquivo):
+    sha = hashlib.sha256()
+    for bloco in iter(lambda: arquivo.read(TAMANHO_LEITURA), b''):
+        sha.update(bloco)
+    arquivo.seek(0)
+    return sha.hexdigest()
+
+
+# --- Validação em blocos -----------------------------------------------------
+
+def _referencias(child):
+    """Colunas de chave natural aceitas para cada chave estrangeira do serializer."""
+    referencias = []
+    for nome, campo in child.fields.items():
+        if not isinstance(campo, ChaveEstrangeiraField) or campo.read_only:
+            continue
+        modelo = campo.get_queryset().model
+        for chave in getattr(modelo, 'CHAVES_NATURAIS', []):
+            referencias.append((nome, f'{campo.source}__{chave}', modelo, chave))
+    return referencias
+
+
+def _campos_unicos(child):
+    """
+    Tira os UniqueValidator dos campos (uma consulta por linha) e devolve
+    [(campo, validador)] para conferir o bloco inteiro de uma vez.
+    """
+    unicos = []
+    for nome, campo in child.fields.items():
+        validadores = [v for v in campo.validators if isinstance(v, UniqueValidator)]
+        if validadores:
+            campo.validators = [v for v in campo.validators if not isinstance(v, UniqueValidator)]
+            unicos.append((campo.source, validadores[0]))
+    return unicos
+
+
+def _resolver_chaves_naturais(referencias, itens, erros):
+    for nome, coluna, modelo, chave in referencias:
+        valores = {item[coluna] for item in itens if isinstance(item, dict) and coluna in item}
+        if not valores:
+            continue
+        # Cache do bloco: uma consulta por coluna, não por linha.
+        encontrados = {}
+        for valor, pk in modelo.objects.filter(**{f'{chave}__in': valores}).values_list(chave, 'pk'):
+            encontrados[valor] = AMBIGUO if valor in encontrados else pk
+        for indice, item in enumerate(itens):
+            if not isinstance(item, dict) or coluna not in item:
+                continue
+            valor = item.pop(coluna)
+            pk = encontrados.get(valor)
+            if pk is None:
+                erros.setdefault(indice, {})[coluna] = [f'{modelo._meta.verbose_name} "{valor}" não encontrado.']
+            elif pk is AMBIGUO:
+                erros.setdefault(indice, {})[coluna] = [f'Mais de um {modelo._meta.verbose_name} com "{valor}".']
+            else:
+                item.setdefault(nome, pk)
+
+
+def _conferir_unicos(model, unicos, validos, erros):
+    for origem, validador in unicos:
+        valores = [dados[origem] for _, dados in validos if dados.get(origem) is not None]
+        existentes = set(model.objects.filter(**{f'{origem}__in': valores}).values_list(origem, flat=True))
+        vistos = set()
+        for indice, dados in validos:
+            valor = dados.get(origem)
+            if valor is None:
+                continue
+            if valor in existentes or valor in vistos:
+                erros.setdefault(indice, {})[origem] = [str(validador.message)]
+            vistos.add(valor)
+    return [(indice, dados) for indice, dados in validos if indice not in erros]
+
+
+def _validar_bloco(serializer_class, contexto, referencias, itens):
+    """Devolve ([(indice, dados_validados)], {indice: erros}) de um bloco."""
+    child = serializer_class(context=contexto)
+    unicos = _campos_unicos(child)
+    erros = {}
+    _resolver_chaves_naturais(referencias, itens, erros)
+    pendentes = [(indice, item) for indice, item in enumerate(itens) if indice not in erros]
+    _carregar_chaves_estrangeiras(child, [item for _, item in pendentes])
+    lista = ListaEmLoteSerializer(child=child, data=[item for _, item in pendentes], context=contexto)
+    lista.validar_itens()
+    for erro in lista.erros:
+        erros[pendentes[erro['indice']][0]] = erro['erros']
+    validos = [(pendentes[posicao][0], dados) for posicao, dados in lista.validos]
+    return _conferir_unicos(child.Meta.model, unicos, validos, erros), erros
+
+
+# --- Importação ----------------------------------------------------------------
+
+def importar(arquivo, serializer_class, nome_arquivo='', formato=None, tamanho_lote=TAMANHO_LOTE,
+             reiniciar=False, contexto=None, ao_progredir=None):
+    """
+    Importa um arquivo (aberto em modo binário) com o serializer indicado e
+    devolve um resumo. 'ao_progredir' recebe o resumo parcial a cada bloco.
+    """
+    formato = formato_do_arquivo(nome_arquivo, formato)
+    model = serializer_class.Meta.model
+    recurso = model._meta.model_name
+    contexto = contexto or {}
+
+    importacao, _ = Importacao.objects.get_or_create(
+        recurso=recurso, hash_arquivo=hash_do_arquivo(arquivo), defaults={'nome_arquivo': nome_arquivo[:255]}
+    )
+    if reiniciar:
+        Importacao.objects.filter(pk=importacao.pk).update(
+            linhas_processadas=0, criados=0, erros=0, status='Em Andamento'
+        )
+        importacao.refresh_from_db()
+
+    inicio = time.perf_counter()
+    retomada = importacao.linhas_processadas
+    resumo = {
+        'importacao_id': importacao.pk,
+        'recurso': recurso,
+        'retomada_da_linha': retomada,
+        'linhas': 0,
+        'criados': 0,
+        'total_erros': 0,
+        'erros': [],
+    }
+
+    if importacao.status != 'Concluída':
+        referencias = _referencias(serializer_class(context=contexto))
+        registros = ler_csv(arquivo) if formato == 'csv' else ler_json(arquivo)
+        # Linhas já confirmadas numa execução anterior são só puladas.
+        registros = itertools.islice(registros, retomada, None)
+
+        primeira_linha = retomada
+        while True:
+            itens = list(itertools.islice(registros, tamanho_lote))
+            if not itens:
+                break
+            validos, erros = _validar_bloco(serializer_class, contexto, referencias, itens)
+            objetos = [model(**dados) for _, dados in validos]
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create(objetos, batch_size=500)
+                    _confirmar_bloco(model, importacao, objetos, len(itens), erros)
+            except IntegrityError:
+                # Conflito com gravações feitas em paralelo: o bloco é refeito
+                # linha a linha e só as linhas em conflito viram erro.
+                with transaction.atomic():
+                    objetos = _gravar_linha_a_linha(model, validos, erros)
+                    _confirmar_bloco(model, importacao, objetos, len(itens), erros)
+
+            resumo['linhas'] += len(itens)
+            resumo['criados'] += len(objetos)
+            resumo['total_erros'] += len(erros)
+            for indice in sorted(erros):
+                if len(resumo['erros']) >= MAXIMO_ERROS_RELATORIO:
+                    break
+                # 'linha' é a posição do registro no arquivo (1 = primeiro registro).
+                resumo['erros'].append({'linha': primeira_linha + indice + 1, 'erros': erros[indice]})
+            primeira_linha += len(itens)
+            if ao_progredir:
+                ao_progredir(_com_velocidade(resumo, inicio))
+
+        Importacao.objects.filter(pk=importacao.pk).update(status='Concluída', atualizada_em=timezone.now())
+        if resumo['criados']:
+            registrar_alteracao(model)
+
+    resumo['status'] = 'Concluída'
+    return _com_velocidade(resumo, inicio)
+
+
+def _confirmar_bloco(model, importacao, objetos, linhas, erros):
+    """Atualiza os resumos e o ponto de retomada, na transação do bloco."""
+    atualizar_resumos(model, [objeto.pk for objeto in objetos if afeta_resumos(objeto)], novos=True)
+    Importacao.objects.filter(pk=importacao.pk).update(
+        linhas_processadas=F('linhas_processadas') + linhas,
+        criados=F('criados') + len(objetos),
+        erros=F('erros') + len(erros),
+        atualizada_em=timezone.now(),
+    )
+
+
+def _gravar_linha_a_linha(model, validos, erros):
+    """Grava cada linha no seu savepoint; as recusadas pelo banco vão para 'erros'."""
+    objetos = []
+    for indice, dados in validos:
+        objeto = model(**dados)
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([objeto])
+        except IntegrityError as erro:
+            erros[indice] = {'detail': [f'Conflito ao gravar a linha: {erro}']}
+        else:
+            objetos.append(objeto)
+    return objetos
+
+
+def _com_velocidade(resumo, inicio):
+    segundos = time.perf_counter() - inicio
+    resumo['segundos'] = round(segundos, 3)
+    resumo['linhas_por_segundo'] = round(resumo['linhas'] / segundos) if segundos else 0
+    return resumo
+
+
+class ImportacaoMixin:
+    """Adiciona a ação 'importar' (upload de CSV/JSON) ao ViewSet."""
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser, FormParser],
+            pagination_class=None, filter_backends=[])
+    def importar(self, request):
+        arquivo = request.FILES.get('arquivo')
+        if arquivo is None:
+            raise ValidationError({'arquivo': ['Envie o arquivo no campo "arquivo".']})
+        try:
+            resumo = importar(
+                arquivo,
+                self.get_serializer_class(),
+                nome_arquivo=arquivo.name,
+                formato=request.data.get('formato'),
+                reiniciar=str(request.data.get('reiniciar', '')).lower() in ('1', 'true', 'sim'),
+                contexto=self.get_serializer_context(),
+            )
+        except ValueError as erro:
+            raise ValidationError({'detail': str(erro)})
+        return Response(resumo)
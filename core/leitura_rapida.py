@@ -0,0 +1,174 @@
+from functools import lru_cache
+from types import SimpleNamespace
+
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .consultas import campos_da_requisicao, nomes_dos_campos
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Caminho rápido para as listas (GET), sem instanciar modelos nem passar pelo
+# to_representation de cada campo do DRF.
+#
+# - As linhas vêm de QuerySet.values(), já com as colunas dos rótulos dos
+#   relacionamentos (os mesmos caminhos de CAMPOS_STR, via JOIN).
+# - Para cada serializer (e recorte de '?fields='), monta-se uma única vez a
+#   lista de (nome, coluna, conversor). Os conversores reproduzem o DRF:
+#   Decimal vira '1500.00', data vira 'AAAA-MM-DD', e o rótulo de uma chave
+#   estrangeira é o __str__ do modelo relacionado, chamado sobre os valores
+#   lidos (sem criar o objeto).
+# - As linhas já saem só com str/int/None, então o JSONRenderer não precisa
+#   converter nada: o resultado é idêntico, byte a byte, ao do serializer.
+#
+# Serializers com campos que não dá para montar assim (métodos, serializers
+# aninhados, fontes com '.') continuam no caminho normal.
+# -----------------------------------------------------------------------------
+
+
+def _identidade(valor):
+    return valor
+
+
+def _conversor_decimal(campo):
+    casas = campo.decimal_places
+
+    def converter(valor):
+        # O banco já devolve o Decimal com as casas do campo; só em outros
+        # casos recorremos ao arredondamento do próprio DRF.
+        if valor.as_tuple().exponent == -casas:
+            return f'{valor:f}'
+        return campo.to_representation(valor)
+    return converter
+
+
+def _conversor_data(valor):
+    return valor.isoformat()
+
+
+def _conversor(campo):
+    if not campo.source or campo.source == '*' or '.' in campo.source:
+        return None
+    if isinstance(campo, serializers.DecimalField) and getattr(campo, 'coerce_to_string', True) and not campo.localize:
+        return _conversor_decimal(campo)
+    if isinstance(campo, serializers.DateField) and getattr(campo, 'format', 'iso-8601').lower() == 'iso-8601':
+        return _conversor_data
+    if isinstance(campo, (serializers.ChoiceField, serializers.CharField, serializers.IntegerField)):
+        return _identidade
+    if isinstance(campo, (serializers.DateTimeField, serializers.BooleanField, serializers.FloatField)):
+        return campo.to_representation
+    return None
+
+
+def _caminhos_do_rotulo(model):
+    """Caminhos que o __str__ do modelo lê (CAMPOS_STR), mais a chave primária."""
+    caminhos = getattr(model, 'CAMPOS_STR', None)
+    if caminhos is None:
+        return None
+    return [model._meta.pk.attname, *caminhos]
+
+
+def _rotulo(model, origem, caminhos):
+    """Conversor que monta o __str__ de 'model' a partir das colunas da linha."""
+    colunas = [(f'{origem}__{caminho}', caminho.split('__')) for caminho in caminhos]
+    coluna_pk = colunas[0][0]
+    metodo_str = model.__str__
+    pk = model._meta.pk.attname
+
+    def rotular(linha):
+        if linha[coluna_pk] is None:
+            return None
+        objeto = SimpleNamespace()
+        for coluna, partes in colunas:
+            atual = objeto
+            for parte in partes[:-1]:
+                if not hasattr(atual, parte):
+                    setattr(atual, parte, SimpleNamespace())
+                atual = getattr(atual, parte)
+            setattr(atual, partes[-1], linha[coluna])
+        objeto.pk = getattr(objeto, pk)
+        return metodo_str(objeto)
+    return rotular, [coluna for coluna, _ in colunas]
+
+
+class LeitorRapido:
+    """Converte as linhas de values() no mesmo formato do serializer."""
+
+    def __init__(self, colunas, campos):
+        self.colunas = colunas
+        self.campos = campos
+
+    def preparar(self, queryset, colunas_extras=()):
+        # values() já faz os JOINs dos rótulos; prefetch não se aplica a dicionários.
+        return queryset.prefetch_related(None).values(*dict.fromkeys([*self.colunas, *colunas_extras]))
+
+    def converter(self, linhas):
+        campos = self.campos
+        resultado = []
+        for linha in linhas:
+            item = {}
+            for nome, coluna, conversor, por_linha in campos:
+                if por_linha:
+                    item[nome] = conversor(linha)
+                else:
+                    valor = linha[coluna]
+                    item[nome] = None if valor is None else conversor(valor)
+            resultado.append(item)
+        return resultado
+
+
+@lru_cache(maxsize=1024)
+def leitor_rapido(serializer_class, campos=None):
+    """
+    Monta (uma vez) o leitor de um serializer, ou devolve None se algum campo
+    não puder ser lido direto das colunas.
+    """
+    serializer = serializer_class()
+    colunas = []
+    campos_leitor = []
+    for nome, campo in serializer.fields.items():
+        if campo.write_only or (campos is not None and nome not in campos):
+            continue
+        if isinstance(campo, serializers.StringRelatedField):
+            relacionado = serializer_class.Meta.model._meta.get_field(campo.source).related_model
+            caminhos = _caminhos_do_rotulo(relacionado)
+            if caminhos is None:
+                return None
+            rotular, colunas_rotulo = _rotulo(relacionado, campo.source, caminhos)
+            colunas.extend(colunas_rotulo)
+            campos_leitor.append((nome, None, rotular, True))
+            continue
+        if isinstance(campo, serializers.PrimaryKeyRelatedField):
+            if campo.pk_field is not None:
+                return None
+            colunas.append(campo.source)
+            campos_leitor.append((nome, campo.source, _identidade, False))
+            continue
+        conversor = _conversor(campo)
+        if conversor is None:
+            return None
+        colunas.append(campo.source)
+        campos_leitor.append((nome, campo.source, conversor, False))
+    return LeitorRapido(colunas, campos_leitor)
+
+
+class ListaRapidaMixin:
+    """
+    Usa o LeitorRapido nas listas quando o serializer permite. O atributo
+    'lista_rapida = False' desliga o caminho rápido num ViewSet.
+    """
+    lista_rapida = True
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        campos = campos_da_requisicao(request, nomes_dos_campos(serializer_class))
+        leitor = leitor_rapido(serializer_class, campos) if self.lista_rapida else None
+        if leitor is None:
+            return super().list(request, *args, **kwargs)
+
+        campos_ordenacao = [campo.lstrip('-') for campo in getattr(self, 'ordenacao', ())]
+        queryset = leitor.preparar(self.filter_queryset(self.get_queryset()), campos_ordenacao)
+        pagina = self.paginate_queryset(queryset)
+        if pagina is not None:
+            return self.get_paginated_response(leitor.converter(pagina))
+        return Response(leitor.converter(queryset))
@@ -0,0 +1,205 @@
+import logging
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import ProtectedError
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .resumos import afeta_resumos, atualizar_resumos, pares_dos_resumos
+from .serializers import ChaveEstrangeiraField
+from .signals import registrar_alteracao
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Operações em lote para todos os ViewSets, no endpoint '<endpoint>/lote/':
+#
+#   POST   /api/pagamentos/lote/   [{...}, {...}]           -> cria vários
+#   PATCH  /api/pagamentos/lote/   [{"id": 1, ...}, ...]    -> altera vários
+#   PUT    /api/pagamentos/lote/   [{"id": 1, ...}, ...]    -> substitui vários
+#   DELETE /api/pagamentos/lote/   {"ids": [1, 2, 3]}       -> exclui vários
+#
+# Todos os itens são validados pelo mesmo serializer (many=True). Os objetos
+# das chaves estrangeiras (ex.: 'contrato_id') são buscados em UMA consulta
+# por campo, e a gravação usa bulk_create/bulk_update numa única transação.
+# Itens inválidos não impedem os válidos: a resposta lista os erros por índice.
+# -----------------------------------------------------------------------------
+
+MAXIMO_ITENS_LOTE = 5000
+
+logger = logging.getLogger(__name__)
+
+
+def _pk(model, valor):
+    """Converte um id vindo do JSON ('3' ou 3) para o tipo da chave primária."""
+    if valor is None or isinstance(valor, bool):
+        return None
+    try:
+        return model._meta.pk.to_python(valor)
+    except DjangoValidationError:
+        return None
+
+
+def _conflito(model):
+    """409 com mensagem fixa: o texto do IntegrityError (tabelas, valores) só vai para o log."""
+    logger.exception('Conflito ao gravar o lote de %s', model._meta.label)
+    return Response(
+        {'detail': 'Conflito ao gravar o lote: algum item viola uma restrição do banco (ex.: duplicado).'},
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
+class ListaEmLoteSerializer(serializers.ListSerializer):
+    """
+    ListSerializer que valida cada item separadamente e guarda o resultado
+    (dados validados ou erros) por índice, em vez de falhar o lote inteiro.
+    """
+
+    def __init__(self, *args, instancias=None, **kwargs):
+        self.instancias = instancias or {}
+        super().__init__(*args, **kwargs)
+
+    def run_child_validation(self, data):
+        # Em alterações, cada item é validado contra a sua própria instância
+        # (necessário, por exemplo, para as validações de campos únicos).
+        self.child.instance = self.instancia_do_item(data)
+        self.child.initial_data = data
+        return super().run_child_validation(data)
+
+    def instancia_do_item(self, item):
+        if not self.instancias or not isinstance(item, dict):
+            return None
+        return self.instancias.get(_pk(self.child.Meta.model, item.get('id')))
+
+    def validar_itens(self):
+        self.validos = []
+        self.erros = []
+        for indice, item in enumerate(self.initial_data):
+            try:
+                self.validos.append((indice, self.run_child_validation(item)))
+            except ValidationError as erro:
+                self.erros.append({'indice': indice, 'erros': erro.detail})
+        return self.validos
+
+
+def _carregar_chaves_estrangeiras(child, itens):
+    """Busca de uma vez os objetos de cada chave estrangeira usada no lote."""
+    for nome, campo in child.fields.items():
+        if not isinstance(campo, ChaveEstrangeiraField) or campo.read_only:
+            continue
+        modelo = campo.get_queryset().model
+        # Valores inválidos ficam de fora; o próprio campo vai reportá-los.
+        ids = {_pk(modelo, item.get(nome)) for item in itens if isinstance(item, dict)}
+        ids.discard(None)
+        campo.cache = campo.get_queryset().in_bulk(ids)
+
+
+class LoteMixin:
+    """Adiciona a ação 'lote' (criação, alteração e exclusão em massa)."""
+
+    def _lista_em_lote(self, itens, instancias=None, partial=False):
+        if not isinstance(itens, list):
+            raise ValidationError({'detail': 'Envie uma lista de objetos.'})
+        if len(itens) > MAXIMO_ITENS_LOTE:
+            raise ValidationError({'detail': f'Máximo de {MAXIMO_ITENS_LOTE} itens por lote.'})
+        contexto = self.get_serializer_context()
+        child = self.get_serializer_class()(context=contexto, partial=partial)
+        _carregar_chaves_estrangeiras(child, itens)
+        lista = ListaEmLoteSerializer(
+            child=child, data=itens, instancias=instancias, partial=partial, context=contexto
+        )
+        lista.validar_itens()
+        return lista
+
+    def _resposta_lote(self, lista, ids, status_sucesso):
+        if not lista.erros:
+            codigo = status_sucesso
+        elif ids:
+            codigo = status.HTTP_207_MULTI_STATUS
+        else:
+            codigo = status.HTTP_400_BAD_REQUEST
+        return Response({'ids': ids, 'total': len(ids), 'erros': lista.erros}, status=codigo)
+
+    @action(detail=False, methods=['post', 'put', 'patch', 'delete'], pagination_class=None, filter_backends=[])
+    def lote(self, request):
+        if request.method == 'POST':
+            return self._criar_em_lote(request)
+        if request.method == 'DELETE':
+            return self._excluir_em_lote(request)
+        return self._alterar_em_lote(request, partial=request.method == 'PATCH')
+
+    def _criar_em_lote(self, request):
+        model = self.queryset.model
+        lista = self._lista_em_lote(request.data)
+        objetos = [model(**dados) for _, dados in lista.validos]
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(objetos, batch_size=500)
+                atualizar_resumos(model, [objeto.pk for objeto in objetos if afeta_resumos(objeto)], novos=True)
+        except IntegrityError:
+            return _conflito(model)
+        if objetos:
+            registrar_alteracao(model)
+        return self._resposta_lote(lista, [objeto.pk for objeto in objetos], status.HTTP_201_CREATED)
+
+    def _alterar_em_lote(self, request, partial):
+        model = self.queryset.model
+        itens = request.data if isinstance(request.data, list) else []
+        ids = {_pk(model, item.get('id')) for item in itens if isinstance(item, dict)}
+        ids.discard(None)
+        instancias = model.objects.in_bulk(ids)
+        lista = self._lista_em_lote(request.data, instancias=instancias, partial=partial)
+
+        alterados = []
+        campos = set()
+        for indice, dados in lista.validos:
+            instancia = lista.instancia_do_item(lista.initial_data[indice])
+            if instancia is None:
+                lista.erros.append({'indice': indice, 'erros': {'id': ['Objeto não encontrado.']}})
+                continue
+            for campo, valor in dados.items():
+                setattr(instancia, campo, valor)
+            campos.update(dados)
+            alterados.append(instancia)
+        lista.erros.sort(key=lambda erro: erro['indice'])
+
+        if alterados and campos:
+            # bulk_update não preenche os campos auto_now (data_atualizacao).
+            agora = timezone.now()
+            for campo in model._meta.concrete_fields:
+                if getattr(campo, 'auto_now', False):
+                    for instancia in alterados:
+                        setattr(instancia, campo.attname, agora)
+                    campos.add(campo.name)
+            try:
+                with transaction.atomic():
+                    ids_alterados = [instancia.pk for instancia in alterados]
+                    antes = pares_dos_resumos(model, ids_alterados)
+                    model.objects.bulk_update(alterados, sorted(campos), batch_size=500)
+                    atualizar_resumos(model, ids_alterados, antes)
+            except IntegrityError:
+                return _conflito(model)
+            registrar_alteracao(model)
+        return self._resposta_lote(lista, [instancia.pk for instancia in alterados], status.HTTP_200_OK)
+
+    def _excluir_em_lote(self, request):
+        model = self.queryset.model
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not ids:
+            raise ValidationError({'ids': ['Envie uma lista de ids.']})
+        if len(ids) > MAXIMO_ITENS_LOTE:
+            raise ValidationError({'detail': f'Máximo de {MAXIMO_ITENS_LOTE} itens por lote.'})
+        try:
+            with transaction.atomic():
+                _, por_modelo = model.objects.filter(pk__in=ids).delete()
+        except ProtectedError:
+            return Response(
+                {'detail': 'Alguns itens não podem ser excluídos pois estão associados a outros registros.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except (TypeError, ValueError):
+            raise ValidationError({'ids': ['Os ids precisam ser números inteiros.']})
+        return Response({'excluidos': por_modelo.get(model._meta.label, 0)}, status=status.HTTP_200_OK)
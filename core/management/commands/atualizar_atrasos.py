@@ -0,0 +1,40 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cobrancas import TAMANHO_LOTE_ATRASOS, atualizar_atrasos
+
+# -----------------------------------------------------------------------------
+# Marca os pagamentos vencidos como 'Em Atraso' e recalcula multa/juros.
+# Uso: python manage.py atualizar_atrasos [--dry-run] [--data 2025-03-10]
+# Feito para rodar agendado (ex.: a cada 5 minutos); quando não há nada a
+# alterar, custa uma única consulta pelo índice de status.
+# -----------------------------------------------------------------------------
+
+
+class Command(BaseCommand):
+    help = "Atualiza pagamentos vencidos para 'Em Atraso' e calcula multa/juros com UPDATEs em lote."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Só mostra o que seria alterado.')
+        parser.add_argument('--data', help='Data de referência AAAA-MM-DD (padrão: hoje).')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_ATRASOS, help='Pagamentos por UPDATE.')
+
+    def handle(self, *args, **options):
+        try:
+            hoje = date.fromisoformat(options['data']) if options['data'] else None
+        except ValueError:
+            raise CommandError('Informe a data no formato AAAA-MM-DD.')
+        resumo = atualizar_atrasos(hoje=hoje, dry_run=options['dry_run'], tamanho_lote=options['lote'])
+        if resumo['dry_run']:
+            self.stdout.write(
+                f"[dry-run] {resumo['novos_em_atraso']} pagamentos passariam a 'Em Atraso'; "
+                f"{resumo['multas_recalculadas']} teriam multa/juros recalculados "
+                f"(total R$ {resumo['multa_juros_total']}). {resumo['segundos']}s."
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"{resumo['novos_em_atraso']} pagamentos marcados 'Em Atraso', "
+                f"{resumo['multas_recalculadas']} multas recalculadas em {resumo['lotes']} lotes "
+                f"({resumo['segundos']}s)."
+            ))
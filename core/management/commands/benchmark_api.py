@@ -0,0 +1,199 @@
+import itertools
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.busca import buscar
+from core.dashboard import calcular_estatisticas
+from core.ocupacao import ocupacao_da_carteira, periodo_padrao
+from core.rentabilidade import calcular_rentabilidade
+from core.models import Imovel, Locador, Locatario, Contrato
+from core.sintetico import gerar_portfolio
+from core.urls import router
+from core.vencimentos import proximos_vencimentos
+from core.views import ModelViewSetBase
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Benchmark da API com linha de base em JSON. Para cada tamanho de carteira
+# (gerada por core/sintetico.py dentro de uma transação desfeita no final):
+#   - lista, detalhe e criação (POST) de cada um dos nove endpoints;
+#   - as agregações principais (Dashboard, vencimentos, busca, rentabilidade e
+#     ocupação).
+# De cada operação guarda o MENOR tempo (ms) das repetições, depois de uma
+# chamada de aquecimento (o mínimo é o que menos varia com a carga da
+# máquina), e o número de consultas.
+#
+#   --salvar arquivo.json    grava os resultados como nova linha de base;
+#   --comparar arquivo.json  compara com a linha de base e termina com erro
+#                            se alguma operação fizer MAIS consultas ou ficar
+#                            mais lenta que a tolerância (padrão: +50% e
+#                            pelo menos MARGEM_MS a mais).
+#
+# O número de consultas não depende da máquina e é comparado sempre; o tempo
+# só é comparado se a linha de base for do mesmo tipo de banco.
+# O cache de respostas fica desligado durante as medições.
+#
+# Uso: python manage.py benchmark_api --comparar core/benchmarks/linha_de_base.json
+# -----------------------------------------------------------------------------
+
+LINHA_DE_BASE = Path(__file__).resolve().parents[2] / 'benchmarks' / 'linha_de_base.json'
+MARGEM_MS = 5.0
+
+
+def _pessoa(prefixo, indice):
+    return {
+        'nome': f'Benchmark {indice}', 'email': f'{prefixo}.benchmark{indice}@exemplo.com', 'telefone': '1',
+        'cpf_cnpj': f'BENCH{prefixo[:3].upper()}{indice}', 'endereco': 'Rua do Benchmark',
+    }
+
+
+# Corpo do POST de cada endpoint; 'ids' traz um registro existente de cada modelo.
+PAYLOADS = {
+    'imoveis': lambda indice, ids: {
+        'tipo_imovel': 'Casa', 'endereco': f'Rua do Benchmark, {indice}', 'area_util': 50, 'valor_aluguel': '1000.00',
+    },
+    'locadores': lambda indice, ids: _pessoa('locador', indice),
+    'locatarios': lambda indice, ids: _pessoa('locatario', indice),
+    'fiadores': lambda indice, ids: _pessoa('fiador', indice),
+    'intermediarios': lambda indice, ids: _pessoa('intermediario', indice),
+    'contratos': lambda indice, ids: {
+        'imovel_id': ids[Imovel], 'locador_id': ids[Locador], 'locatario_id': ids[Locatario],
+        # Um ano por contrato: contratos ativos do mesmo imóvel não podem se sobrepor.
+        'data_inicio': f'{2030 + indice}-01-01', 'data_fim': f'{2030 + indice}-12-31', 'valor_aluguel': '1500.00',
+        'data_assinatura': f'{2029 + indice}-12-20', 'data_vencimento_pagamento': 5, 'multa_rescisoria': '3000.00',
+    },
+    'pagamentos': lambda indice, ids: {
+        'contrato_id': ids[Contrato], 'data_pagamento': '2030-01-05', 'valor_pago': '1500.00', 'forma_pagamento': 'PIX',
+    },
+    'manutencoes': lambda indice, ids: {
+        'imovel_id': ids[Imovel], 'data_solicitacao': '2030-01-01', 'descricao': f'Benchmark {indice}',
+    },
+    'documentos': lambda indice, ids: {
+        'imovel_id': ids[Imovel], 'contrato_id': ids[Contrato], 'tipo_documento': 'Laudo',
+        'descricao_documento': f'Benchmark {indice}', 'data_documento': '2030-01-01',
+        'arquivo_documento': f'documentos/benchmark-{indice}.pdf',
+    },
+}
+
+AGREGACOES = {
+    'dashboard': calcular_estatisticas,
+    'vencimentos': lambda: proximos_vencimentos(dias=30, incluir_vencidos=True),
+    'busca': lambda: buscar('silva rua'),
+    'rentabilidade': calcular_rentabilidade,
+    'ocupacao': lambda: ocupacao_da_carteira(*periodo_padrao(timezone.localdate())),
+}
+
+
+def _id_do_meio(model):
+    """Um registro do meio da tabela (nem o primeiro nem o último)."""
+    total = model.objects.count()
+    return model.objects.order_by('pk').values_list('pk', flat=True)[total // 2]
+
+
+def comparar(atual, base, tolerancia, comparar_tempo=True):
+    """Lista as regressões de 'atual' em relação à linha de base 'base'."""
+    regressoes = []
+    for tamanho, operacoes in atual.items():
+        for nome, medida in operacoes.items():
+            anterior = base.get(tamanho, {}).get(nome)
+            if anterior is None:
+                continue
+            if medida['consultas'] > anterior['consultas']:
+                regressoes.append(
+                    f'{nome} ({tamanho}): {medida["consultas"]} consultas (linha de base: {anterior["consultas"]})'
+                )
+            limite = max(anterior['ms'] * (1 + tolerancia), anterior['ms'] + MARGEM_MS)
+            if comparar_tempo and medida['ms'] > limite:
+                regressoes.append(f'{nome} ({tamanho}): {medida["ms"]:.1f} ms (linha de base: {anterior["ms"]:.1f} ms)')
+    return regressoes
+
+
+class Command(BaseCommand):
+    help = 'Mede tempo e consultas de todos os endpoints e agregações; salva ou compara com a linha de base.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanhos', type=int, nargs='+', default=[200, 2000], help='Imóveis na carteira.')
+        parser.add_argument('--meses', type=int, default=12, help='Pagamentos por contrato.')
+        parser.add_argument('--repeticoes', type=int, default=5)
+        parser.add_argument('--salvar', nargs='?', const=str(LINHA_DE_BASE))
+        parser.add_argument('--comparar', nargs='?', const=str(LINHA_DE_BASE))
+        parser.add_argument('--tolerancia', type=float, default=0.5, help='Aumento de tempo aceito (0.5 = +50%%).')
+
+    def handle(self, *args, **options):
+        resultados = {}
+        cache_respostas = ModelViewSetBase.cache_respostas
+        ModelViewSetBase.cache_respostas = False
+        try:
+            for tamanho in options['tamanhos']:
+                with transaction.atomic():
+                    gerar_portfolio(imoveis=tamanho, meses_por_contrato=options['meses'])
+                    resultados[str(tamanho)] = self._medir_tudo(tamanho, options['repeticoes'])
+                    transaction.set_rollback(True)
+        finally:
+            ModelViewSetBase.cache_respostas = cache_respostas
+
+        if options['salvar']:
+            caminho = Path(options['salvar'])
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            caminho.write_text(json.dumps({
+                'banco': connection.vendor,
+                'gerado_em': timezone.now().isoformat(),
+                'meses': options['meses'],
+                'resultados': resultados,
+            }, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'Linha de base salva em {caminho}.'))
+
+        if options['comparar']:
+            base = json.loads(Path(options['comparar']).read_text(encoding='utf-8'))
+            mesmo_banco = base.get('banco') == connection.vendor
+            if not mesmo_banco:
+                self.stdout.write(self.style.WARNING(
+                    f"Linha de base de outro banco ({base.get('banco')}): só as consultas são comparadas."
+                ))
+            regressoes = comparar(resultados, base['resultados'], options['tolerancia'], mesmo_banco)
+            if regressoes:
+                raise CommandError('Regressões em relação à linha de base:\n  ' + '\n  '.join(regressoes))
+            self.stdout.write(self.style.SUCCESS('Sem regressões em relação à linha de base.'))
+
+    def _medir_tudo(self, tamanho, repeticoes):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n=== {tamanho} imóveis ==='))
+        cliente = APIClient(SERVER_NAME='localhost')
+        ids = {model: _id_do_meio(model) for model in (Imovel, Locador, Locatario, Contrato)}
+        medidas = {}
+
+        for prefixo, viewset, _ in router.registry:
+            model = viewset.queryset.model
+            pk = _id_do_meio(model)
+            medidas[f'{prefixo} list'] = self._medir(lambda: cliente.get(f'/api/{prefixo}/'), repeticoes)
+            medidas[f'{prefixo} retrieve'] = self._medir(lambda: cliente.get(f'/api/{prefixo}/{pk}/'), repeticoes)
+            contador = itertools.count()
+            medidas[f'{prefixo} create'] = self._medir(
+                lambda: cliente.post(f'/api/{prefixo}/', PAYLOADS[prefixo](next(contador), ids), format='json'),
+                repeticoes, codigo=201,
+            )
+        for nome, funcao in AGREGACOES.items():
+            medidas[nome] = self._medir(funcao, repeticoes, codigo=None)
+
+        for nome, medida in medidas.items():
+            self.stdout.write(f'{nome:<28} {medida["ms"]:9.2f} ms  {medida["consultas"]:3d} consultas')
+        return medidas
+
+    def _medir(self, funcao, repeticoes, codigo=200):
+        # A primeira chamada (imports, caches de planos) não entra na medida.
+        funcao()
+        tempos = []
+        for _ in range(repeticoes):
+            with CaptureQueriesContext(connection) as consultas:
+                inicio = time.perf_counter()
+                resultado = funcao()
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            if codigo is not None and resultado.status_code != codigo:
+                raise CommandError(f'Resposta {resultado.status_code} inesperada: {resultado.content[:300]!r}')
+        return {'ms': round(min(tempos), 3), 'consultas': len(consultas)}
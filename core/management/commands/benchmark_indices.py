@@ -0,0 +1,107 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Imovel, Contrato, Pagamento, Manutencao
+from core.sintetico import gerar_portfolio
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Benchmark dos índices do app 'core'. O comando:
+#   1. gera uma carteira sintética (100 mil pagamentos por padrão);
+#   2. mostra o plano (EXPLAIN) e o tempo das consultas mais usadas;
+#   3. remove os índices secundários e repete as mesmas consultas;
+#   4. desfaz TUDO no final (os dados e a remoção dos índices), pois roda
+#      dentro de uma transação. O banco volta exatamente como estava.
+#
+# Uso: python manage.py benchmark_indices --imoveis 5000 --meses 20
+# -----------------------------------------------------------------------------
+
+
+def consultas_quentes():
+    hoje = timezone.localdate()
+    return {
+        'Imóveis disponíveis': Imovel.objects.filter(status_imovel='Disponível'),
+        'Imóveis mais recentes': Imovel.objects.order_by('-data_cadastro', '-id')[:50],
+        'Contratos ativos vencendo em 30 dias': Contrato.objects.filter(
+            status_contrato='Ativo', data_fim__range=(hoje, hoje + timedelta(days=30))
+        ),
+        'Pagamentos pendentes já vencidos': Pagamento.objects.filter(
+            status_pagamento='Pendente', data_pagamento__lt=hoje
+        ),
+        'Pagamentos em atraso (recentes primeiro)': Pagamento.objects.filter(
+            status_pagamento='Em Atraso'
+        ).order_by('-data_pagamento')[:50],
+        'Manutenções pendentes': Manutencao.objects.filter(status_manutencao='Pendente'),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compara os planos de consulta com e sem os índices do app core (tudo é desfeito no final).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--imoveis', type=int, default=5000)
+        parser.add_argument('--meses', type=int, default=20, help='Pagamentos por contrato.')
+        parser.add_argument('--repeticoes', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            inicio = time.perf_counter()
+            gerar_portfolio(
+                imoveis=options['imoveis'], meses_por_contrato=options['meses'],
+                log=lambda mensagem: self.stdout.write(f'  {mensagem}'),
+            )
+            self.stdout.write(f'Dados gerados em {time.perf_counter() - inicio:.1f}s.')
+            self._analisar()
+
+            self.stdout.write(self.style.MIGRATE_HEADING('\n=== COM ÍNDICES ==='))
+            com_indices = self._medir(options['repeticoes'])
+
+            removidos = self._remover_indices()
+            self._analisar()
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n=== SEM ÍNDICES ({len(removidos)} removidos) ==='))
+            sem_indices = self._medir(options['repeticoes'])
+
+            self.stdout.write(self.style.MIGRATE_HEADING('\n=== RESUMO (ms por consulta) ==='))
+            for nome in com_indices:
+                self.stdout.write(
+                    f'{nome:<45} sem: {sem_indices[nome]:8.2f}  com: {com_indices[nome]:8.2f}'
+                )
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('\nTransação desfeita: dados e índices restaurados.'))
+
+    def _medir(self, repeticoes):
+        tempos = {}
+        for nome, queryset in consultas_quentes().items():
+            self.stdout.write(self.style.SQL_KEYWORD(f'\n-- {nome}'))
+            self.stdout.write(queryset.explain())
+            inicio = time.perf_counter()
+            for _ in range(repeticoes):
+                list(queryset.values_list('id', flat=True))
+            tempos[nome] = (time.perf_counter() - inicio) * 1000 / repeticoes
+        return tempos
+
+    def _analisar(self):
+        # Atualiza as estatísticas para o otimizador escolher o melhor plano.
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _remover_indices(self):
+        """Remove os índices secundários (exceto PK, UNIQUE e chaves estrangeiras)."""
+        removidos = []
+        with connection.cursor() as cursor:
+            for model in (Imovel, Contrato, Pagamento, Manutencao):
+                tabela = model._meta.db_table
+                colunas_fk = {f.column for f in model._meta.concrete_fields if f.is_relation}
+                restricoes = connection.introspection.get_constraints(cursor, tabela)
+                for nome, info in restricoes.items():
+                    if not info['index'] or info['primary_key'] or info['unique']:
+                        continue
+                    if set(info['columns']) <= colunas_fk:
+                        continue
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(nome)}')
+                    removidos.append(nome)
+        return removidos
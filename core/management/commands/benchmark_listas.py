@@ -0,0 +1,90 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core.consultas import planejar_serializer
+from core.leitura_rapida import leitor_rapido
+from core.serializers import ImovelSerializer, ContratoSerializer, PagamentoSerializer
+from core.sintetico import gerar_portfolio
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Compara as duas formas de montar uma lista grande em JSON:
+#   - serializer: instâncias do ORM + Serializer(many=True).data (o normal);
+#   - values():   linhas de QuerySet.values() + LeitorRapido
+#                 (core/leitura_rapida.py).
+# Para cada tamanho (10 mil e 100 mil linhas por padrão), mede o tempo total
+# (consulta + conversão + JSON) e confere que os dois JSON são idênticos.
+# Os dados sintéticos são gerados dentro de uma transação desfeita no final.
+#
+# Uso: python manage.py benchmark_listas --tamanhos 10000 100000
+# -----------------------------------------------------------------------------
+
+SERIALIZERS = {
+    'imoveis': ImovelSerializer,
+    'contratos': ContratoSerializer,
+    'pagamentos': PagamentoSerializer,
+}
+
+
+class Command(BaseCommand):
+    help = 'Compara o tempo das listas pelo serializer e por values() (tudo é desfeito no final).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanhos', type=int, nargs='+', default=[10000, 100000])
+        parser.add_argument('--recursos', nargs='+', choices=sorted(SERIALIZERS), default=['pagamentos', 'contratos'])
+        parser.add_argument('--repeticoes', type=int, default=3)
+
+    def handle(self, *args, **options):
+        maior = max(options['tamanhos'])
+        with transaction.atomic():
+            inicio = time.perf_counter()
+            # 20 pagamentos por contrato: 'maior' pagamentos e maior/20 imóveis e contratos.
+            gerar_portfolio(
+                imoveis=max(maior // 20, 1), meses_por_contrato=20,
+                log=lambda mensagem: self.stdout.write(f'  {mensagem}'),
+            )
+            self.stdout.write(f'Dados gerados em {time.perf_counter() - inicio:.1f}s.')
+
+            self.stdout.write(self.style.MIGRATE_HEADING('\n=== RESUMO (ms por lista) ==='))
+            for recurso in options['recursos']:
+                for tamanho in options['tamanhos']:
+                    self._comparar(recurso, tamanho, options['repeticoes'])
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('\nTransação desfeita: dados sintéticos removidos.'))
+
+    def _comparar(self, recurso, tamanho, repeticoes):
+        serializer_class = SERIALIZERS[recurso]
+        leitor = leitor_rapido(serializer_class)
+        if leitor is None:
+            raise CommandError(f'O serializer de {recurso} não tem caminho por values().')
+        model = serializer_class.Meta.model
+        base = model.objects.order_by('-id')
+
+        def pelo_serializer():
+            queryset = planejar_serializer(serializer_class).aplicar(base)[:tamanho]
+            return JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+        def por_values():
+            return JSONRenderer().render(leitor.converter(leitor.preparar(base)[:tamanho]))
+
+        normal, tempo_normal = self._medir(pelo_serializer, repeticoes)
+        rapido, tempo_rapido = self._medir(por_values, repeticoes)
+        if normal != rapido:
+            raise CommandError(f'{recurso} ({tamanho} linhas): os dois JSON são diferentes.')
+        linhas = model.objects.count() if tamanho > model.objects.count() else tamanho
+        self.stdout.write(
+            f'{recurso:<12} {linhas:>7} linhas  serializer: {tempo_normal:9.1f}  '
+            f'values(): {tempo_rapido:9.1f}  ({tempo_normal / tempo_rapido:.1f}x, {len(normal) / 1e6:.1f} MB)'
+        )
+
+    def _medir(self, funcao, repeticoes):
+        melhor = None
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            resultado = funcao()
+            decorrido = (time.perf_counter() - inicio) * 1000
+            melhor = decorrido if melhor is None else min(melhor, decorrido)
+        return resultado, melhor
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cobrancas import TAMANHO_LOTE, FORMA_PAGAMENTO_PADRAO, gerar_pagamentos_do_mes, interpretar_mes
+
+# -----------------------------------------------------------------------------
+# Gera as cobranças do mês para todos os contratos ativos.
+# Uso: python manage.py gerar_pagamentos --mes 2025-03
+# Pode ser agendado (ex.: todo dia 1º); rodar de novo não duplica nada.
+# -----------------------------------------------------------------------------
+
+
+class Command(BaseCommand):
+    help = 'Gera os pagamentos pendentes do mês para os contratos ativos (idempotente).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mes', help='Mês de competência no formato AAAA-MM (padrão: mês atual).')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Contratos por lote.')
+        parser.add_argument('--forma-pagamento', default=FORMA_PAGAMENTO_PADRAO)
+
+    def handle(self, *args, **options):
+        try:
+            competencia = interpretar_mes(options['mes'])
+        except ValueError as erro:
+            raise CommandError(str(erro))
+        resumo = gerar_pagamentos_do_mes(
+            competencia, tamanho_lote=options['lote'], forma_pagamento=options['forma_pagamento']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Competência {resumo['competencia']}: {resumo['criados']} pagamentos criados "
+            f"em {resumo['lotes']} lotes ({resumo['segundos']}s)."
+        ))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.sintetico import gerar_portfolio
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Preenche o banco com uma carteira sintética (core/sintetico.py) e MANTÉM os
+# dados, para testes de carga (teste_carga) e medições manuais. Use apenas em
+# bancos de desenvolvimento ou de teste, de preferência vazios (os CPFs e
+# e-mails gerados repetem entre execuções com a mesma semente).
+#
+# Uso (volume grande): python manage.py gerar_portfolio --imoveis 50000 --contratos-por-imovel 4 --meses 25
+# -----------------------------------------------------------------------------
+
+
+class Command(BaseCommand):
+    help = 'Gera uma carteira sintética nas nove tabelas do app core (os dados são mantidos).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--imoveis', type=int, default=5000)
+        parser.add_argument('--contratos-por-imovel', type=int, default=1)
+        parser.add_argument('--meses', type=int, default=20, help='Pagamentos por contrato.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--lote', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        with transaction.atomic():
+            contagem = gerar_portfolio(
+                imoveis=options['imoveis'], contratos_por_imovel=options['contratos_por_imovel'],
+                meses_por_contrato=options['meses'], seed=options['seed'], lote=options['lote'],
+                log=lambda mensagem: self.stdout.write(f'  {mensagem}'),
+            )
+        total = sum(contagem.values())
+        segundos = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} linhas em {segundos:.1f}s ({total / segundos:.0f} linhas/s).'
+        ))
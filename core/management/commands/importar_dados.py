@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importacao import RECURSOS, TAMANHO_LOTE, importar
+
+# -----------------------------------------------------------------------------
+# Importa um arquivo CSV ou JSON para um recurso da API.
+# Uso: python manage.py importar_dados locadores locadores.csv
+#      python manage.py importar_dados contratos contratos.json --lote 2000
+# Se for interrompido, rodar de novo o mesmo arquivo continua do último bloco
+# gravado. Nos contratos, as referências podem usar 'locador__cpf_cnpj',
+# 'locatario__email', 'imovel__endereco' etc. no lugar dos ids.
+# -----------------------------------------------------------------------------
+
+
+class Command(BaseCommand):
+    help = 'Importa um arquivo CSV/JSON em blocos, com retomada após interrupções.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('recurso', choices=sorted(RECURSOS))
+        parser.add_argument('arquivo', help='Caminho do arquivo .csv, .json ou .jsonl.')
+        parser.add_argument('--formato', choices=['csv', 'json'], help='Padrão: pela extensão do arquivo.')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Linhas por bloco.')
+        parser.add_argument('--reiniciar', action='store_true', help='Ignora o progresso de execuções anteriores.')
+
+    def handle(self, *args, **options):
+        def ao_progredir(parcial):
+            self.stdout.write(
+                f"{parcial['retomada_da_linha'] + parcial['linhas']} linhas "
+                f"({parcial['criados']} criadas, {parcial['total_erros']} com erro) "
+                f"- {parcial['linhas_por_segundo']} linhas/s"
+            )
+
+        try:
+            with open(options['arquivo'], 'rb') as arquivo:
+                resumo = importar(
+                    arquivo,
+                    RECURSOS[options['recurso']],
+                    nome_arquivo=options['arquivo'],
+                    formato=options['formato'],
+                    tamanho_lote=options['lote'],
+                    reiniciar=options['reiniciar'],
+                    ao_progredir=ao_progredir,
+                )
+        except (OSError, ValueError) as erro:
+            raise CommandError(str(erro))
+
+        for erro in resumo['erros']:
+            self.stderr.write(f"Linha {erro['linha']}: {erro['erros']}")
+        if resumo['retomada_da_linha']:
+            self.stdout.write(f"Retomada a partir da linha {resumo['retomada_da_linha'] + 1}.")
+        self.stdout.write(self.style.SUCCESS(
+            f"{resumo['linhas']} linhas processadas: {resumo['criados']} criadas, "
+            f"{resumo['total_erros']} com erro, em {resumo['segundos']}s "
+            f"({resumo['linhas_por_segundo']} linhas/s)."
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.arquivos import limpar_arquivos
+
+# -----------------------------------------------------------------------------
+# Apaga os envios abandonados e os arquivos que não estão anexados a nenhum
+# documento, pagamento ou foto (registro, conteúdo e derivados em disco), mais
+# antigos que settings.ARQUIVOS_VALIDADE_ENVIO_HORAS.
+# Uso: python manage.py limpar_arquivos [--dry-run]
+# Feito para rodar agendado (ex.: uma vez por dia).
+# -----------------------------------------------------------------------------
+
+
+class Command(BaseCommand):
+    help = 'Apaga envios abandonados e arquivos sem documentos, pagamentos ou fotos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Só mostra o que seria apagado.')
+
+    def handle(self, *args, **options):
+        resumo = limpar_arquivos(dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(
+                f"[dry-run] {resumo['envios']} envios e {resumo['arquivos']} arquivos seriam apagados."
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"{resumo['envios']} envios e {resumo['arquivos']} arquivos apagados."
+            ))
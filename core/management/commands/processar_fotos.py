@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.fotos import processar_pendentes, reprocessar
+
+# -----------------------------------------------------------------------------
+# Gera as miniaturas e versões para a web das fotos na fila (core/fotos.py).
+# Uso: python manage.py processar_fotos [--workers 4] [--limite 500]
+#                                       [--reprocessar] [--continuo]
+# Com FOTOS_WORKERS = 0 a aplicação não processa nada sozinha: este comando
+# faz o trabalho, agendado (cron) ou em loop (--continuo) numa máquina à
+# parte. Também retoma fotos presas em 'Processando' por um worker que caiu.
+# -----------------------------------------------------------------------------
+
+
+class Command(BaseCommand):
+    help = 'Processa as fotos pendentes dos imóveis (miniaturas e versões para a web).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=max(settings.FOTOS_WORKERS, 1),
+                            help='Threads de processamento (padrão: FOTOS_WORKERS).')
+        parser.add_argument('--limite', type=int, help='Máximo de fotos por rodada.')
+        parser.add_argument('--reprocessar', action='store_true',
+                            help='Põe de volta na fila as fotos com erro ou de uma versão antiga das variantes.')
+        parser.add_argument('--continuo', action='store_true', help='Não termina: espera por fotos novas.')
+        parser.add_argument('--intervalo', type=float, default=5, help='Segundos entre rodadas com --continuo.')
+
+    def handle(self, *args, **options):
+        if options['reprocessar']:
+            self.stdout.write(f'{reprocessar()} fotos voltaram para a fila.')
+        while True:
+            inicio = time.perf_counter()
+            resumo = processar_pendentes(workers=options['workers'], limite=options['limite'])
+            if resumo or not options['continuo']:
+                detalhes = ', '.join(f'{quantidade} {situacao}' for situacao, quantidade in sorted(resumo.items()))
+                self.stdout.write(self.style.SUCCESS(
+                    f"{sum(resumo.values())} fotos processadas ({detalhes or 'nenhuma na fila'}) "
+                    f"em {time.perf_counter() - inicio:.2f}s."
+                ))
+            if not options['continuo']:
+                break
+            if not resumo:
+                time.sleep(options['intervalo'])
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.resumos import RESUMOS
+
+# -----------------------------------------------------------------------------
+# Recalcula do zero as tabelas de resumo (core/resumos.py): os extratos de
+# repasse (core/extratos.py) e a rentabilidade dos imóveis (core/rentabilidade.py).
+# Uso: python manage.py recalcular_resumos [--apenas extratos]
+# Necessário uma vez depois das migrações que criam as tabelas e quando a
+# taxa de administração mudar; no dia a dia os resumos se atualizam sozinhos.
+# -----------------------------------------------------------------------------
+
+TAMANHO_LOTE = 2000
+
+
+class Command(BaseCommand):
+    help = 'Apaga e recalcula as tabelas de resumo (extratos de repasse e rentabilidade).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--apenas', nargs='+', choices=[resumo.nome for resumo in RESUMOS])
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Linhas por INSERT.')
+
+    def handle(self, *args, **options):
+        for resumo in RESUMOS:
+            if options['apenas'] and resumo.nome not in options['apenas']:
+                continue
+            inicio = time.perf_counter()
+            total = resumo.reconstruir(tamanho_lote=options['lote'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{resumo.nome}: {total} linhas recalculadas em {time.perf_counter() - inicio:.1f}s.'
+            ))
@@ -0,0 +1,123 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Teste de carga WSGI x ASGI com o MESMO número de workers:
+#   - wsgi: gunicorn com workers síncronos (como no Render hoje), nos
+#           endpoints normais (/api/dashboard/, /api/pagamentos/, ...);
+#   - asgi: uvicorn (config.asgi), nos endpoints assíncronos
+#           (/api/assincrono/dashboard/, /api/assincrono/pagamentos/, ...).
+# Cada servidor é iniciado pelo comando, recebe 'requisicoes' requisições
+# com 'concorrencia' clientes simultâneos e é encerrado no final.
+#
+# Os caches (Dashboard e respostas) são desligados nos servidores do teste,
+# para que toda requisição vá ao banco. Use um banco com dados (ex.: uma
+# cópia do de produção via DATABASE_URL); nada é gravado. Com um banco local,
+# '--latencia-ms' adiciona um atraso a cada consulta, como o de um Postgres
+# em outra máquina: é nessa espera que o worker síncrono fica parado. O atraso
+# só existe nos servidores do teste (core/management/servidor_carga.py).
+#
+# Uso: python manage.py teste_carga --workers 2 --concorrencia 32 --latencia-ms 20
+# -----------------------------------------------------------------------------
+
+CAMINHOS = ['dashboard/', 'pagamentos/', 'contratos/', 'imoveis/']
+
+SERVIDORES = {
+    'wsgi': lambda workers, porta: [
+        sys.executable, '-m', 'gunicorn', 'core.management.servidor_carga:wsgi', '--workers', str(workers),
+        '--bind', f'127.0.0.1:{porta}', '--log-level', 'warning',
+    ],
+    'asgi': lambda workers, porta: [
+        sys.executable, '-m', 'uvicorn', 'core.management.servidor_carga:asgi', '--workers', str(workers),
+        '--host', '127.0.0.1', '--port', str(porta), '--log-level', 'warning',
+    ],
+}
+PREFIXOS = {'wsgi': '/api/', 'asgi': '/api/assincrono/'}
+
+
+def _get(url):
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers={'Accept': 'application/json'})) as resposta:
+            resposta.read()
+            ok = resposta.status == 200
+    except (urllib.error.URLError, ConnectionError):
+        ok = False
+    return ok, time.perf_counter() - inicio
+
+
+class Command(BaseCommand):
+    help = 'Teste de carga dos endpoints de leitura: gunicorn (WSGI) x uvicorn (ASGI), mesmos workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modos', nargs='+', choices=sorted(SERVIDORES), default=['wsgi', 'asgi'])
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--concorrencia', type=int, default=32)
+        parser.add_argument('--requisicoes', type=int, default=600)
+        parser.add_argument('--porta', type=int, default=8765)
+        parser.add_argument('--latencia-ms', type=int, default=0, help='Atraso simulado por consulta ao banco.')
+
+    def handle(self, *args, **options):
+        resultados = {}
+        for modo in options['modos']:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n=== {modo.upper()} ({options["workers"]} workers) ==='))
+            servidor = self._iniciar(modo, options['workers'], options['porta'], options['latencia_ms'])
+            try:
+                resultados[modo] = self._carga(modo, options)
+            finally:
+                servidor.terminate()
+                servidor.wait(timeout=30)
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\n=== RESUMO ==='))
+        for modo, (por_segundo, p50, p95, erros) in resultados.items():
+            self.stdout.write(
+                f'{modo}: {por_segundo:7.1f} req/s   p50 {p50:7.1f} ms   p95 {p95:7.1f} ms   erros {erros}'
+            )
+
+    def _iniciar(self, modo, workers, porta, latencia_ms):
+        ambiente = {
+            **os.environ,
+            'RESPOSTAS_CACHE_URL': 'dummy://',
+            'DASHBOARD_CACHE_TIMEOUT': '0',
+            'LATENCIA_SIMULADA_BANCO_MS': str(latencia_ms),
+        }
+        servidor = subprocess.Popen(SERVIDORES[modo](workers, porta), env=ambiente)
+        url = f'http://127.0.0.1:{porta}{PREFIXOS[modo]}dashboard/'
+        limite = time.monotonic() + 30
+        while time.monotonic() < limite:
+            if servidor.poll() is not None:
+                raise CommandError(f'O servidor {modo} terminou ao iniciar (código {servidor.returncode}).')
+            if _get(url)[0]:
+                return servidor
+            time.sleep(0.2)
+        servidor.terminate()
+        raise CommandError(f'O servidor {modo} não respondeu em {url}.')
+
+    def _carga(self, modo, options):
+        base = f'http://127.0.0.1:{options["porta"]}{PREFIXOS[modo]}'
+        urls = [base + CAMINHOS[indice % len(CAMINHOS)] for indice in range(options['requisicoes'])]
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(options['concorrencia']) as executor:
+            respostas = list(executor.map(_get, urls))
+        total = time.perf_counter() - inicio
+
+        tempos = sorted(tempo * 1000 for ok, tempo in respostas if ok)
+        erros = len(respostas) - len(tempos)
+        if not tempos:
+            raise CommandError(f'Nenhuma requisição {modo} teve sucesso.')
+        p95 = tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))]
+        resultado = (len(tempos) / total, statistics.median(tempos), p95, erros)
+        self.stdout.write(
+            f'{len(respostas)} requisições em {total:.1f}s: {resultado[0]:.1f} req/s, '
+            f'p50 {resultado[1]:.1f} ms, p95 {resultado[2]:.1f} ms, {erros} erros'
+        )
+        return resultado
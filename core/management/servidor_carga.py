@@ -0,0 +1,34 @@
+import os
+import time
+
+from django.db.backends.signals import connection_created
+
+from config.asgi import application as asgi
+from config.wsgi import application as wsgi
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Aplicações WSGI e ASGI usadas SÓ pelos servidores do comando 'teste_carga'
+# (gunicorn 'core.management.servidor_carga:wsgi', uvicorn '...:asgi'). São as
+# mesmas do projeto, mais um atraso artificial de LATENCIA_SIMULADA_BANCO_MS
+# (variável de ambiente) em cada consulta, como o de um Postgres em outra
+# máquina. Nada disso é carregado pela aplicação em produção.
+# -----------------------------------------------------------------------------
+
+LATENCIA_SIMULADA_BANCO_MS = int(os.environ.get('LATENCIA_SIMULADA_BANCO_MS', 0))
+
+
+def _atrasar_consulta(execute, sql, params, many, context):
+    time.sleep(LATENCIA_SIMULADA_BANCO_MS / 1000)
+    return execute(sql, params, many, context)
+
+
+def _ao_conectar(sender, connection, **kwargs):
+    if _atrasar_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_atrasar_consulta)
+
+
+if LATENCIA_SIMULADA_BANCO_MS:
+    connection_created.connect(_ao_conectar, dispatch_uid='core-latencia-simulada')
+
+__all__ = ['asgi', 'wsgi']
@@ -0,0 +1,371 @@
+import copy
+import os
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .cache_respostas import estatisticas as estatisticas_cache
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Métricas por rota e ação (ex.: rota "pagamento-list", ação "list"), no
+# formato texto do Prometheus em GET /api/metrics/.
+#
+# O MetricasMiddleware (ligado com METRICAS_ATIVAS=true) mede cada requisição:
+#   - tempo total e tamanho da resposta;
+#   - tempo no banco e número de consultas, por um "execute wrapper" instalado
+#     em cada conexão, que soma na coleta da requisição atual (ContextVar, que
+#     também acompanha as consultas do ORM assíncrono);
+#   - tempo de serialização: o tempo da view fora do banco (serializers e
+#     renderização do JSON);
+#   - consultas repetidas (N+1): o mesmo SQL, com parâmetros diferentes,
+#     executado REPETICOES_N_MAIS_1 vezes ou mais na mesma requisição.
+#
+# Amostragem: só uma fração METRICAS_AMOSTRAGEM das requisições mede banco,
+# serialização e tamanho; todas contam e medem o tempo total, o que custa
+# duas leituras de relógio e um lock. Com 0.05 em produção, o custo das
+# medições detalhadas fica diluído em 1 de cada 20 requisições.
+#
+# Os histogramas são cumulativos, como o Prometheus espera: a janela
+# ("últimos 5 minutos") é feita na consulta, com rate()/histogram_quantile().
+# Cada processo guarda os próprios números e os publica a cada
+# PUBLICAR_A_CADA segundos no cache 'metricas'; /api/metrics/ soma os
+# números de todos os processos que publicaram.
+#
+# Para achar os processos sem uma lista compartilhada (que seria um
+# "lê-altera-grava" com perda de PIDs entre workers concorrentes), cada
+# processo ocupa uma das MAXIMO_PROCESSOS "vagas" com cache.add(), que é
+# atômico, e a renova a cada publicação. Vaga e números expiram depois de
+# VALIDADE_PUBLICACAO sem publicar, então processos mortos somem sozinhos.
+# -----------------------------------------------------------------------------
+
+BALDES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BALDES_CONSULTAS = (1, 2, 3, 5, 10, 20, 50, 100)
+BALDES_BYTES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# nome: (baldes, descrição). Só 'duracao_segundos' inclui as requisições
+# não amostradas.
+HISTOGRAMAS = {
+    'duracao_segundos': (BALDES_SEGUNDOS, 'Tempo total da requisição.'),
+    'banco_segundos': (BALDES_SEGUNDOS, 'Tempo gasto em consultas ao banco (amostradas).'),
+    'consultas': (BALDES_CONSULTAS, 'Consultas ao banco por requisição (amostradas).'),
+    'serializacao_segundos': (BALDES_SEGUNDOS, 'Tempo da view fora do banco: serializers e JSON (amostradas).'),
+    'resposta_bytes': (BALDES_BYTES, 'Tamanho do corpo da resposta (amostradas).'),
+}
+
+REPETICOES_N_MAIS_1 = 3
+MAXIMO_ASSINATURAS = 100
+TAMANHO_MAXIMO_SQL = 200
+
+ALIAS_CACHE = 'metricas'
+PUBLICAR_A_CADA = 15
+VALIDADE_PUBLICACAO = 60 * 60
+MAXIMO_PROCESSOS = 64
+
+_coleta_atual = ContextVar('coleta_metricas', default=None)
+
+
+class Coleta:
+    """Números de UMA requisição amostrada."""
+    __slots__ = ('consultas', 'tempo_banco', 'sqls', 'inicio_view', 'banco_antes_da_view')
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo_banco = 0.0
+        self.sqls = Counter()
+        self.inicio_view = None
+        self.banco_antes_da_view = 0.0
+
+
+def _medir_consulta(execute, sql, params, many, context):
+    coleta = _coleta_atual.get()
+    if coleta is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        coleta.tempo_banco += time.perf_counter() - inicio
+        coleta.consultas += 1
+        coleta.sqls[sql] += 1
+
+
+def _instalar_na_conexao(connection, **kwargs):
+    if _medir_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_medir_consulta)
+
+
+def instalar_medicao_do_banco():
+    """Instala a medição nas conexões abertas e nas que forem criadas depois."""
+    connection_created.connect(
+        lambda sender, connection, **kwargs: _instalar_na_conexao(connection),
+        weak=False, dispatch_uid='core-metricas-banco',
+    )
+    for connection in connections.all(initialized_only=True):
+        _instalar_na_conexao(connection)
+
+
+def normalizar_sql(sql):
+    """SQL sem variações de tamanho em 'IN (%s, %s, ...)' e de espaços."""
+    sql = re.sub(r'\(\s*%s(?:\s*,\s*%s)*\s*\)', '(%s, ...)', sql)
+    return ' '.join(sql.split())[:TAMANHO_MAXIMO_SQL]
+
+
+def _novo_histograma(baldes):
+    return {'baldes': [0] * (len(baldes) + 1), 'soma': 0.0}
+
+
+def _observar(histograma, baldes, valor):
+    histograma['baldes'][bisect_left(baldes, valor)] += 1
+    histograma['soma'] += valor
+
+
+def _nova_serie():
+    return {
+        'requisicoes': 0,
+        'amostradas': 0,
+        'com_n_mais_1': 0,
+        'histogramas': {nome: _novo_histograma(baldes) for nome, (baldes, _) in HISTOGRAMAS.items()},
+    }
+
+
+def _chave_da_vaga(vaga):
+    return f'metricas:vaga:{vaga}'
+
+
+class Registro:
+    """Métricas acumuladas do processo."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._publicado_em = 0.0
+        self._vaga = None
+        self.limpar()
+
+    def limpar(self):
+        self.series = {}
+        self.assinaturas = {}
+
+    def registrar(self, rota, acao, duracao, coleta=None, serializacao=None, tamanho=None):
+        repetidas = set()
+        if coleta is not None:
+            repetidas = {normalizar_sql(sql) for sql, vezes in coleta.sqls.items() if vezes >= REPETICOES_N_MAIS_1}
+
+        with self._trava:
+            serie = self.series.get((rota, acao))
+            if serie is None:
+                serie = self.series[(rota, acao)] = _nova_serie()
+            histogramas = serie['histogramas']
+            serie['requisicoes'] += 1
+            _observar(histogramas['duracao_segundos'], BALDES_SEGUNDOS, duracao)
+            if coleta is None:
+                return
+
+            serie['amostradas'] += 1
+            _observar(histogramas['banco_segundos'], BALDES_SEGUNDOS, coleta.tempo_banco)
+            _observar(histogramas['consultas'], BALDES_CONSULTAS, coleta.consultas)
+            _observar(histogramas['serializacao_segundos'], BALDES_SEGUNDOS, serializacao or 0.0)
+            _observar(histogramas['resposta_bytes'], BALDES_BYTES, tamanho or 0)
+            if repetidas:
+                serie['com_n_mais_1'] += 1
+            for sql in repetidas:
+                chave = (rota, acao, sql)
+                if chave in self.assinaturas or len(self.assinaturas) < MAXIMO_ASSINATURAS:
+                    self.assinaturas[chave] = self.assinaturas.get(chave, 0) + 1
+
+    def copia(self):
+        with self._trava:
+            return copy.deepcopy({'series': self.series, 'assinaturas': self.assinaturas})
+
+    def hora_de_publicar(self):
+        return time.monotonic() - self._publicado_em >= PUBLICAR_A_CADA
+
+    def publicar(self):
+        """Guarda a cópia deste processo no cache 'metricas' e renova a vaga."""
+        self._publicado_em = time.monotonic()
+        cache = caches[ALIAS_CACHE]
+        pid = os.getpid()
+        cache.set(f'metricas:processo:{pid}', self.copia(), VALIDADE_PUBLICACAO)
+        if self._vaga is not None and cache.get(_chave_da_vaga(self._vaga)) == pid:
+            cache.touch(_chave_da_vaga(self._vaga), VALIDADE_PUBLICACAO)
+            return
+        # Primeira publicação (ou a vaga expirou): ocupa a primeira livre.
+        self._vaga = None
+        for vaga in range(MAXIMO_PROCESSOS):
+            if cache.add(_chave_da_vaga(vaga), pid, VALIDADE_PUBLICACAO) or cache.get(_chave_da_vaga(vaga)) == pid:
+                self._vaga = vaga
+                return
+
+    def de_todos_os_processos(self):
+        """Soma as cópias publicadas por todos os processos (incluindo este)."""
+        self.publicar()
+        cache = caches[ALIAS_CACHE]
+        pids = cache.get_many([_chave_da_vaga(vaga) for vaga in range(MAXIMO_PROCESSOS)]).values()
+        chaves = [f'metricas:processo:{pid}' for pid in pids]
+        copias = list(cache.get_many(chaves).values()) or [self.copia()]
+
+        total = {'series': {}, 'assinaturas': {}}
+        for copia in copias:
+            for chave, serie in copia['series'].items():
+                soma = total['series'].setdefault(chave, _nova_serie())
+                for campo in ('requisicoes', 'amostradas', 'com_n_mais_1'):
+                    soma[campo] += serie[campo]
+                for nome, histograma in serie['histogramas'].items():
+                    destino = soma['histogramas'][nome]
+                    destino['baldes'] = [a + b for a, b in zip(destino['baldes'], histograma['baldes'])]
+                    destino['soma'] += histograma['soma']
+            for chave, vezes in copia['assinaturas'].items():
+                total['assinaturas'][chave] = total['assinaturas'].get(chave, 0) + vezes
+        return total, len(copias)
+
+
+registro = Registro()
+
+
+def _rota_e_acao(request):
+    resolucao = getattr(request, 'resolver_match', None)
+    metodo = request.method.lower()
+    if resolucao is None:
+        return 'nao_encontrada', metodo
+    # ViewSets do DRF guardam {'get': 'list', ...} na função da rota.
+    acoes = getattr(resolucao.func, 'actions', None) or {}
+    return resolucao.view_name or resolucao.route, acoes.get(metodo, metodo)
+
+
+def _tamanho(resposta):
+    if resposta.streaming:
+        return int(resposta.get('Content-Length') or 0)
+    return len(resposta.content)
+
+
+class MetricasMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICAS_ATIVAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        instalar_medicao_do_banco()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Sem isto, o Django chamaria o process_view numa thread.
+            self.process_view = self._aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        inicio, token = self._iniciar()
+        resposta = self.get_response(request)
+        self._finalizar(request, resposta, inicio, token)
+        if registro.hora_de_publicar():
+            registro.publicar()
+        return resposta
+
+    async def __acall__(self, request):
+        inicio, token = self._iniciar()
+        resposta = await self.get_response(request)
+        self._finalizar(request, resposta, inicio, token)
+        if registro.hora_de_publicar():
+            await sync_to_async(registro.publicar)()
+        return resposta
+
+    def _iniciar(self):
+        coleta = Coleta() if random.random() < settings.METRICAS_AMOSTRAGEM else None
+        return time.perf_counter(), _coleta_atual.set(coleta)
+
+    def _finalizar(self, request, resposta, inicio, token):
+        fim = time.perf_counter()
+        coleta = _coleta_atual.get()
+        _coleta_atual.reset(token)
+        rota, acao = _rota_e_acao(request)
+        if coleta is None:
+            registro.registrar(rota, acao, fim - inicio)
+            return
+        serializacao = None
+        if coleta.inicio_view is not None:
+            banco_na_view = coleta.tempo_banco - coleta.banco_antes_da_view
+            serializacao = max(fim - coleta.inicio_view - banco_na_view, 0.0)
+        registro.registrar(rota, acao, fim - inicio, coleta, serializacao, _tamanho(resposta))
+
+    @staticmethod
+    def _marcar_inicio_da_view():
+        coleta = _coleta_atual.get()
+        if coleta is not None:
+            coleta.inicio_view = time.perf_counter()
+            coleta.banco_antes_da_view = coleta.tempo_banco
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self._marcar_inicio_da_view()
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self._marcar_inicio_da_view()
+
+
+# --- Formato texto do Prometheus ---
+
+def _rotulos(**rotulos):
+    def escapar(valor):
+        return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{nome}="{escapar(valor)}"' for nome, valor in rotulos.items()) + '}'
+
+
+def _numero(valor):
+    return repr(round(valor, 6)) if isinstance(valor, float) else str(valor)
+
+
+def texto_prometheus():
+    """Todas as métricas no formato texto de exposição do Prometheus (0.0.4)."""
+    dados, processos = registro.de_todos_os_processos()
+    series = sorted(dados['series'].items())
+    linhas = []
+
+    def metrica(nome, tipo, ajuda):
+        linhas.append(f'# HELP api_{nome} {ajuda}')
+        linhas.append(f'# TYPE api_{nome} {tipo}')
+
+    metrica('processos', 'gauge', 'Processos cujas métricas estão somadas aqui.')
+    linhas.append(f'api_processos {processos}')
+
+    for campo, ajuda in (
+        ('requisicoes', 'Requisições atendidas.'),
+        ('amostradas', 'Requisições com medição detalhada (amostragem).'),
+        ('com_n_mais_1', 'Requisições amostradas com consultas repetidas (N+1).'),
+    ):
+        metrica(f'{campo}_total', 'counter', ajuda)
+        for (rota, acao), serie in series:
+            linhas.append(f'api_{campo}_total{_rotulos(rota=rota, acao=acao)} {serie[campo]}')
+
+    for nome, (baldes, ajuda) in HISTOGRAMAS.items():
+        metrica(nome, 'histogram', ajuda)
+        for (rota, acao), serie in series:
+            histograma = serie['histogramas'][nome]
+            acumulado = 0
+            for limite, quantidade in zip([*baldes, '+Inf'], histograma['baldes']):
+                acumulado += quantidade
+                linhas.append(f'api_{nome}_bucket{_rotulos(rota=rota, acao=acao, le=limite)} {acumulado}')
+            linhas.append(f'api_{nome}_sum{_rotulos(rota=rota, acao=acao)} {_numero(histograma["soma"])}')
+            linhas.append(f'api_{nome}_count{_rotulos(rota=rota, acao=acao)} {acumulado}')
+
+    metrica('consultas_repetidas_total', 'counter',
+            f'Requisições em que o mesmo SQL rodou {REPETICOES_N_MAIS_1}+ vezes (provável N+1).')
+    for (rota, acao, sql), vezes in sorted(dados['assinaturas'].items()):
+        linhas.append(f'api_consultas_repetidas_total{_rotulos(rota=rota, acao=acao, sql=sql)} {vezes}')
+
+    metrica('cache_respostas_total', 'counter', 'Acertos e faltas do cache de respostas, por tabela.')
+    for tabela, numeros in sorted(estatisticas_cache().items()):
+        for evento in ('acertos', 'faltas'):
+            linhas.append(f'api_cache_respostas_total{_rotulos(tabela=tabela, evento=evento)} {numeros[evento]}')
+
+    return '\n'.join(linhas) + '\n'
@@ -0,0 +1,35 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# O WhiteNoiseMiddleware só funciona no modo síncrono. Sob ASGI (uvicorn), um
+# único middleware síncrono faz o Django rodar a requisição inteira numa
+# thread, e as views assíncronas (core/assincrono.py) perdem a vantagem.
+# Esta versão aceita os dois modos: os arquivos estáticos continuam servidos
+# pelo WhiteNoise e o resto segue, sem threads, para o próximo middleware.
+# -----------------------------------------------------------------------------
+
+
+class WhiteNoiseAssincronoMiddleware(WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.4 on 2026-10-17 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_imovel_seguro_corretora_imovel_seguro_seguradora_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contrato',
+            name='data_fim',
+            field=models.DateField(db_index=True, verbose_name='Data de Fim'),
+        ),
+        migrations.AlterField(
+            model_name='contrato',
+            name='status_contrato',
+            field=models.CharField(choices=[('Ativo', 'Ativo'), ('Encerrado', 'Encerrado'), ('Rescindido', 'Rescindido'), ('Renovado', 'Renovado')], db_index=True, default='Ativo', max_length=20, verbose_name='Status do Contrato'),
+        ),
+        migrations.AlterField(
+            model_name='imovel',
+            name='avcb_vencimento',
+            field=models.DateField(blank=True, db_index=True, null=True, verbose_name='Vencimento AVCB'),
+        ),
+        migrations.AlterField(
+            model_name='imovel',
+            name='seguro_vencimento',
+            field=models.DateField(blank=True, db_index=True, null=True, verbose_name='Vencimento do Seguro'),
+        ),
+        migrations.AlterField(
+            model_name='imovel',
+            name='status_imovel',
+            field=models.CharField(choices=[('Disponível', 'Disponível'), ('Alugado', 'Alugado'), ('Vendido', 'Vendido'), ('Em Manutenção', 'Em Manutenção'), ('Inativo', 'Inativo')], db_index=True, default='Disponível', max_length=50, verbose_name='Status do Imóvel'),
+        ),
+        migrations.AlterField(
+            model_name='imovel',
+            name='vencimento_caixa_dagua',
+            field=models.DateField(blank=True, db_index=True, null=True, verbose_name="Vencimento Certificado Caixa d'Água"),
+        ),
+        migrations.AlterField(
+            model_name='imovel',
+            name='vencimento_dedetizacao',
+            field=models.DateField(blank=True, db_index=True, null=True, verbose_name='Vencimento da Dedetização'),
+        ),
+        migrations.AlterField(
+            model_name='imovel',
+            name='vencimento_extintores',
+            field=models.DateField(blank=True, db_index=True, null=True, verbose_name='Vencimento dos Extintores'),
+        ),
+        migrations.AlterField(
+            model_name='manutencao',
+            name='status_manutencao',
+            field=models.CharField(choices=[('Pendente', 'Pendente'), ('Em Andamento', 'Em Andamento'), ('Concluído', 'Concluído'), ('Cancelado', 'Cancelado')], db_index=True, default='Pendente', max_length=20, verbose_name='Status'),
+        ),
+        migrations.AlterField(
+            model_name='pagamento',
+            name='data_pagamento',
+            field=models.DateField(db_index=True, verbose_name='Data do Pagamento'),
+        ),
+        migrations.AlterField(
+            model_name='pagamento',
+            name='status_pagamento',
+            field=models.CharField(choices=[('Pago', 'Pago'), ('Pendente', 'Pendente'), ('Em Atraso', 'Em Atraso')], db_index=True, default='Pendente', max_length=20, verbose_name='Status'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-17 18:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_alter_contrato_data_fim_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pagamento',
+            name='data_pagamento',
+            field=models.DateField(verbose_name='Data do Pagamento'),
+        ),
+        migrations.AddIndex(
+            model_name='contrato',
+            index=models.Index(fields=['data_inicio', 'id'], name='contrato_inicio_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documento',
+            index=models.Index(fields=['data_documento', 'id'], name='documento_data_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imovel',
+            index=models.Index(fields=['data_cadastro', 'id'], name='imovel_cadastro_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manutencao',
+            index=models.Index(fields=['data_solicitacao', 'id'], name='manutencao_solicit_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pagamento',
+            index=models.Index(fields=['data_pagamento', 'id'], name='pagamento_data_id_idx'),
+        ),
+    ]
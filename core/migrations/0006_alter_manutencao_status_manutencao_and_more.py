@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-17 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_alter_pagamento_data_pagamento_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='manutencao',
+            name='status_manutencao',
+            field=models.CharField(choices=[('Pendente', 'Pendente'), ('Em Andamento', 'Em Andamento'), ('Concluído', 'Concluído'), ('Cancelado', 'Cancelado')], default='Pendente', max_length=20, verbose_name='Status'),
+        ),
+        migrations.AlterField(
+            model_name='pagamento',
+            name='status_pagamento',
+            field=models.CharField(choices=[('Pago', 'Pago'), ('Pendente', 'Pendente'), ('Em Atraso', 'Em Atraso')], default='Pendente', max_length=20, verbose_name='Status'),
+        ),
+        migrations.AddIndex(
+            model_name='contrato',
+            index=models.Index(condition=models.Q(('status_contrato', 'Ativo')), fields=['data_fim'], name='contrato_ativo_fim_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manutencao',
+            index=models.Index(fields=['status_manutencao', 'data_solicitacao'], name='manutencao_status_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pagamento',
+            index=models.Index(fields=['status_pagamento', 'data_pagamento'], name='pagamento_status_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pagamento',
+            index=models.Index(condition=models.Q(('status_pagamento', 'Pendente')), fields=['data_pagamento'], name='pagamento_pendente_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-17 18:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_alter_manutencao_status_manutencao_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pagamento',
+            name='competencia',
+            field=models.DateField(blank=True, null=True, verbose_name='Competência (Mês de Referência)'),
+        ),
+        migrations.AddConstraint(
+            model_name='pagamento',
+            constraint=models.UniqueConstraint(fields=('contrato', 'competencia'), name='pagamento_contrato_competencia_uniq'),
+        ),
+    ]
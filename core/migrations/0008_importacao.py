@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-17 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_pagamento_competencia_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Importacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recurso', models.CharField(max_length=50, verbose_name='Recurso')),
+                ('hash_arquivo', models.CharField(max_length=64, verbose_name='Hash SHA-256 do Arquivo')),
+                ('nome_arquivo', models.CharField(blank=True, max_length=255, verbose_name='Nome do Arquivo')),
+                ('linhas_processadas', models.PositiveIntegerField(default=0, verbose_name='Linhas Processadas')),
+                ('criados', models.PositiveIntegerField(default=0, verbose_name='Registros Criados')),
+                ('erros', models.PositiveIntegerField(default=0, verbose_name='Linhas com Erro')),
+                ('status', models.CharField(choices=[('Em Andamento', 'Em Andamento'), ('Concluída', 'Concluída')], default='Em Andamento', max_length=20)),
+                ('iniciada_em', models.DateTimeField(auto_now_add=True, verbose_name='Iniciada em')),
+                ('atualizada_em', models.DateTimeField(auto_now=True, verbose_name='Atualizada em')),
+            ],
+            options={
+                'verbose_name': 'Importação',
+                'verbose_name_plural': 'Importações',
+                'constraints': [models.UniqueConstraint(fields=('recurso', 'hash_arquivo'), name='importacao_recurso_hash_uniq')],
+            },
+        ),
+    ]
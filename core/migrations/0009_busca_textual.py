@@ -0,0 +1,54 @@
+from django.db import migrations
+
+# Colunas 'busca' (tsvector gerado) e índices da busca textual (core/busca.py).
+# Só se aplica ao Postgres; nos outros bancos a busca usa icontains.
+
+PESSOAS = [('nome', 'A', 'portuguese'), ('email', 'B', 'simple'), ('cpf_cnpj', 'B', 'simple')]
+
+TABELAS = {
+    'core_imovel': [('endereco', 'A', 'portuguese'), ('descricao', 'C', 'portuguese')],
+    'core_locador': PESSOAS,
+    'core_locatario': PESSOAS,
+    'core_fiador': PESSOAS,
+    'core_intermediario': PESSOAS,
+    'core_contrato': [('clausulas_especificas', 'C', 'portuguese')],
+}
+
+
+def criar_busca(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for tabela, campos in TABELAS.items():
+        vetor = ' || '.join(
+            f"setweight(to_tsvector('{config}', coalesce({campo}, '')), '{peso}')"
+            for campo, peso, config in campos
+        )
+        schema_editor.execute(
+            f'ALTER TABLE {tabela} ADD COLUMN busca tsvector GENERATED ALWAYS AS ({vetor}) STORED'
+        )
+        schema_editor.execute(f'CREATE INDEX {tabela}_busca_gin ON {tabela} USING gin (busca)')
+        if campos is PESSOAS:
+            schema_editor.execute(
+                f'CREATE INDEX {tabela}_cpf_cnpj_trgm ON {tabela} USING gin (cpf_cnpj gin_trgm_ops)'
+            )
+
+
+def remover_busca(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for tabela, campos in TABELAS.items():
+        if campos is PESSOAS:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {tabela}_cpf_cnpj_trgm')
+        schema_editor.execute(f'ALTER TABLE {tabela} DROP COLUMN IF EXISTS busca')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_importacao'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_busca, remover_busca),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.4 on 2026-10-17 18:44
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def criar_versoes(apps, schema_editor):
+    # Uma linha por modelo: assim cada escrita custa só um UPDATE.
+    VersaoTabela = apps.get_model('core', 'VersaoTabela')
+    agora = timezone.now()
+    VersaoTabela.objects.bulk_create([
+        VersaoTabela(tabela=model._meta.label_lower, versao=1, data_atualizacao=agora)
+        for model in apps.get_app_config('core').get_models()
+        if model is not VersaoTabela
+    ], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_busca_textual'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersaoTabela',
+            fields=[
+                ('tabela', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Modelo')),
+                ('versao', models.PositiveBigIntegerField(default=0, verbose_name='Versão')),
+                ('data_atualizacao', models.DateTimeField(verbose_name='Última Atualização')),
+            ],
+            options={
+                'verbose_name': 'Versão de Tabela',
+                'verbose_name_plural': 'Versões de Tabelas',
+            },
+        ),
+        migrations.AddField(
+            model_name='contrato',
+            name='data_atualizacao',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última Atualização'),
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='data_atualizacao',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última Atualização'),
+        ),
+        migrations.AddField(
+            model_name='fiador',
+            name='data_atualizacao',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última Atualização'),
+        ),
+        migrations.AddField(
+            model_name='imovel',
+            name='data_atualizacao',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última Atualização'),
+        ),
+        migrations.AddField(
+            model_name='intermediario',
+            name='data_atualizacao',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última Atualização'),
+        ),
+        migrations.AddField(
+            model_name='locador',
+            name='data_atualizacao',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última Atualização'),
+        ),
+        migrations.AddField(
+            model_name='locatario',
+            name='data_atualizacao',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última Atualização'),
+        ),
+        migrations.AddField(
+            model_name='manutencao',
+            name='data_atualizacao',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última Atualização'),
+        ),
+        migrations.AddField(
+            model_name='pagamento',
+            name='data_atualizacao',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última Atualização'),
+        ),
+        migrations.RunPython(criar_versoes, migrations.RunPython.noop),
+    ]
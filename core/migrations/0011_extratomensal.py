@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-17 19:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_versaotabela_contrato_data_atualizacao_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtratoMensal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(verbose_name='Mês de Referência')),
+                ('pagamentos', models.PositiveIntegerField(default=0, verbose_name='Pagamentos Recebidos')),
+                ('aluguel_recebido', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Aluguel Recebido')),
+                ('multa_juros', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Multa/Juros Recebidos')),
+                ('condominio', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Condomínio')),
+                ('iptu', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='IPTU')),
+                ('manutencoes', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Manutenções')),
+                ('taxa_administracao', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Taxa de Administração')),
+                ('valor_repasse', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Valor do Repasse')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('locador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='extratos', to='core.locador', verbose_name='Locador')),
+            ],
+            options={
+                'verbose_name': 'Extrato Mensal',
+                'verbose_name_plural': 'Extratos Mensais',
+                'indexes': [models.Index(fields=['mes', 'locador'], name='extrato_mes_locador_idx')],
+                'constraints': [models.UniqueConstraint(fields=('locador', 'mes'), name='extrato_locador_mes_uniq')],
+            },
+        ),
+    ]
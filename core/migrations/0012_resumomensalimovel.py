@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-17 19:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_extratomensal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoMensalImovel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(verbose_name='Mês de Referência')),
+                ('receita', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Receita (Aluguel + Multas)')),
+                ('manutencoes', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Custo de Manutenções')),
+                ('dias_ocupados', models.PositiveSmallIntegerField(default=0, verbose_name='Dias com Contrato Vigente')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('imovel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumos_mensais', to='core.imovel', verbose_name='Imóvel')),
+            ],
+            options={
+                'verbose_name': 'Resumo Mensal do Imóvel',
+                'verbose_name_plural': 'Resumos Mensais dos Imóveis',
+                'indexes': [models.Index(fields=['mes', 'imovel'], name='resumo_mes_imovel_idx')],
+                'constraints': [models.UniqueConstraint(fields=('imovel', 'mes'), name='resumo_imovel_mes_uniq')],
+            },
+        ),
+    ]
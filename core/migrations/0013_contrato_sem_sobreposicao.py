@@ -0,0 +1,86 @@
+# Generated by Django 5.2.4 on 2026-10-17 19:24
+
+from django.db import migrations, models
+
+# Contratos 'Ativo' do mesmo imóvel não podem ter vigências sobrepostas
+# (core/ocupacao.py). No Postgres, restrição de exclusão com índice GiST; no
+# SQLite, gatilhos que consultam o índice contrato_imovel_periodo_idx.
+# Atenção: no SQLite, migrações que recriam a tabela core_contrato (ex.:
+# AlterField) apagam os gatilhos; recrie-os com 'criar_restricao'.
+
+NOME = 'contrato_sem_sobreposicao'
+
+SOBREPOSTOS = """
+    SELECT a.id, b.id FROM core_contrato a JOIN core_contrato b
+      ON b.imovel_id = a.imovel_id AND b.id > a.id
+     AND b.data_inicio <= a.data_fim AND b.data_fim >= a.data_inicio
+   WHERE a.status_contrato = 'Ativo' AND b.status_contrato = 'Ativo'
+"""
+
+GATILHO_SQLITE = f"""
+    CREATE TRIGGER {NOME}_{{evento}} BEFORE {{quando}} ON core_contrato
+    WHEN NEW.status_contrato = 'Ativo'
+    BEGIN
+        SELECT RAISE(ABORT, '{NOME}: já existe um contrato ativo do imóvel nesse período')
+         WHERE EXISTS (
+            SELECT 1 FROM core_contrato c
+             WHERE c.imovel_id = NEW.imovel_id AND c.status_contrato = 'Ativo'
+               AND c.data_inicio <= NEW.data_fim AND c.data_fim >= NEW.data_inicio
+               AND c.id IS NOT NEW.id
+         );
+    END
+"""
+
+EVENTOS_SQLITE = {
+    'insert': 'INSERT',
+    'update': 'UPDATE OF imovel_id, data_inicio, data_fim, status_contrato',
+}
+
+
+def criar_restricao(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('postgresql', 'sqlite'):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(SOBREPOSTOS + ' LIMIT 20')
+        pares = cursor.fetchall()
+    if pares:
+        raise RuntimeError(
+            'Há contratos ativos com vigências sobrepostas no mesmo imóvel (ids): '
+            + ', '.join(f'{a} e {b}' for a, b in pares)
+            + '. Encerre ou ajuste as datas de um deles antes de aplicar esta migração.'
+        )
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        schema_editor.execute(
+            f'ALTER TABLE core_contrato ADD CONSTRAINT {NOME} EXCLUDE USING gist '
+            f"(imovel_id WITH =, daterange(data_inicio, data_fim, '[]') WITH &&) "
+            f"WHERE (status_contrato = 'Ativo')"
+        )
+    else:
+        for evento, quando in EVENTOS_SQLITE.items():
+            schema_editor.execute(GATILHO_SQLITE.format(evento=evento, quando=quando))
+
+
+def remover_restricao(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'ALTER TABLE core_contrato DROP CONSTRAINT IF EXISTS {NOME}')
+    elif vendor == 'sqlite':
+        for evento in EVENTOS_SQLITE:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {NOME}_{evento}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_resumomensalimovel'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contrato',
+            index=models.Index(fields=['imovel', 'data_inicio', 'data_fim'], name='contrato_imovel_periodo_idx'),
+        ),
+        migrations.RunPython(criar_restricao, remover_restricao),
+    ]
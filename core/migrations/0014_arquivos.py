@@ -0,0 +1,64 @@
+# Generated by Django 5.2.4 on 2026-10-17 19:29
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_contrato_sem_sobreposicao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Arquivo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='Hash SHA-256')),
+                ('tamanho', models.PositiveBigIntegerField(verbose_name='Tamanho (bytes)')),
+                ('tipo_conteudo', models.CharField(default='application/octet-stream', max_length=100, verbose_name='Tipo de Conteúdo')),
+                ('nome', models.CharField(max_length=255, verbose_name='Nome do Arquivo')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+            ],
+            options={
+                'verbose_name': 'Arquivo',
+                'verbose_name_plural': 'Arquivos',
+            },
+        ),
+        migrations.AlterField(
+            model_name='documento',
+            name='arquivo_documento',
+            field=models.CharField(blank=True, default='', help_text='Caminho ou URL para o arquivo', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='arquivo',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='documentos', to='core.arquivo', verbose_name='Arquivo'),
+        ),
+        migrations.AddField(
+            model_name='pagamento',
+            name='comprovante',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='pagamentos', to='core.arquivo', verbose_name='Comprovante'),
+        ),
+        migrations.CreateModel(
+            name='EnvioArquivo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='Chave')),
+                ('nome', models.CharField(max_length=255, verbose_name='Nome do Arquivo')),
+                ('tipo_conteudo', models.CharField(default='application/octet-stream', max_length=100, verbose_name='Tipo de Conteúdo')),
+                ('tamanho', models.PositiveBigIntegerField(verbose_name='Tamanho Total (bytes)')),
+                ('recebido', models.PositiveBigIntegerField(default=0, verbose_name='Bytes Recebidos')),
+                ('status', models.CharField(choices=[('Em Andamento', 'Em Andamento'), ('Concluído', 'Concluído')], default='Em Andamento', max_length=20)),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('arquivo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.arquivo', verbose_name='Arquivo')),
+            ],
+            options={
+                'verbose_name': 'Envio de Arquivo',
+                'verbose_name_plural': 'Envios de Arquivos',
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-17 19:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_arquivos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imovel',
+            name='miniatura',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, verbose_name='Miniatura'),
+        ),
+        migrations.CreateModel(
+            name='FotoImovel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('legenda', models.CharField(blank=True, default='', max_length=255, verbose_name='Legenda')),
+                ('ordem', models.PositiveSmallIntegerField(default=0, verbose_name='Ordem')),
+                ('status', models.CharField(choices=[('Pendente', 'Pendente'), ('Processando', 'Processando'), ('Pronta', 'Pronta'), ('Erro', 'Erro')], default='Pendente', max_length=20)),
+                ('largura', models.PositiveIntegerField(blank=True, null=True, verbose_name='Largura')),
+                ('altura', models.PositiveIntegerField(blank=True, null=True, verbose_name='Altura')),
+                ('versao', models.PositiveSmallIntegerField(default=0, verbose_name='Versão das Variantes')),
+                ('tentativas', models.PositiveSmallIntegerField(default=0, verbose_name='Tentativas')),
+                ('erro', models.CharField(blank=True, default='', max_length=255, verbose_name='Erro')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('arquivo', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='fotos', to='core.arquivo', verbose_name='Original')),
+                ('imovel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fotos', to='core.imovel')),
+            ],
+            options={
+                'verbose_name': 'Foto do Imóvel',
+                'verbose_name_plural': 'Fotos dos Imóveis',
+                'ordering': ['ordem', 'id'],
+                'indexes': [models.Index(fields=['imovel', 'ordem', 'id'], name='foto_imovel_ordem_idx'), models.Index(condition=models.Q(('status__in', ['Pendente', 'Processando'])), fields=['atualizado_em'], name='foto_a_processar_idx')],
+            },
+        ),
+    ]
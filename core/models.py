@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 
 # -----------------------------------------------------------------------------
@@ -32,8 +34,9 @@ class Imovel(models.Model):
     tipo_imovel = models.CharField(max_length=50, choices=TIPO_IMOVEL_CHOICES, verbose_name="Tipo de Imóvel")
     endereco = models.CharField(max_length=255, verbose_name="Endereço Completo")
     descricao = models.TextField(blank=True, null=True, verbose_name="Descrição Detalhada")
-    status_imovel = models.CharField(max_length=50, choices=STATUS_IMOVEL_CHOICES, default='Disponível', verbose_name="Status do Imóvel")
+    status_imovel = models.CharField(max_length=50, choices=STATUS_IMOVEL_CHOICES, default='Disponível', db_index=True, verbose_name="Status do Imóvel")
     data_cadastro = models.DateTimeField(auto_now_add=True, verbose_name="Data de Cadastro")
+    data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
     
     # Características Físicas
     area_util = models.PositiveIntegerField(verbose_name="Área Útil (m²)")
@@ -62,7 +65,7 @@ class Imovel(models.Model):
     iptu_valor = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Valor do IPTU")
     
     # NOVOS CAMPOS: Seguro do Imóvel
-    seguro_vencimento = models.DateField(blank=True, null=True, verbose_name="Vencimento do Seguro")
+    seguro_vencimento = models.DateField(blank=True, null=True, db_index=True, verbose_name="Vencimento do Seguro")
     seguro_corretora = models.CharField(max_length=255, blank=True, null=True, verbose_name="Corretora do Seguro")
     seguro_seguradora = models.CharField(max_length=255, blank=True, null=True, verbose_name="Seguradora")
     seguro_valor = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, verbose_name="Valor do Seguro")
@@ -70,19 +73,32 @@ class Imovel(models.Model):
     # --- NOVOS CAMPOS: CERTIFICADOS COMERCIAIS ---
     avcb_codigo = models.CharField(max_length=100, blank=True, null=True, verbose_name="Código AVCB")
     avcb_emissao = models.DateField(blank=True, null=True, verbose_name="Emissão AVCB")
-    avcb_vencimento = models.DateField(blank=True, null=True, verbose_name="Vencimento AVCB")
-    vencimento_extintores = models.DateField(blank=True, null=True, verbose_name="Vencimento dos Extintores")
-    vencimento_dedetizacao = models.DateField(blank=True, null=True, verbose_name="Vencimento da Dedetização")
-    vencimento_caixa_dagua = models.DateField(blank=True, null=True, verbose_name="Vencimento Certificado Caixa d'Água")
+    avcb_vencimento = models.DateField(blank=True, null=True, db_index=True, verbose_name="Vencimento AVCB")
+    vencimento_extintores = models.DateField(blank=True, null=True, db_index=True, verbose_name="Vencimento dos Extintores")
+    vencimento_dedetizacao = models.DateField(blank=True, null=True, db_index=True, verbose_name="Vencimento da Dedetização")
+    vencimento_caixa_dagua = models.DateField(blank=True, null=True, db_index=True, verbose_name="Vencimento Certificado Caixa d'Água")
 
 
     # Campo de Imagens (placeholder)
     imagens = models.CharField(max_length=255, blank=True, null=True, help_text="Caminho ou URL para as imagens")
+    # URL da miniatura da primeira foto pronta (FotoImovel). Mantida pelo
+    # processamento das fotos (core/fotos.py), para a lista não ler as fotos.
+    miniatura = models.CharField(max_length=255, blank=True, null=True, editable=False, verbose_name="Miniatura")
+
+    # Caminhos lidos pelo __str__ (usados pelo planejador em core/consultas.py).
+    CAMPOS_STR = ['tipo_imovel', 'endereco']
+    # Referência aceita na importação (core/importacao.py). O endereço não é
+    # único: se houver mais de um imóvel com o mesmo endereço, a linha é recusada.
+    CHAVES_NATURAIS = ['endereco']
 
     class Meta:
         verbose_name = "Imóvel"
         verbose_name_plural = "Imóveis"
         ordering = ['-data_cadastro']
+        indexes = [
+            # Ordenação usada pela paginação por cursor (core/pagination.py).
+            models.Index(fields=['data_cadastro', 'id'], name='imovel_cadastro_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.tipo_imovel} - {self.endereco}"
@@ -108,6 +124,11 @@ class Locador(models.Model):
     endereco = models.CharField(max_length=255, verbose_name="Endereço")
     dados_bancarios = models.TextField(blank=True, null=True, verbose_name="Dados Bancários")
     data_cadastro = models.DateTimeField(auto_now_add=True, verbose_name="Data de Cadastro")
+    data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
+
+    CAMPOS_STR = ['nome']
+    # Campos aceitos como referência na importação (core/importacao.py).
+    CHAVES_NATURAIS = ['cpf_cnpj', 'email']
 
     class Meta:
         verbose_name = "Locador"
@@ -137,7 +158,12 @@ class Locatario(models.Model):
     endereco = models.CharField(max_length=255, verbose_name="Endereço")
     dados_bancarios = models.TextField(blank=True, null=True, verbose_name="Dados Bancários")
     data_cadastro = models.DateTimeField(auto_now_add=True, verbose_name="Data de Cadastro")
+    data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
     
+    CAMPOS_STR = ['nome']
+    # Campos aceitos como referência na importação (core/importacao.py).
+    CHAVES_NATURAIS = ['cpf_cnpj', 'email']
+
     class Meta:
         verbose_name = "Locatário"
         verbose_name_plural = "Locatários"
@@ -170,18 +196,29 @@ class Contrato(models.Model):
 
     # --- Detalhes do Contrato ---
     data_inicio = models.DateField(verbose_name="Data de Início")
-    data_fim = models.DateField(verbose_name="Data de Fim")
+    data_fim = models.DateField(db_index=True, verbose_name="Data de Fim")
     valor_aluguel = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Valor do Aluguel (Contratado)")
     valor_deposito = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Valor do Depósito/Caução")
-    status_contrato = models.CharField(max_length=20, choices=STATUS_CONTRATO_CHOICES, default='Ativo', verbose_name="Status do Contrato")
+    status_contrato = models.CharField(max_length=20, choices=STATUS_CONTRATO_CHOICES, default='Ativo', db_index=True, verbose_name="Status do Contrato")
     data_assinatura = models.DateField(verbose_name="Data da Assinatura")
     data_vencimento_pagamento = models.PositiveIntegerField(verbose_name="Dia do Vencimento do Pagamento")
     multa_rescisoria = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Valor da Multa Rescisória")
     clausulas_especificas = models.TextField(blank=True, null=True, verbose_name="Cláusulas Específicas")
+    data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
+
+    CAMPOS_STR = ['imovel__endereco']
 
     class Meta:
         verbose_name = "Contrato de Locação"
         verbose_name_plural = "Contratos de Locação"
+        indexes = [
+            models.Index(fields=['data_inicio', 'id'], name='contrato_inicio_id_idx'),
+            # Índice parcial: só os contratos ativos, ordenados pelo fim da vigência.
+            models.Index(fields=['data_fim'], condition=models.Q(status_contrato='Ativo'), name='contrato_ativo_fim_idx'),
+            # Vigências por imóvel: linha do tempo da ocupação e a verificação de
+            # sobreposição no SQLite (core/ocupacao.py, migração 0013).
+            models.Index(fields=['imovel', 'data_inicio', 'data_fim'], name='contrato_imovel_periodo_idx'),
+        ]
 
     def __str__(self):
         return f"Contrato #{self.id} - {self.imovel.endereco}"
@@ -215,10 +252,30 @@ class Pagamento(models.Model):
     status_pagamento = models.CharField(max_length=20, choices=STATUS_PAGAMENTO_CHOICES, default='Pendente', verbose_name="Status")
     multa_juros = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Multa/Juros por Atraso")
     comprovante_pagamento = models.CharField(max_length=255, blank=True, null=True, help_text="Caminho ou URL para o comprovante")
+    # Comprovante enviado para o armazenamento do app (core/arquivos.py).
+    comprovante = models.ForeignKey('Arquivo', on_delete=models.PROTECT, related_name='pagamentos', blank=True, null=True, verbose_name="Comprovante")
+    # Mês de referência (sempre o dia 1º). Preenchido pela geração automática
+    # de cobranças (core/cobrancas.py); pagamentos lançados à mão podem deixá-lo vazio.
+    competencia = models.DateField(blank=True, null=True, verbose_name="Competência (Mês de Referência)")
+    data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
+
+    CAMPOS_STR = ['data_pagamento', 'contrato__locatario__nome']
 
     class Meta:
         verbose_name = "Pagamento de Aluguel"
         verbose_name_plural = "Pagamentos de Aluguel"
+        indexes = [
+            # Também atende aos filtros por intervalo de 'data_pagamento'.
+            models.Index(fields=['data_pagamento', 'id'], name='pagamento_data_id_idx'),
+            # Filtro por status (sozinho ou com intervalo de datas).
+            models.Index(fields=['status_pagamento', 'data_pagamento'], name='pagamento_status_data_idx'),
+            # Índice parcial: só os pagamentos pendentes, que são poucos e muito consultados.
+            models.Index(fields=['data_pagamento'], condition=models.Q(status_pagamento='Pendente'), name='pagamento_pendente_idx'),
+        ]
+        constraints = [
+            # Um único pagamento por contrato e mês: torna a geração idempotente.
+            models.UniqueConstraint(fields=['contrato', 'competencia'], name='pagamento_contrato_competencia_uniq'),
+        ]
 
     def __str__(self):
         return f"Pagamento de {self.contrato.locatario.nome} - Venc: {self.data_pagamento}"
@@ -245,10 +302,17 @@ class Manutencao(models.Model):
     data_conclusao = models.DateField(blank=True, null=True, verbose_name="Data de Conclusão")
     custo_manutencao = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Custo da Manutenção")
     responsavel_manutencao = models.CharField(max_length=255, blank=True, null=True, verbose_name="Responsável/Empresa")
+    data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
+
+    CAMPOS_STR = ['data_solicitacao', 'imovel__endereco']
 
     class Meta:
         verbose_name = "Manutenção"
         verbose_name_plural = "Manutenções"
+        indexes = [
+            models.Index(fields=['data_solicitacao', 'id'], name='manutencao_solicit_id_idx'),
+            models.Index(fields=['status_manutencao', 'data_solicitacao'], name='manutencao_status_data_idx'),
+        ]
 
     def __str__(self):
         return f"Manutenção em {self.imovel.endereco} ({self.data_solicitacao})"
@@ -271,12 +335,21 @@ class Documento(models.Model):
     tipo_documento = models.CharField(max_length=100, verbose_name="Tipo de Documento")
     descricao_documento = models.TextField(verbose_name="Descrição do Documento")
     data_documento = models.DateField(verbose_name="Data do Documento")
-    # Novamente, o ideal aqui seria um models.FileField
-    arquivo_documento = models.CharField(max_length=255, help_text="Caminho ou URL para o arquivo")
+    # Arquivo enviado para o armazenamento do app (core/arquivos.py). O mesmo
+    # conteúdo anexado a vários documentos é guardado uma vez só.
+    arquivo = models.ForeignKey('Arquivo', on_delete=models.PROTECT, related_name='documentos', blank=True, null=True, verbose_name="Arquivo")
+    # Caminho ou URL externo, para documentos que não estão no armazenamento.
+    arquivo_documento = models.CharField(max_length=255, blank=True, default='', help_text="Caminho ou URL para o arquivo")
+    data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
+
+    CAMPOS_STR = ['tipo_documento']
 
     class Meta:
         verbose_name = "Documento"
         verbose_name_plural = "Documentos"
+        indexes = [
+            models.Index(fields=['data_documento', 'id'], name='documento_data_id_idx'),
+        ]
 
     def __str__(self):
         return self.tipo_documento
@@ -302,6 +375,11 @@ class Fiador(models.Model):
     endereco = models.CharField(max_length=255, verbose_name="Endereço")
     dados_bancarios = models.TextField(blank=True, null=True, verbose_name="Dados Bancários")
     data_cadastro = models.DateTimeField(auto_now_add=True, verbose_name="Data de Cadastro")
+    data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
+
+    CAMPOS_STR = ['nome']
+    # Campos aceitos como referência na importação (core/importacao.py).
+    CHAVES_NATURAIS = ['cpf_cnpj', 'email']
 
     class Meta:
         verbose_name = "Fiador"
@@ -331,10 +409,263 @@ class Intermediario(models.Model):
     endereco = models.CharField(max_length=255, verbose_name="Endereço")
     dados_bancarios = models.TextField(blank=True, null=True, verbose_name="Dados Bancários")
     data_cadastro = models.DateTimeField(auto_now_add=True, verbose_name="Data de Cadastro")
+    data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
+
+    CAMPOS_STR = ['nome']
+    # Campos aceitos como referência na importação (core/importacao.py).
+    CHAVES_NATURAIS = ['cpf_cnpj', 'email']
 
     class Meta:
         verbose_name = "Intermediário"
         verbose_name_plural = "Intermediários"
 
     def __str__(self):
-        return self.nome
\ No newline at end of file
+        return self.nome
+
+
+# -----------------------------------------------------------------------------
+# 10. MODELO DE IMPORTAÇÕES
+# -----------------------------------------------------------------------------
+# Progresso das importações em massa (core/importacao.py). O ponto de retomada
+# é gravado na mesma transação de cada bloco de linhas: se a importação for
+# interrompida, ela continua do último bloco confirmado.
+# -----------------------------------------------------------------------------
+class Importacao(models.Model):
+    """
+    Representa a importação de um arquivo (CSV ou JSON) para um recurso.
+    """
+    STATUS_CHOICES = [
+        ('Em Andamento', 'Em Andamento'),
+        ('Concluída', 'Concluída'),
+    ]
+
+    recurso = models.CharField(max_length=50, verbose_name="Recurso")
+    hash_arquivo = models.CharField(max_length=64, verbose_name="Hash SHA-256 do Arquivo")
+    nome_arquivo = models.CharField(max_length=255, blank=True, verbose_name="Nome do Arquivo")
+    linhas_processadas = models.PositiveIntegerField(default=0, verbose_name="Linhas Processadas")
+    criados = models.PositiveIntegerField(default=0, verbose_name="Registros Criados")
+    erros = models.PositiveIntegerField(default=0, verbose_name="Linhas com Erro")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Em Andamento')
+    iniciada_em = models.DateTimeField(auto_now_add=True, verbose_name="Iniciada em")
+    atualizada_em = models.DateTimeField(auto_now=True, verbose_name="Atualizada em")
+
+    class Meta:
+        verbose_name = "Importação"
+        verbose_name_plural = "Importações"
+        constraints = [
+            models.UniqueConstraint(fields=['recurso', 'hash_arquivo'], name='importacao_recurso_hash_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.recurso} - {self.nome_arquivo or self.hash_arquivo[:12]}"
+
+
+# -----------------------------------------------------------------------------
+# 11. MODELO DE VERSÕES DAS TABELAS
+# -----------------------------------------------------------------------------
+# Um contador por tabela, incrementado a cada escrita (veja core/signals.py).
+# Fica no banco para ser o mesmo em todos os processos do servidor. É a base
+# dos ETags/Last-Modified das listas e detalhes (core/condicional.py).
+# -----------------------------------------------------------------------------
+class VersaoTabela(models.Model):
+    """
+    Versão atual dos dados de um modelo ('core.imovel', 'core.contrato'...).
+    """
+    tabela = models.CharField(max_length=100, primary_key=True, verbose_name="Modelo")
+    versao = models.PositiveBigIntegerField(default=0, verbose_name="Versão")
+    data_atualizacao = models.DateTimeField(verbose_name="Última Atualização")
+
+    class Meta:
+        verbose_name = "Versão de Tabela"
+        verbose_name_plural = "Versões de Tabelas"
+
+    def __str__(self):
+        return f"{self.tabela} v{self.versao}"
+
+
+# -----------------------------------------------------------------------------
+# 12. MODELO DE EXTRATOS MENSAIS (REPASSE AO LOCADOR)
+# -----------------------------------------------------------------------------
+# Resumo pré-calculado do repasse de cada locador em cada mês: aluguéis
+# recebidos menos manutenções, condomínio/IPTU e a taxa de administração.
+# Mantido por core/extratos.py a cada alteração de pagamentos, manutenções
+# e contratos; não é editado pela API.
+# -----------------------------------------------------------------------------
+class ExtratoMensal(models.Model):
+    """
+    Extrato de repasse de um locador em um mês (sempre o dia 1º).
+    """
+    locador = models.ForeignKey(Locador, on_delete=models.CASCADE, related_name='extratos', verbose_name="Locador")
+    mes = models.DateField(verbose_name="Mês de Referência")
+    pagamentos = models.PositiveIntegerField(default=0, verbose_name="Pagamentos Recebidos")
+    aluguel_recebido = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Aluguel Recebido")
+    multa_juros = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Multa/Juros Recebidos")
+    condominio = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Condomínio")
+    iptu = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="IPTU")
+    manutencoes = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Manutenções")
+    taxa_administracao = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Taxa de Administração")
+    valor_repasse = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Valor do Repasse")
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+
+    class Meta:
+        verbose_name = "Extrato Mensal"
+        verbose_name_plural = "Extratos Mensais"
+        constraints = [
+            models.UniqueConstraint(fields=['locador', 'mes'], name='extrato_locador_mes_uniq'),
+        ]
+        indexes = [
+            # Extratos de todos os locadores de um mês.
+            models.Index(fields=['mes', 'locador'], name='extrato_mes_locador_idx'),
+        ]
+
+    def __str__(self):
+        return f"Extrato de {self.locador_id} - {self.mes:%m/%Y}"
+
+
+# -----------------------------------------------------------------------------
+# 13. MODELO DE RESUMO MENSAL POR IMÓVEL (RENTABILIDADE)
+# -----------------------------------------------------------------------------
+# Receita, custo de manutenção e dias ocupados de cada imóvel em cada mês.
+# Mantido por core/rentabilidade.py; é a base do endpoint de rentabilidade,
+# que assim não precisa somar todos os pagamentos a cada requisição.
+# -----------------------------------------------------------------------------
+class ResumoMensalImovel(models.Model):
+    """
+    Movimento de um imóvel em um mês (sempre o dia 1º).
+    """
+    imovel = models.ForeignKey(Imovel, on_delete=models.CASCADE, related_name='resumos_mensais', verbose_name="Imóvel")
+    mes = models.DateField(verbose_name="Mês de Referência")
+    receita = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Receita (Aluguel + Multas)")
+    manutencoes = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Custo de Manutenções")
+    dias_ocupados = models.PositiveSmallIntegerField(default=0, verbose_name="Dias com Contrato Vigente")
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+
+    class Meta:
+        verbose_name = "Resumo Mensal do Imóvel"
+        verbose_name_plural = "Resumos Mensais dos Imóveis"
+        constraints = [
+            models.UniqueConstraint(fields=['imovel', 'mes'], name='resumo_imovel_mes_uniq'),
+        ]
+        indexes = [
+            # Soma de um período para toda a carteira.
+            models.Index(fields=['mes', 'imovel'], name='resumo_mes_imovel_idx'),
+        ]
+
+    def __str__(self):
+        return f"Resumo do imóvel {self.imovel_id} - {self.mes:%m/%Y}"
+
+
+# -----------------------------------------------------------------------------
+# 14. MODELO DE ARQUIVOS ARMAZENADOS
+# -----------------------------------------------------------------------------
+# Conteúdo de um arquivo no armazenamento (core/armazenamento.py), endereçado
+# pelo hash SHA-256: o mesmo PDF anexado a vários documentos e pagamentos é
+# um único Arquivo. O conteúdo nunca muda depois de gravado.
+# -----------------------------------------------------------------------------
+class Arquivo(models.Model):
+    """
+    Um conteúdo armazenado (identificado pelo hash SHA-256).
+    """
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name="Hash SHA-256")
+    tamanho = models.PositiveBigIntegerField(verbose_name="Tamanho (bytes)")
+    tipo_conteudo = models.CharField(max_length=100, default='application/octet-stream', verbose_name="Tipo de Conteúdo")
+    # Nome do primeiro envio; é o nome sugerido nos downloads.
+    nome = models.CharField(max_length=255, verbose_name="Nome do Arquivo")
+    criado_em = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+
+    CAMPOS_STR = ['nome']
+    # Campos aceitos como referência na importação (core/importacao.py).
+    CHAVES_NATURAIS = ['sha256']
+
+    class Meta:
+        verbose_name = "Arquivo"
+        verbose_name_plural = "Arquivos"
+
+    def __str__(self):
+        return self.nome
+
+
+# -----------------------------------------------------------------------------
+# 15. MODELO DE ENVIOS DE ARQUIVOS (UPLOAD EM PARTES)
+# -----------------------------------------------------------------------------
+# Um upload em andamento. As partes são gravadas direto em disco e 'recebido'
+# marca até onde o arquivo já chegou: se a conexão cair, o cliente consulta o
+# envio e continua desse ponto (core/arquivos.py).
+# -----------------------------------------------------------------------------
+class EnvioArquivo(models.Model):
+    """
+    Upload de um arquivo em partes, retomável.
+    """
+    STATUS_CHOICES = [
+        ('Em Andamento', 'Em Andamento'),
+        ('Concluído', 'Concluído'),
+    ]
+
+    # Identificador público do envio (não sequencial).
+    chave = models.UUIDField(default=uuid.uuid4, unique=True, editable=False, verbose_name="Chave")
+    nome = models.CharField(max_length=255, verbose_name="Nome do Arquivo")
+    tipo_conteudo = models.CharField(max_length=100, default='application/octet-stream', verbose_name="Tipo de Conteúdo")
+    tamanho = models.PositiveBigIntegerField(verbose_name="Tamanho Total (bytes)")
+    recebido = models.PositiveBigIntegerField(default=0, verbose_name="Bytes Recebidos")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Em Andamento')
+    arquivo = models.ForeignKey(Arquivo, on_delete=models.SET_NULL, related_name='+', blank=True, null=True, verbose_name="Arquivo")
+    criado_em = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+
+    class Meta:
+        verbose_name = "Envio de Arquivo"
+        verbose_name_plural = "Envios de Arquivos"
+
+    def __str__(self):
+        return f"{self.nome} ({self.recebido}/{self.tamanho})"
+
+
+# -----------------------------------------------------------------------------
+# 16. MODELO DE FOTOS DOS IMÓVEIS
+# -----------------------------------------------------------------------------
+# Uma foto de um imóvel. O original é um Arquivo; a miniatura e a versão para
+# a web são geradas fora da requisição, por um pool de workers
+# (core/fotos.py), e guardadas como derivados do original no armazenamento.
+# -----------------------------------------------------------------------------
+class FotoImovel(models.Model):
+    """
+    Uma foto de um imóvel, com as versões reduzidas geradas em segundo plano.
+    """
+    STATUS_CHOICES = [
+        ('Pendente', 'Pendente'),
+        ('Processando', 'Processando'),
+        ('Pronta', 'Pronta'),
+        ('Erro', 'Erro'),
+    ]
+
+    imovel = models.ForeignKey(Imovel, on_delete=models.CASCADE, related_name='fotos')
+    arquivo = models.ForeignKey(Arquivo, on_delete=models.PROTECT, related_name='fotos', verbose_name="Original")
+    legenda = models.CharField(max_length=255, blank=True, default='', verbose_name="Legenda")
+    ordem = models.PositiveSmallIntegerField(default=0, verbose_name="Ordem")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pendente')
+    # Dimensões do original (já na orientação do EXIF), lidas no processamento.
+    largura = models.PositiveIntegerField(blank=True, null=True, verbose_name="Largura")
+    altura = models.PositiveIntegerField(blank=True, null=True, verbose_name="Altura")
+    # Versão das variantes geradas (core/fotos.py, VERSAO_VARIANTES).
+    versao = models.PositiveSmallIntegerField(default=0, verbose_name="Versão das Variantes")
+    tentativas = models.PositiveSmallIntegerField(default=0, verbose_name="Tentativas")
+    erro = models.CharField(max_length=255, blank=True, default='', verbose_name="Erro")
+    criado_em = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+
+    CAMPOS_STR = ['legenda']
+
+    class Meta:
+        verbose_name = "Foto do Imóvel"
+        verbose_name_plural = "Fotos dos Imóveis"
+        ordering = ['ordem', 'id']
+        indexes = [
+            # Galeria de um imóvel, na ordem de exibição.
+            models.Index(fields=['imovel', 'ordem', 'id'], name='foto_imovel_ordem_idx'),
+            # Fila dos workers: só as fotos ainda não processadas.
+            models.Index(fields=['atualizado_em'], condition=models.Q(status__in=['Pendente', 'Processando']),
+                         name='foto_a_processar_idx'),
+        ]
+
+    def __str__(self):
+        return self.legenda or f"Foto {self.pk}"
@@ -0,0 +1,189 @@
+import itertools
+import time
+from datetime import timedelta
+from operator import itemgetter
+
+from django.db.models import Count, Q
+
+from .calculos import meses_entre, percentual, somar_meses, ultimo_dia
+from .models import Contrato, Imovel
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Ocupação e vacância dos imóveis ao longo do tempo.
+#
+# Sobreposição de contratos: dois contratos 'Ativo' do mesmo imóvel não podem
+# ter vigências (data_inicio a data_fim, inclusive) que se cruzam. Quem impede
+# é o próprio banco (migração 0013), sem carregar os contratos do imóvel:
+#   - Postgres: restrição de exclusão com índice GiST sobre
+#     (imovel_id, daterange(data_inicio, data_fim, '[]')), só para os ativos;
+#   - SQLite: gatilhos BEFORE INSERT/UPDATE que procuram um ativo sobreposto
+#     pelo índice (imovel, data_inicio, data_fim).
+# Nos dois casos a gravação falha com IntegrityError que cita NOME_RESTRICAO
+# (veja 'eh_sobreposicao'); a API responde 409.
+#
+# Linha do tempo (GET /api/ocupacao/):
+#   - ?imovel=<id>: períodos 'Ocupado' e 'Vago' do imóvel, com os contratos
+#     de cada período ocupado;
+#   - sem 'imovel': série mensal da carteira (imóveis, ocupados, vagos, dias
+#     ocupados e taxa de ocupação), opcionalmente por ?tipo_imovel.
+# Os contratos são lidos por faixa de datas (data_inicio <= fim do período e
+# data_fim >= início), pelos índices, e não pela tabela inteira. Contratos
+# de qualquer status contam como ocupação na vigência deles, como na
+# rentabilidade (core/rentabilidade.py); períodos sobrepostos contam uma vez.
+# -----------------------------------------------------------------------------
+
+NOME_RESTRICAO = 'contrato_sem_sobreposicao'
+MESES_ANTES_PADRAO = 11
+MESES_DEPOIS_PADRAO = 12
+MESES_MAXIMO_OCUPACAO = 60
+TAMANHO_LOTE = 2000
+
+
+def _indice_do_mes(inicio, dia):
+    """Posição do mês de 'dia' contada a partir do mês de 'inicio' (0, 1, ...)."""
+    return (dia.year - inicio.year) * 12 + dia.month - inicio.month
+
+
+def eh_sobreposicao(erro):
+    """Se o IntegrityError veio da restrição de contratos ativos sobrepostos."""
+    return NOME_RESTRICAO in str(erro)
+
+
+def unir_periodos(periodos):
+    """
+    Une períodos (inicio, fim, ...) já ordenados pelo início: os que se
+    sobrepõem ou se encostam viram um só. Devolve [[inicio, fim, [períodos]]].
+    """
+    unidos = []
+    for periodo in periodos:
+        inicio, fim = periodo[0], periodo[1]
+        if fim < inicio:
+            continue
+        if unidos and inicio <= unidos[-1][1] + timedelta(days=1):
+            unidos[-1][1] = max(unidos[-1][1], fim)
+            unidos[-1][2].append(periodo)
+        else:
+            unidos.append([inicio, fim, [periodo]])
+    return unidos
+
+
+def dias_por_mes(inicio, fim):
+    """{mês: dias entre 'inicio' e 'fim' (inclusive) dentro daquele mês}."""
+    return {mes: (min(fim, ultimo_dia(mes)) - max(inicio, mes)).days + 1 for mes in meses_entre(inicio, fim)}
+
+
+def periodo_padrao(hoje):
+    """Dos MESES_ANTES_PADRAO meses anteriores até MESES_DEPOIS_PADRAO meses à frente."""
+    mes = hoje.replace(day=1)
+    return somar_meses(mes, -MESES_ANTES_PADRAO), ultimo_dia(somar_meses(mes, MESES_DEPOIS_PADRAO))
+
+
+def _vigentes(inicio, fim):
+    return Contrato.objects.filter(data_inicio__lte=fim, data_fim__gte=inicio)
+
+
+def _periodo(situacao, inicio, fim, **extra):
+    return {'situacao': situacao, 'inicio': inicio.isoformat(), 'fim': fim.isoformat(),
+            'dias': (fim - inicio).days + 1, **extra}
+
+
+def linha_do_tempo(imovel, inicio, fim):
+    """Períodos ocupados e vagos do imóvel entre 'inicio' e 'fim' (uma consulta)."""
+    contratos = _vigentes(inicio, fim).filter(imovel=imovel).order_by('data_inicio', 'id').values_list(
+        'data_inicio', 'data_fim', 'id', 'status_contrato', 'locatario__nome',
+    )
+    recortados = [(max(de, inicio), min(ate, fim), de, ate, *dados) for de, ate, *dados in contratos]
+
+    periodos = []
+    proximo_dia = inicio
+    for de, ate, itens in unir_periodos(recortados):
+        if de > proximo_dia:
+            periodos.append(_periodo('Vago', proximo_dia, de - timedelta(days=1)))
+        periodos.append(_periodo('Ocupado', de, ate, contratos=[
+            {'id': pk, 'status_contrato': situacao, 'locatario': locatario,
+             'data_inicio': data_inicio.isoformat(), 'data_fim': data_fim.isoformat()}
+            for _, _, data_inicio, data_fim, pk, situacao, locatario in itens
+        ]))
+        proximo_dia = ate + timedelta(days=1)
+    if proximo_dia <= fim:
+        periodos.append(_periodo('Vago', proximo_dia, fim))
+
+    dias = (fim - inicio).days + 1
+    dias_ocupados = sum(periodo['dias'] for periodo in periodos if periodo['situacao'] == 'Ocupado')
+    return {
+        'imovel': {'id': imovel.pk, 'endereco': imovel.endereco, 'tipo_imovel': imovel.tipo_imovel},
+        'inicio': inicio.isoformat(),
+        'fim': fim.isoformat(),
+        'dias': dias,
+        'dias_ocupados': dias_ocupados,
+        'dias_vagos': dias - dias_ocupados,
+        'taxa_ocupacao': percentual(dias_ocupados, dias),
+        'periodos': periodos,
+    }
+
+
+def ocupacao_da_carteira(inicio, fim, tipo_imovel=None):
+    """Série mensal da ocupação da carteira entre 'inicio' e 'fim' (duas consultas)."""
+    inicio_consulta = time.perf_counter()
+    meses = list(meses_entre(inicio, fim))
+    contratos = _vigentes(inicio, fim)
+    imoveis = Imovel.objects.order_by()
+    if tipo_imovel:
+        contratos = contratos.filter(imovel__tipo_imovel=tipo_imovel)
+        imoveis = imoveis.filter(tipo_imovel=tipo_imovel)
+
+    # Limites de cada mês dentro do período, calculados uma vez só.
+    limites = [(max(inicio, mes), min(fim, ultimo_dia(mes))) for mes in meses]
+    dias_ocupados = [0] * len(meses)
+    ocupados = [0] * len(meses)
+    linhas = contratos.order_by('imovel_id', 'data_inicio').values_list('imovel_id', 'data_inicio', 'data_fim')
+    for _, periodos in itertools.groupby(linhas.iterator(chunk_size=TAMANHO_LOTE), key=itemgetter(0)):
+        meses_ocupados = set()
+        for de, ate, _ in unir_periodos((max(de, inicio), min(ate, fim)) for _, de, ate in periodos):
+            for indice in range(_indice_do_mes(inicio, de), _indice_do_mes(inicio, ate) + 1):
+                primeiro, ultimo = limites[indice]
+                dias_ocupados[indice] += (min(ate, ultimo) - max(de, primeiro)).days + 1
+                meses_ocupados.add(indice)
+        for indice in meses_ocupados:
+            ocupados[indice] += 1
+
+    # Imóveis da carteira em cada mês (adquiridos até o fim dele e não vendidos
+    # antes do início), todos os meses numa consulta só.
+    na_carteira = imoveis.aggregate(**{
+        f'mes_{indice}': Count('id', filter=(
+            (Q(data_aquisicao=None) | Q(data_aquisicao__lte=ultimo_dia(mes)))
+            & (Q(data_venda=None) | Q(data_venda__gte=mes))
+        ))
+        for indice, mes in enumerate(meses)
+    })
+
+    serie = []
+    for indice, mes in enumerate(meses):
+        total = na_carteira[f'mes_{indice}']
+        primeiro, ultimo = limites[indice]
+        disponiveis = total * ((ultimo - primeiro).days + 1)
+        ocupados_no_mes = min(ocupados[indice], total)
+        dias = min(dias_ocupados[indice], disponiveis)
+        serie.append({
+            'mes': mes.strftime('%Y-%m'),
+            'imoveis': total,
+            'ocupados': ocupados_no_mes,
+            'vagos': total - ocupados_no_mes,
+            'dias_ocupados': dias,
+            'dias_disponiveis': disponiveis,
+            'taxa_ocupacao': percentual(dias, disponiveis),
+        })
+
+    dias = sum(item['dias_ocupados'] for item in serie)
+    disponiveis = sum(item['dias_disponiveis'] for item in serie)
+    return {
+        'inicio': inicio.isoformat(),
+        'fim': fim.isoformat(),
+        'dias_ocupados': dias,
+        'dias_disponiveis': disponiveis,
+        'taxa_ocupacao': percentual(dias, disponiveis),
+        'taxa_vacancia': percentual(disponiveis - dias, disponiveis),
+        'meses': serie,
+        'segundos': round(time.perf_counter() - inicio_consulta, 3),
+    }
@@ -0,0 +1,85 @@
+from django.db.models import Q
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .condicional import aplicar_validadores, modelos_exibidos, nao_modificado, validadores, versoes_das_tabelas
+from .consultas import planejar_str
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Endpoint compacto para os <select> dos formulários. Em vez de baixar a
+# tabela inteira (com descrições, dados bancários etc.), o frontend chama
+#
+#     GET /api/imoveis/opcoes/?q=paulista&limite=20
+#
+# e recebe apenas [{"id": 1, "label": "Casa - Av. Paulista, 10"}, ...].
+# O rótulo é o __str__ do modelo, buscado só com as colunas que ele usa.
+# '?ids=3,7' garante que itens já selecionados venham na resposta.
+#
+# O ETag vem da URL e das versões das tabelas lidas (a do modelo, as do
+# __str__ e as dos campos de busca), como nas listas (core/condicional.py):
+# se o navegador já tem a versão atual, a resposta é 304 depois de UMA
+# consulta pela chave primária, sem buscar nem serializar as opções.
+# -----------------------------------------------------------------------------
+
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 200
+
+
+def _inteiro(valor, padrao):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return padrao
+
+
+class OpcoesMixin:
+    """
+    Adiciona a ação 'opcoes' ao ViewSet. O ViewSet declara em 'busca_opcoes'
+    os campos usados na busca por texto (o primeiro também ordena a lista).
+    """
+    busca_opcoes = ()
+
+    def _modelos_das_opcoes(self, model):
+        modelos = modelos_exibidos(model, planejar_str(model))
+        for campo in self.busca_opcoes:
+            atual = model
+            for parte in campo.split('__')[:-1]:
+                atual = atual._meta.get_field(parte).related_model
+                modelos.add(atual)
+        return modelos
+
+    @action(detail=False, methods=['get'], pagination_class=None, filter_backends=[])
+    def opcoes(self, request):
+        model = self.queryset.model
+        versoes = versoes_das_tabelas(self._modelos_das_opcoes(model))
+        assinatura, ultima_alteracao = validadores(request, 'json', versoes)
+        etag = quote_etag(assinatura)
+        if nao_modificado(request, etag, ultima_alteracao):
+            return aplicar_validadores(Response(status=status.HTTP_304_NOT_MODIFIED), etag, ultima_alteracao)
+
+        termo = request.query_params.get('q', '').strip()
+        limite = min(max(_inteiro(request.query_params.get('limite'), LIMITE_PADRAO), 1), LIMITE_MAXIMO)
+        ids = [
+            item for item in (_inteiro(i, None) for i in request.query_params.get('ids', '').split(','))
+            if item is not None
+        ]
+
+        queryset = model.objects.all()
+        if termo and self.busca_opcoes:
+            condicao = Q()
+            for campo in self.busca_opcoes:
+                condicao |= Q(**{f'{campo}__icontains': termo})
+            queryset = queryset.filter(condicao)
+        ordenacao = [self.busca_opcoes[0], 'id'] if self.busca_opcoes else ['-id']
+        queryset = planejar_str(model).aplicar(queryset.order_by(*ordenacao), [ordenacao[0].lstrip('-')])
+
+        itens = list(queryset[:limite])
+        faltantes = set(ids) - {item.pk for item in itens}
+        if faltantes:
+            itens += list(planejar_str(model).aplicar(model.objects.filter(pk__in=faltantes)))
+
+        dados = [{'id': item.pk, 'label': str(item)} for item in itens]
+        return aplicar_validadores(Response(dados), etag, ultima_alteracao)
@@ -0,0 +1,155 @@
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, Cursor
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Paginação por cursor ("keyset"). Em vez de 'OFFSET 10000', que obriga o
+# banco a ler e descartar 10.000 linhas, o cursor guarda os valores da última
+# linha da página (ex.: data_pagamento e id) e a próxima página é buscada com
+#
+#     WHERE (data_pagamento, id) < (ultima_data, ultimo_id)
+#     ORDER BY data_pagamento DESC, id DESC
+#     LIMIT tamanho_da_pagina
+#
+# Assim, qualquer página custa o mesmo que a primeira, desde que exista um
+# índice com as colunas da ordenação. Cada ViewSet declara sua ordenação no
+# atributo 'ordenacao'; o último campo deve ser único (normalmente 'id').
+#
+# O formato da resposta é o mesmo do DRF: {"next", "previous", "results"}.
+# -----------------------------------------------------------------------------
+
+
+class PaginacaoKeyset(CursorPagination):
+    """
+    Paginação por cursor que compara a tupla completa de ordenação, sem
+    depender de OFFSET para desempatar linhas com o mesmo valor.
+    """
+    ordering = ('-id',)
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def get_ordering(self, request, queryset, view):
+        ordenacao = tuple(getattr(view, 'ordenacao', self.ordering))
+        assert ordenacao[-1].lstrip('-') in ('id', 'pk'), (
+            "O último campo de 'ordenacao' precisa ser único (ex.: '-id')."
+        )
+        return ordenacao
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._consulta_da_pagina(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._montar_pagina(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Igual ao paginate_queryset, mas lê as linhas com o ORM assíncrono."""
+        queryset = self._consulta_da_pagina(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._montar_pagina([linha async for linha in queryset])
+
+    def _consulta_da_pagina(self, queryset, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        # Para voltar uma página, percorremos a ordenação invertida.
+        ordenacao = _inverter(self.ordering) if self._reverso else self.ordering
+        queryset = queryset.order_by(*ordenacao)
+        if self.cursor is not None:
+            posicao = self._decodificar_posicao(queryset.model, self.cursor.position)
+            queryset = queryset.filter(_depois_de(ordenacao, posicao))
+
+        # Uma linha extra indica se existe mais uma página nessa direção.
+        return queryset[:self.page_size + 1]
+
+    @property
+    def _reverso(self):
+        return self.cursor is not None and self.cursor.reverse
+
+    def _montar_pagina(self, linhas):
+        ha_mais = len(linhas) > self.page_size
+        self.page = linhas[:self.page_size]
+
+        if self._reverso:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = ha_mais
+        else:
+            self.has_next = ha_mais
+            self.has_previous = self.cursor is not None
+
+        if self.page:
+            self.next_position = self._posicao(self.page[-1])
+            self.previous_position = self._posicao(self.page[0])
+        else:
+            self.has_next = self.has_previous = False
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.next_position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.previous_position))
+
+    def _posicao(self, instancia):
+        # A página pode ser de objetos ou de dicionários (core/leitura_rapida.py).
+        if isinstance(instancia, dict):
+            valores = [instancia[campo.lstrip('-')] for campo in self.ordering]
+        else:
+            valores = [getattr(instancia, campo.lstrip('-')) for campo in self.ordering]
+        return json.dumps([None if valor is None else str(valor) for valor in valores])
+
+    def _decodificar_posicao(self, model, posicao):
+        try:
+            valores = json.loads(posicao)
+            assert len(valores) == len(self.ordering)
+            return [
+                model._meta.get_field(campo.lstrip('-')).to_python(valor)
+                for campo, valor in zip(self.ordering, valores)
+            ]
+        except (TypeError, ValueError, AssertionError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+def _inverter(ordenacao):
+    return tuple(campo[1:] if campo.startswith('-') else f'-{campo}' for campo in ordenacao)
+
+
+def _depois_de(ordenacao, posicao):
+    """
+    Monta a condição "vem depois de 'posicao'" para uma ordenação com várias
+    colunas, equivalente a uma comparação de tuplas:
+
+        a < va OR (a = va AND b < vb) OR ...
+
+    O primeiro termo (a <= va) é repetido fora do OR para que o banco possa
+    usar o índice como intervalo em vez de avaliar o OR linha a linha.
+    """
+    condicao = Q()
+    iguais = Q()
+    for campo, valor in zip(ordenacao, posicao):
+        nome = campo.lstrip('-')
+        operador = 'lt' if campo.startswith('-') else 'gt'
+        condicao |= iguais & Q(**{f'{nome}__{operador}': valor})
+        iguais &= Q(**{nome: valor})
+
+    primeiro = ordenacao[0]
+    operador = 'lte' if primeiro.startswith('-') else 'gte'
+    return Q(**{f'{primeiro.lstrip("-")}__{operador}': posicao[0]}) & condicao
@@ -0,0 +1,286 @@
+import itertools
+import time
+from collections import defaultdict
+from decimal import Decimal
+from functools import reduce
+from operator import itemgetter, or_
+
+from django.db import transaction
+from django.db.models import DateField, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .calculos import (
+    data_da_manutencao, formatar_valor, mes_do_pagamento, meses_entre, percentual, somar_meses, ultimo_dia,
+)
+from .models import Contrato, Imovel, Manutencao, Pagamento, ResumoMensalImovel
+from .ocupacao import dias_por_mes, unir_periodos
+from .resumos import registrar_resumo
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Rentabilidade por imóvel e por tipo de imóvel. Os números vêm da tabela
+# ResumoMensalImovel (um registro por imóvel e mês com receita, custo de
+# manutenção e dias com contrato vigente), mantida de forma incremental pelos
+# mesmos sinais dos extratos (core/resumos.py). A consulta do endpoint soma
+# só os meses do período nessa tabela, pelo índice (mes, imovel), em vez de
+# varrer todos os pagamentos.
+#
+# Para um período de N meses completos (padrão: os 12 meses antes do atual):
+#   receita            aluguéis e multas dos pagamentos 'Pago' (mês da competência)
+#   custos_fixos       IPTU e condomínio mensais e o seguro anual, pro rata dia
+#   manutencoes        custo das manutenções 'Concluído'
+#   resultado_liquido  receita - custos_fixos - manutencoes
+#   rendimento_*       resultado (ou receita) anualizado / valor de aquisição, em %
+#   dias_vagos         dias do período sem contrato vigente
+#   indice_manutencao  manutencoes / receita, em %
+#
+# Os custos fixos e o valor de aquisição são lidos do imóvel na hora da
+# consulta: alterá-los não exige recalcular nada. Para refazer a tabela do
+# zero, use 'POST /api/rentabilidade/' ou o comando 'recalcular_resumos'.
+# -----------------------------------------------------------------------------
+
+MESES_PADRAO = 12
+MESES_MAXIMO = 60
+LIMITE_PADRAO_RENTABILIDADE = 200
+LIMITE_MAXIMO_RENTABILIDADE = 5000
+TAMANHO_LOTE = 2000
+
+ZERO = Decimal('0')
+
+# Campos do contrato que mudam receita ou ocupação de algum imóvel.
+CAMPOS_CONTRATO = ('imovel_id', 'data_inicio', 'data_fim')
+
+
+def _pagamentos():
+    return Pagamento.objects.annotate(imovel_ref=F('contrato__imovel_id'), mes_ref=mes_do_pagamento())
+
+
+def _pagamentos_recebidos():
+    return _pagamentos().filter(status_pagamento='Pago')
+
+
+def _manutencoes_concluidas():
+    return Manutencao.objects.filter(status_manutencao='Concluído').annotate(
+        imovel_ref=F('imovel_id'), mes_ref=TruncMonth(data_da_manutencao(), output_field=DateField())
+    )
+
+
+def _pares(queryset):
+    return set(queryset.values_list('imovel_ref', 'mes_ref'))
+
+
+def pares_afetados(model, ids, novos=False):
+    """Pares (imovel_id, mês) cujos resumos dependem das linhas 'ids' de 'model'."""
+    if model is Pagamento:
+        return _pares(_pagamentos_recebidos().filter(pk__in=ids))
+    if model is Manutencao:
+        return _pares(_manutencoes_concluidas().filter(pk__in=ids))
+    if model is Contrato:
+        pares = set() if novos else _pares(_pagamentos_recebidos().filter(contrato_id__in=ids))
+        for imovel_id, inicio, fim in Contrato.objects.filter(pk__in=ids).values_list('imovel_id', 'data_inicio', 'data_fim'):
+            pares.update((imovel_id, mes) for mes in meses_entre(inicio, fim))
+        return pares
+    return set()
+
+
+# --- Cálculo ---
+
+def _ocupacao(contratos):
+    """
+    {(imovel_id, mês): dias com contrato vigente}. Os períodos dos contratos de
+    cada imóvel são unidos antes da contagem: sobreposições contam uma vez.
+    """
+    dias = defaultdict(int)
+    linhas = contratos.order_by('imovel_id', 'data_inicio').values_list('imovel_id', 'data_inicio', 'data_fim')
+    for imovel_id, periodos in itertools.groupby(linhas.iterator(chunk_size=TAMANHO_LOTE), key=itemgetter(0)):
+        for inicio, fim, _ in unir_periodos(periodo[1:] for periodo in periodos):
+            for mes, quantidade in dias_por_mes(inicio, fim).items():
+                dias[(imovel_id, mes)] += quantidade
+    return dias
+
+
+def _somas(queryset, valor, filtro=None):
+    return {
+        (imovel_id, mes): total
+        for imovel_id, mes, total in queryset.values('imovel_ref', 'mes_ref').annotate(total=Sum(valor, filter=filtro))
+        .order_by().values_list('imovel_ref', 'mes_ref', 'total')
+        if total is not None
+    }
+
+
+def _linhas(receitas, custos, ocupacao, pares=None):
+    chaves = receitas.keys() | custos.keys() | ocupacao.keys()
+    if pares is not None:
+        chaves &= pares
+    return [
+        ResumoMensalImovel(
+            imovel_id=imovel_id, mes=mes, receita=receitas.get((imovel_id, mes)) or ZERO,
+            manutencoes=custos.get((imovel_id, mes)) or ZERO, dias_ocupados=ocupacao.get((imovel_id, mes), 0),
+        )
+        for imovel_id, mes in sorted(chaves)
+    ]
+
+
+def recalcular_rentabilidade(pares):
+    """Recalcula os resumos dos pares (imovel_id, mês) informados."""
+    pares = {(imovel_id, mes) for imovel_id, mes in pares if imovel_id and mes}
+    if not pares:
+        return 0
+    imoveis_por_mes = defaultdict(set)
+    for imovel_id, mes in pares:
+        imoveis_por_mes[mes].add(imovel_id)
+    imoveis = {imovel_id for imovel_id, _ in pares}
+    meses = sorted(imoveis_por_mes)
+
+    # Status na soma, não no WHERE (veja _calcular em core/extratos.py).
+    receitas = _somas(_pagamentos().filter(
+        Q(competencia__in=meses)
+        | (Q(competencia=None) & reduce(or_, (Q(data_pagamento__range=(mes, ultimo_dia(mes))) for mes in meses))),
+        # Pelos contratos: usa o índice (contrato, competencia) dos pagamentos.
+        contrato_id__in=Contrato.objects.filter(imovel_id__in=imoveis).values('id'),
+    ), F('valor_pago') + F('multa_juros'), filtro=Q(status_pagamento='Pago'))
+    custos = _somas(_manutencoes_concluidas().filter(
+        reduce(or_, (
+            Q(data_conclusao__range=(mes, ultimo_dia(mes)))
+            | Q(data_conclusao=None, data_solicitacao__range=(mes, ultimo_dia(mes)))
+            for mes in meses
+        )),
+        imovel_id__in=imoveis,
+    ), 'custo_manutencao')
+    ocupacao = _ocupacao(Contrato.objects.filter(
+        imovel_id__in=imoveis, data_inicio__lte=ultimo_dia(meses[-1]), data_fim__gte=meses[0]
+    ))
+    linhas = _linhas(receitas, custos, ocupacao, pares)
+
+    # Sem savepoint: dentro de outra transação, o recálculo é parte dela.
+    with transaction.atomic(savepoint=False):
+        ResumoMensalImovel.objects.filter(reduce(or_, (
+            Q(mes=mes, imovel_id__in=ids) for mes, ids in imoveis_por_mes.items()
+        ))).delete()
+        ResumoMensalImovel.objects.bulk_create(linhas)
+    return len(linhas)
+
+
+def reconstruir_rentabilidade(tamanho_lote=TAMANHO_LOTE):
+    """Apaga e recalcula todos os resumos mensais dos imóveis."""
+    receitas = _somas(_pagamentos_recebidos(), F('valor_pago') + F('multa_juros'))
+    custos = _somas(_manutencoes_concluidas(), 'custo_manutencao')
+    linhas = _linhas(receitas, custos, _ocupacao(Contrato.objects.all()))
+    with transaction.atomic():
+        ResumoMensalImovel.objects.all().delete()
+        ResumoMensalImovel.objects.bulk_create(linhas, batch_size=tamanho_lote)
+    return len(linhas)
+
+
+registrar_resumo(
+    'rentabilidade', pares_afetados=pares_afetados, recalcular=recalcular_rentabilidade,
+    reconstruir=reconstruir_rentabilidade, campos_contrato=CAMPOS_CONTRATO,
+)
+
+
+# --- Leitura ---
+
+def _indicadores(imovel, somas, inicio, fim):
+    """Indicadores de um imóvel no período, ou None se ele não fez parte da carteira."""
+    # Sem data de aquisição, o imóvel conta como da carteira no período todo.
+    entrada = max(inicio, imovel['data_aquisicao'] or inicio)
+    saida = min(fim, imovel['data_venda'] or fim)
+    dias = (saida - entrada).days + 1
+    if dias <= 0:
+        return None
+    receita, manutencoes, dias_ocupados = somas.get(imovel['id'], (ZERO, ZERO, 0))
+    proporcao = Decimal(dias) / 365
+    custos_fixos = (
+        ((imovel['iptu_valor'] or ZERO) + (imovel['condominio_valor'] or ZERO)) * 12 + (imovel['seguro_valor'] or ZERO)
+    ) * proporcao
+    resultado = receita - custos_fixos - manutencoes
+    aquisicao = imovel['valor_aquisicao']
+    return {
+        'imovel': imovel['id'],
+        'endereco': imovel['endereco'],
+        'tipo_imovel': imovel['tipo_imovel'],
+        'dias_no_periodo': dias,
+        'dias_vagos': dias - min(dias_ocupados, dias),
+        'receita': receita,
+        'custos_fixos': custos_fixos,
+        'manutencoes': manutencoes,
+        'resultado_liquido': resultado,
+        'valor_aquisicao': aquisicao,
+        # Anualizados: resultado do período / fração do ano / aquisição.
+        'rendimento_bruto': percentual(receita / proporcao, aquisicao),
+        'rendimento_liquido': percentual(resultado / proporcao, aquisicao),
+    }
+
+
+def _acumular(total, item):
+    for chave in ('dias_no_periodo', 'dias_vagos', 'receita', 'custos_fixos', 'manutencoes', 'resultado_liquido'):
+        total[chave] = total.get(chave, 0) + item[chave]
+    if item['valor_aquisicao']:
+        proporcao = Decimal(item['dias_no_periodo']) / 365
+        total['valor_aquisicao'] = total.get('valor_aquisicao', ZERO) + item['valor_aquisicao']
+        total['receita_anual'] = total.get('receita_anual', ZERO) + item['receita'] / proporcao
+        total['resultado_anual'] = total.get('resultado_anual', ZERO) + item['resultado_liquido'] / proporcao
+    total['imoveis'] = total.get('imoveis', 0) + 1
+
+
+def _formatar(item):
+    """Valores monetários como texto ('1234.50') e os índices em %."""
+    item['taxa_vacancia'] = percentual(item['dias_vagos'], item['dias_no_periodo'])
+    item['indice_manutencao'] = percentual(item['manutencoes'], item['receita'])
+    for chave in ('receita', 'custos_fixos', 'manutencoes', 'resultado_liquido', 'valor_aquisicao'):
+        if item.get(chave) is not None:
+            item[chave] = formatar_valor(item[chave])
+    return item
+
+
+def calcular_rentabilidade(meses=MESES_PADRAO, ate=None, tipo_imovel=None, limite=LIMITE_PADRAO_RENTABILIDADE):
+    """
+    Rentabilidade dos imóveis nos 'meses' meses completos terminados em 'ate'
+    (primeiro dia do último mês; padrão: o mês anterior ao atual).
+    """
+    inicio_consulta = time.perf_counter()
+    ate = ate or somar_meses(timezone.localdate().replace(day=1), -1)
+    inicio = somar_meses(ate, -(meses - 1))
+    fim = ultimo_dia(ate)
+
+    resumos = ResumoMensalImovel.objects.filter(mes__range=(inicio, ate))
+    imoveis = Imovel.objects.order_by()
+    if tipo_imovel:
+        resumos = resumos.filter(imovel__tipo_imovel=tipo_imovel)
+        imoveis = imoveis.filter(tipo_imovel=tipo_imovel)
+    somas = {
+        imovel_id: (receita, manutencoes, dias)
+        for imovel_id, receita, manutencoes, dias in resumos.values('imovel_id').annotate(
+            receita_total=Sum('receita'), manutencoes_total=Sum('manutencoes'), dias_total=Sum('dias_ocupados'),
+        ).order_by().values_list('imovel_id', 'receita_total', 'manutencoes_total', 'dias_total')
+    }
+
+    por_imovel = []
+    por_tipo = defaultdict(dict)
+    for imovel in imoveis.values(
+        'id', 'endereco', 'tipo_imovel', 'valor_aquisicao', 'iptu_valor', 'condominio_valor', 'seguro_valor',
+        'data_aquisicao', 'data_venda',
+    ).iterator(chunk_size=TAMANHO_LOTE):
+        item = _indicadores(imovel, somas, inicio, fim)
+        if item is not None:
+            por_imovel.append(item)
+            _acumular(por_tipo[item['tipo_imovel']], item)
+
+    tipos = []
+    for tipo, total in sorted(por_tipo.items()):
+        total['tipo_imovel'] = tipo
+        total.setdefault('valor_aquisicao', None)
+        total['rendimento_bruto'] = percentual(total.pop('receita_anual', ZERO), total.get('valor_aquisicao'))
+        total['rendimento_liquido'] = percentual(total.pop('resultado_anual', ZERO), total.get('valor_aquisicao'))
+        tipos.append(_formatar(total))
+
+    # Maior rendimento líquido primeiro; imóveis sem valor de aquisição no fim.
+    por_imovel.sort(key=lambda item: (item['rendimento_liquido'] is None, -(item['rendimento_liquido'] or 0)))
+    return {
+        'periodo': {'inicio': inicio.isoformat(), 'fim': fim.isoformat(), 'meses': meses},
+        'total_imoveis': len(por_imovel),
+        'por_tipo': tipos,
+        'imoveis': [_formatar(item) for item in por_imovel[:limite]],
+        'segundos': round(time.perf_counter() - inicio_consulta, 3),
+    }
@@ -0,0 +1,128 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+from .models import Contrato, Manutencao, Pagamento
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Infraestrutura comum das tabelas de resumo mantidas de forma incremental
+# (extratos de repasse em core/extratos.py, rentabilidade em
+# core/rentabilidade.py). Cada resumo informa:
+#
+#   - pares_afetados(model, ids, novos): as chaves do resumo (ex.: (locador,
+#     mês)) que dependem daquelas linhas de Pagamento, Manutencao ou Contrato.
+#     Com novos=True as linhas acabaram de ser criadas: nenhum pagamento
+#     aponta ainda para um contrato novo, e essa consulta é pulada;
+#   - recalcular(pares): recalcula só essas chaves;
+#   - reconstruir(tamanho_lote): apaga e recalcula tudo;
+#   - campos_contrato: campos do Contrato que mudam o resumo (alterar outros
+#     campos do contrato não recalcula nada).
+#
+# Os sinais abaixo calculam as chaves afetadas ANTES e DEPOIS de cada
+# gravação (um pagamento pode mudar de mês ou de contrato) e recalculam a
+# união. Gravações em massa chamam 'pares_dos_resumos' e 'atualizar_resumos'.
+#
+# Pagamentos que não estão 'Pago' e manutenções que não estão 'Concluído'
+# não entram em nenhum resumo: criá-los não custa consulta alguma.
+# -----------------------------------------------------------------------------
+
+MODELOS = (Pagamento, Manutencao, Contrato)
+
+RESUMOS = []
+
+
+class Resumo:
+    """Uma tabela de resumo registrada em RESUMOS."""
+    def __init__(self, nome, pares_afetados, recalcular, reconstruir, campos_contrato):
+        self.nome = nome
+        self.pares_afetados = pares_afetados
+        self.recalcular = recalcular
+        self.reconstruir = reconstruir
+        self.campos_contrato = tuple(campos_contrato)
+
+
+def registrar_resumo(nome, pares_afetados, recalcular, reconstruir, campos_contrato):
+    resumo = Resumo(nome, pares_afetados, recalcular, reconstruir, campos_contrato)
+    RESUMOS.append(resumo)
+    return resumo
+
+
+def afeta_resumos(objeto):
+    """Se um objeto novo entra em algum resumo (sem consultar o banco)."""
+    if isinstance(objeto, Pagamento):
+        return objeto.status_pagamento == 'Pago'
+    if isinstance(objeto, Manutencao):
+        return objeto.status_manutencao == 'Concluído'
+    return isinstance(objeto, Contrato)
+
+
+def pares_dos_resumos(model, ids, novos=False):
+    """{nome do resumo: pares afetados pelas linhas 'ids' de 'model'}."""
+    if model not in MODELOS or not ids:
+        return {}
+    return {resumo.nome: resumo.pares_afetados(model, ids, novos=novos) for resumo in RESUMOS}
+
+
+def atualizar_resumos(model, ids, antes=None, novos=False):
+    """
+    Depois de uma gravação em massa (bulk_create/bulk_update), recalcula os
+    resumos afetados. 'antes' é o resultado de 'pares_dos_resumos' obtido
+    antes da gravação. Para objetos novos, passe novos=True e só os ids dos
+    que passam em 'afeta_resumos'.
+    """
+    antes = antes or {}
+    depois = pares_dos_resumos(model, ids, novos=novos)
+    for resumo in RESUMOS:
+        resumo.recalcular(set(antes.get(resumo.nome, ())) | set(depois.get(resumo.nome, ())))
+
+
+def reconstruir_resumos(tamanho_lote):
+    """Reconstrói todos os resumos; devolve {nome: linhas gravadas}."""
+    return {resumo.nome: resumo.reconstruir(tamanho_lote=tamanho_lote) for resumo in RESUMOS}
+
+
+# --- Sinais ---
+
+def _antes_de_gravar(sender, instance, **kwargs):
+    instance._pares_resumos = {}
+    if instance.pk is None:
+        return
+    resumos = RESUMOS
+    if sender is Contrato:
+        campos = sorted({campo for resumo in RESUMOS for campo in resumo.campos_contrato})
+        anterior = Contrato.objects.filter(pk=instance.pk).values(*campos).first() or {}
+        resumos = [
+            resumo for resumo in RESUMOS
+            if any(anterior.get(campo) != getattr(instance, campo) for campo in resumo.campos_contrato)
+        ]
+    for resumo in resumos:
+        instance._pares_resumos[resumo.nome] = resumo.pares_afetados(sender, [instance.pk])
+
+
+def _depois_de_gravar(sender, instance, created=False, **kwargs):
+    antes = getattr(instance, '_pares_resumos', None) or {}
+    instance._pares_resumos = {}
+    if created and not afeta_resumos(instance):
+        return
+    for resumo in RESUMOS:
+        if sender is Contrato and not created and resumo.nome not in antes:
+            continue
+        resumo.recalcular(antes.get(resumo.nome, set()) | resumo.pares_afetados(sender, [instance.pk], novos=created))
+
+
+def _antes_de_excluir(sender, instance, **kwargs):
+    instance._pares_resumos = pares_dos_resumos(sender, [instance.pk])
+
+
+def _depois_de_excluir(sender, instance, **kwargs):
+    for resumo in RESUMOS:
+        resumo.recalcular(getattr(instance, '_pares_resumos', {}).get(resumo.nome, set()))
+
+
+def conectar_resumos():
+    """Mantém os resumos em dia a cada gravação individual (save/delete)."""
+    for model in MODELOS:
+        nome = model.__name__
+        pre_save.connect(_antes_de_gravar, sender=model, dispatch_uid=f'core-resumos-pre-save-{nome}')
+        post_save.connect(_depois_de_gravar, sender=model, dispatch_uid=f'core-resumos-save-{nome}')
+        pre_delete.connect(_antes_de_excluir, sender=model, dispatch_uid=f'core-resumos-pre-delete-{nome}')
+        post_delete.connect(_depois_de_excluir, sender=model, dispatch_uid=f'core-resumos-delete-{nome}')
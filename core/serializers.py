@@ -1,4 +1,6 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
+from .consultas import campos_da_requisicao
 from .models import (
     Imovel,
     Locador,
@@ -8,16 +10,58 @@ from .models import (
     Contrato,
     Pagamento,
     Manutencao,
-    Documento
+    Documento,
+    ExtratoMensal,
+    Arquivo,
 )
 
+# -----------------------------------------------------------------------------
+# CAMPOS DINÂMICOS (SPARSE FIELDSETS)
+# -----------------------------------------------------------------------------
+# Permite que o cliente escolha quais campos quer receber em leituras:
+#   /api/imoveis/?fields=id,endereco,valor_aluguel
+#   /api/imoveis/?exclude=descricao,dados_bancarios
+# O ViewSet usa a mesma escolha para buscar só essas colunas no banco
+# (veja ConsultaOtimizadaMixin em core/consultas.py).
+# -----------------------------------------------------------------------------
+class CamposDinamicosMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        campos = campos_da_requisicao(self.context.get('request'), self.fields.keys())
+        if campos is not None:
+            for nome in set(self.fields) - campos:
+                self.fields.pop(nome)
+
+
+# -----------------------------------------------------------------------------
+# CHAVES ESTRANGEIRAS COM CACHE
+# -----------------------------------------------------------------------------
+# Igual ao PrimaryKeyRelatedField, mas aceita um dicionário {pk: objeto}
+# pré-carregado em 'cache'. As operações em lote (core/lote.py) buscam todos
+# os objetos relacionados de uma vez, em vez de uma consulta por item.
+# -----------------------------------------------------------------------------
+class ChaveEstrangeiraField(serializers.PrimaryKeyRelatedField):
+    cache = None
+
+    def to_internal_value(self, data):
+        if self.cache is None or isinstance(data, bool):
+            return super().to_internal_value(data)
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except DjangoValidationError:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in self.cache:
+            self.fail('does_not_exist', pk_value=data)
+        return self.cache[pk]
+
+
 # -----------------------------------------------------------------------------
 # 1. SERIALIZER PARA IMÓVEIS
 # -----------------------------------------------------------------------------
 # Este serializer converte o modelo Imovel para JSON. É o mais simples,
 # pois não possui relacionamentos de saída (ForeignKey) para outros modelos.
 # -----------------------------------------------------------------------------
-class ImovelSerializer(serializers.ModelSerializer):
+class ImovelSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializador para o modelo Imovel. Inclui todos os campos.
     """
@@ -31,7 +75,7 @@ class ImovelSerializer(serializers.ModelSerializer):
 # -----------------------------------------------------------------------------
 # Semelhante ao ImovelSerializer, converte o modelo Locador para JSON.
 # -----------------------------------------------------------------------------
-class LocadorSerializer(serializers.ModelSerializer):
+class LocadorSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializador para o modelo Locador.
     """
@@ -45,7 +89,7 @@ class LocadorSerializer(serializers.ModelSerializer):
 # -----------------------------------------------------------------------------
 # Converte o modelo Locatario para JSON.
 # -----------------------------------------------------------------------------
-class LocatarioSerializer(serializers.ModelSerializer):
+class LocatarioSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializador para o modelo Locatario.
     """
@@ -60,7 +104,7 @@ class LocatarioSerializer(serializers.ModelSerializer):
 # Este é um serializer mais interessante. Ele lida com os relacionamentos
 # ForeignKey para Imovel, Locador e Locatário.
 # -----------------------------------------------------------------------------
-class ContratoSerializer(serializers.ModelSerializer):
+class ContratoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializador para o modelo Contrato.
     Para os campos de chave estrangeira (imovel, locador, locatario),
@@ -77,13 +121,13 @@ class ContratoSerializer(serializers.ModelSerializer):
 
     # Também precisamos incluir os campos de ID para quando formos criar/editar
     # um contrato, pois precisaremos passar os IDs dos objetos relacionados.
-    imovel_id = serializers.PrimaryKeyRelatedField(
+    imovel_id = ChaveEstrangeiraField(
         queryset=Imovel.objects.all(), source='imovel', write_only=True
     )
-    locador_id = serializers.PrimaryKeyRelatedField(
+    locador_id = ChaveEstrangeiraField(
         queryset=Locador.objects.all(), source='locador', write_only=True
     )
-    locatario_id = serializers.PrimaryKeyRelatedField(
+    locatario_id = ChaveEstrangeiraField(
         queryset=Locatario.objects.all(), source='locatario', write_only=True
     )
     
@@ -92,20 +136,33 @@ class ContratoSerializer(serializers.ModelSerializer):
         # Incluímos todos os campos do modelo, mais os campos de ID para escrita.
         fields = '__all__'
 
+    def validate(self, attrs):
+        # A sobreposição com outros contratos ativos é verificada pelo banco
+        # (core/ocupacao.py); aqui só a coerência das datas do próprio contrato.
+        inicio = attrs.get('data_inicio', getattr(self.instance, 'data_inicio', None))
+        fim = attrs.get('data_fim', getattr(self.instance, 'data_fim', None))
+        if inicio and fim and fim < inicio:
+            raise serializers.ValidationError({'data_fim': ['A data de fim não pode ser anterior à de início.']})
+        return attrs
+
 
 # -----------------------------------------------------------------------------
 # 5. SERIALIZER PARA PAGAMENTOS
 # -----------------------------------------------------------------------------
 # Semelhante ao ContratoSerializer, trata o relacionamento com Contrato.
 # -----------------------------------------------------------------------------
-class PagamentoSerializer(serializers.ModelSerializer):
+class PagamentoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializador para o modelo Pagamento.
     """
     contrato = serializers.StringRelatedField(read_only=True)
-    contrato_id = serializers.PrimaryKeyRelatedField(
+    contrato_id = ChaveEstrangeiraField(
         queryset=Contrato.objects.all(), source='contrato', write_only=True
     )
+    # Id de um Arquivo enviado por /api/arquivos/envios/ (core/arquivos.py).
+    comprovante = ChaveEstrangeiraField(
+        queryset=Arquivo.objects.all(), required=False, allow_null=True
+    )
 
     class Meta:
         model = Pagamento
@@ -117,12 +174,12 @@ class PagamentoSerializer(serializers.ModelSerializer):
 # -----------------------------------------------------------------------------
 # Trata o relacionamento com Imovel.
 # -----------------------------------------------------------------------------
-class ManutencaoSerializer(serializers.ModelSerializer):
+class ManutencaoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializador para o modelo Manutencao.
     """
     imovel = serializers.StringRelatedField(read_only=True)
-    imovel_id = serializers.PrimaryKeyRelatedField(
+    imovel_id = ChaveEstrangeiraField(
         queryset=Imovel.objects.all(), source='imovel', write_only=True
     )
 
@@ -136,7 +193,7 @@ class ManutencaoSerializer(serializers.ModelSerializer):
 # -----------------------------------------------------------------------------
 # Trata múltiplos relacionamentos opcionais.
 # -----------------------------------------------------------------------------
-class DocumentoSerializer(serializers.ModelSerializer):
+class DocumentoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializador para o modelo Documento.
     """
@@ -145,30 +202,41 @@ class DocumentoSerializer(serializers.ModelSerializer):
     locatario = serializers.StringRelatedField(read_only=True)
     contrato = serializers.StringRelatedField(read_only=True)
 
-    imovel_id = serializers.PrimaryKeyRelatedField(
+    imovel_id = ChaveEstrangeiraField(
         queryset=Imovel.objects.all(), source='imovel', write_only=True, required=False
     )
-    locador_id = serializers.PrimaryKeyRelatedField(
+    locador_id = ChaveEstrangeiraField(
         queryset=Locador.objects.all(), source='locador', write_only=True, required=False
     )
-    locatario_id = serializers.PrimaryKeyRelatedField(
+    locatario_id = ChaveEstrangeiraField(
         queryset=Locatario.objects.all(), source='locatario', write_only=True, required=False
     )
-    contrato_id = serializers.PrimaryKeyRelatedField(
+    contrato_id = ChaveEstrangeiraField(
         queryset=Contrato.objects.all(), source='contrato', write_only=True, required=False
     )
+    # Id de um Arquivo enviado por /api/arquivos/envios/ (core/arquivos.py).
+    arquivo = ChaveEstrangeiraField(
+        queryset=Arquivo.objects.all(), required=False, allow_null=True
+    )
 
     class Meta:
         model = Documento
         fields = '__all__'
 
+    def validate(self, attrs):
+        arquivo = attrs.get('arquivo', getattr(self.instance, 'arquivo_id', None))
+        caminho = attrs.get('arquivo_documento', getattr(self.instance, 'arquivo_documento', ''))
+        if not arquivo and not caminho:
+            raise serializers.ValidationError({'arquivo': ["Envie o arquivo ou informe 'arquivo_documento'."]})
+        return attrs
+
 
 # -----------------------------------------------------------------------------
 # 8. SERIALIZER PARA FIADOR
 # -----------------------------------------------------------------------------
 # Converte o modelo Fiador para JSON.
 # -----------------------------------------------------------------------------
-class FiadorSerializer(serializers.ModelSerializer):
+class FiadorSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializador para o modelo Manutencao.
     """
@@ -183,7 +251,25 @@ class FiadorSerializer(serializers.ModelSerializer):
 # -----------------------------------------------------------------------------
 # Converte o modelo Locatario para JSON.
 # -----------------------------------------------------------------------------
-class IntermediarioSerializer(serializers.ModelSerializer):
+class IntermediarioSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Intermediario
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+
+# -----------------------------------------------------------------------------
+# 10. SERIALIZER PARA EXTRATOS MENSAIS
+# -----------------------------------------------------------------------------
+# Somente leitura: os extratos são calculados por core/extratos.py.
+# -----------------------------------------------------------------------------
+class ExtratoMensalSerializer(serializers.ModelSerializer):
+    """
+    Serializador do extrato de repasse de um locador em um mês.
+    """
+    locador_nome = serializers.CharField(source='locador.nome', read_only=True)
+    mes = serializers.DateField(format='%Y-%m', read_only=True)
+
+    class Meta:
+        model = ExtratoMensal
+        exclude = ['id']
+        read_only_fields = [campo.name for campo in ExtratoMensal._meta.fields]
@@ -0,0 +1,48 @@
+from django.apps import apps
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+
+from . import extratos, rentabilidade  # noqa: F401 (registram os resumos em RESUMOS)
+from .models import ExtratoMensal, ResumoMensalImovel, VersaoTabela
+from .resumos import conectar_resumos
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Sinais (signals) são "ganchos" que o Django dispara depois de salvar ou
+# excluir um objeto. Aqui usamos esses ganchos para manter os caches do app
+# coerentes: qualquer escrita em um modelo do 'core' incrementa a versão da
+# tabela (VersaoTabela), usada nos ETags da API, no cache de respostas e no
+# cache do Dashboard.
+#
+# As tabelas de resumo (extratos e rentabilidade, core/resumos.py) também
+# são mantidas por sinais.
+#
+# Operações em massa (bulk_create, bulk_update, QuerySet.update) NÃO disparam
+# sinais. Quem usar essas operações deve chamar 'registrar_alteracao(model)'
+# (e 'atualizar_resumos', se alterar pagamentos, manutenções ou contratos).
+# -----------------------------------------------------------------------------
+
+
+def registrar_alteracao(model):
+    """Avisa que linhas de 'model' foram criadas, alteradas ou excluídas."""
+    tabela = model._meta.label_lower
+    agora = timezone.now()
+    atualizadas = VersaoTabela.objects.filter(tabela=tabela).update(versao=F('versao') + 1, data_atualizacao=agora)
+    if not atualizadas:
+        VersaoTabela.objects.get_or_create(tabela=tabela, defaults={'versao': 1, 'data_atualizacao': agora})
+
+
+def _ao_alterar_modelo(sender, **kwargs):
+    registrar_alteracao(sender)
+
+
+def conectar_sinais():
+    """Conecta os receptores a todos os modelos do app 'core'."""
+    for model in apps.get_app_config('core').get_models():
+        if model in (VersaoTabela, ExtratoMensal, ResumoMensalImovel):
+            # Tabelas derivadas, mantidas pelo próprio app.
+            continue
+        post_save.connect(_ao_alterar_modelo, sender=model, dispatch_uid=f'core-cache-save-{model.__name__}')
+        post_delete.connect(_ao_alterar_modelo, sender=model, dispatch_uid=f'core-cache-delete-{model.__name__}')
+    conectar_resumos()
@@ -0,0 +1,189 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from .models import Imovel, Locador, Locatario, Fiador, Intermediario, Contrato, Pagamento, Manutencao, Documento
+from .resumos import reconstruir_resumos
+from .signals import registrar_alteracao
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Gerador de uma carteira sintética, usado pelos comandos de benchmark e pelo
+# comando 'gerar_portfolio'. Preenche as nove tabelas do app: imóveis,
+# pessoas (locadores, locatários, fiadores e intermediários), contratos
+# (vários por imóvel, em sequência no tempo), um pagamento por mês de
+# contrato, manutenções e o documento de cada contrato. Tudo com
+# 'bulk_create' em lotes, para que milhões de linhas caibam em pouca memória.
+# No final as tabelas de resumo (core/resumos.py) são recalculadas.
+# A semente fixa ('seed') torna os dados reprodutíveis entre execuções.
+#
+# Exemplo de volume de produção grande: imoveis=50_000, contratos_por_imovel=4,
+# meses_por_contrato=25 -> 200 mil contratos e 5 milhões de pagamentos.
+# -----------------------------------------------------------------------------
+
+RUAS = ['Rua das Flores', 'Av. Paulista', 'Rua XV de Novembro', 'Av. Brasil', 'Rua da Praia', 'Rua Augusta']
+NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Elisa', 'Fábio', 'Gabriela', 'Heitor', 'Isabela', 'João']
+SOBRENOMES = ['Silva', 'Souza', 'Oliveira', 'Santos', 'Pereira', 'Lima', 'Costa', 'Ribeiro']
+
+
+def _somar_meses(dia, meses):
+    ano, mes = divmod(dia.month - 1 + meses, 12)
+    return date(dia.year + ano, mes + 1, min(dia.day, 28))
+
+
+def _em_lotes(itens, tamanho):
+    lote = []
+    for item in itens:
+        lote.append(item)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _pessoa(model, indice, aleatorio):
+    nome = f'{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)}'
+    prefixo = model.__name__.lower()
+    return model(
+        nome=f'{nome} {indice}', email=f'{prefixo}{indice}@exemplo.com', telefone='(11) 99999-0000',
+        cpf_cnpj=f'{prefixo[:3].upper()}{indice:011d}', endereco=f'{aleatorio.choice(RUAS)}, {indice}',
+    )
+
+
+def gerar_portfolio(imoveis=5000, contratos_por_imovel=1, meses_por_contrato=20, seed=42, lote=5000, log=None):
+    """
+    Popula o banco com uma carteira sintética e devolve a contagem por tabela.
+    Total de pagamentos = imoveis * contratos_por_imovel * meses_por_contrato.
+    """
+    aleatorio = random.Random(seed)
+    hoje = timezone.localdate()
+    log = log or (lambda mensagem: None)
+    contagem = {}
+
+    locadores = Locador.objects.bulk_create(
+        (_pessoa(Locador, i, aleatorio) for i in range(max(1, imoveis // 5))), batch_size=lote
+    )
+    locatarios = Locatario.objects.bulk_create(
+        (_pessoa(Locatario, i, aleatorio) for i in range(imoveis * contratos_por_imovel)), batch_size=lote
+    )
+    fiadores = Fiador.objects.bulk_create(
+        (_pessoa(Fiador, i, aleatorio) for i in range(max(1, imoveis * contratos_por_imovel // 4))), batch_size=lote
+    )
+    intermediarios = Intermediario.objects.bulk_create(
+        (_pessoa(Intermediario, i, aleatorio) for i in range(max(1, imoveis // 50))), batch_size=lote
+    )
+    contagem['locadores'], contagem['locatarios'] = len(locadores), len(locatarios)
+    contagem['fiadores'], contagem['intermediarios'] = len(fiadores), len(intermediarios)
+    log(f'{len(locadores)} locadores, {len(locatarios)} locatários, {len(fiadores)} fiadores e '
+        f'{len(intermediarios)} intermediários criados.')
+
+    status_imovel = ['Alugado'] * 7 + ['Disponível'] * 2 + ['Em Manutenção']
+    lista_imoveis = Imovel.objects.bulk_create(
+        (
+            Imovel(
+                tipo_imovel=aleatorio.choice(Imovel.TIPO_IMOVEL_CHOICES)[0],
+                endereco=f'{aleatorio.choice(RUAS)}, {i}',
+                status_imovel=aleatorio.choice(status_imovel),
+                area_util=aleatorio.randint(30, 400),
+                valor_aluguel=Decimal(aleatorio.randint(800, 9000)),
+                iptu_valor=Decimal(aleatorio.randint(50, 600)),
+                condominio_valor=Decimal(aleatorio.randint(0, 1500)),
+                valor_aquisicao=Decimal(aleatorio.randint(150_000, 2_000_000)),
+                data_aquisicao=hoje - timedelta(days=aleatorio.randint(365, 7300)),
+                seguro_vencimento=hoje + timedelta(days=aleatorio.randint(-30, 365)),
+                avcb_vencimento=hoje + timedelta(days=aleatorio.randint(-30, 730)) if i % 4 == 0 else None,
+            )
+            for i in range(imoveis)
+        ),
+        batch_size=lote,
+    )
+    contagem['imoveis'] = len(lista_imoveis)
+    log(f'{len(lista_imoveis)} imóveis criados.')
+
+    # Contratos em sequência: o último de cada imóvel alugado está ativo.
+    def contratos():
+        indice_locatario = 0
+        for imovel in lista_imoveis:
+            inicio = _somar_meses(hoje, -meses_por_contrato * contratos_por_imovel + 2)
+            for ordem in range(contratos_por_imovel):
+                ultimo = ordem == contratos_por_imovel - 1
+                fim = _somar_meses(inicio, meses_por_contrato) - timedelta(days=1)
+                yield Contrato(
+                    imovel=imovel, locador=aleatorio.choice(locadores), locatario=locatarios[indice_locatario],
+                    data_inicio=inicio, data_fim=fim, valor_aluguel=imovel.valor_aluguel,
+                    status_contrato='Ativo' if ultimo and imovel.status_imovel == 'Alugado' else 'Encerrado',
+                    data_assinatura=inicio - timedelta(days=10),
+                    data_vencimento_pagamento=aleatorio.choice([5, 10, 15, 20]),
+                    multa_rescisoria=imovel.valor_aluguel * 3,
+                )
+                indice_locatario += 1
+                inicio = fim + timedelta(days=1)
+
+    lista_contratos = Contrato.objects.bulk_create(contratos(), batch_size=lote)
+    contagem['contratos'] = len(lista_contratos)
+    log(f'{len(lista_contratos)} contratos criados.')
+
+    def pagamentos():
+        for contrato in lista_contratos:
+            for mes in range(meses_por_contrato):
+                vencimento = _somar_meses(contrato.data_inicio, mes).replace(day=contrato.data_vencimento_pagamento)
+                if vencimento > hoje:
+                    status = 'Pendente'
+                elif aleatorio.random() < 0.03:
+                    status = 'Em Atraso'
+                else:
+                    status = 'Pago'
+                yield Pagamento(
+                    contrato=contrato, data_pagamento=vencimento, competencia=vencimento.replace(day=1),
+                    valor_pago=contrato.valor_aluguel,
+                    forma_pagamento=aleatorio.choice(Pagamento.FORMA_PAGAMENTO_CHOICES)[0],
+                    status_pagamento=status,
+                )
+
+    total = 0
+    for itens in _em_lotes(pagamentos(), lote):
+        Pagamento.objects.bulk_create(itens)
+        total += len(itens)
+    contagem['pagamentos'] = total
+    log(f'{total} pagamentos criados.')
+
+    status_manutencao = ['Concluído'] * 6 + ['Pendente', 'Em Andamento', 'Cancelado']
+    manutencoes = Manutencao.objects.bulk_create(
+        (
+            Manutencao(
+                imovel=imovel, data_solicitacao=hoje - timedelta(days=aleatorio.randint(0, 720)),
+                descricao='Manutenção preventiva', status_manutencao=aleatorio.choice(status_manutencao),
+                custo_manutencao=Decimal(aleatorio.randint(100, 5000)),
+            )
+            for imovel in lista_imoveis for _ in range(2)
+        ),
+        batch_size=lote,
+    )
+    contagem['manutencoes'] = len(manutencoes)
+    log(f'{len(manutencoes)} manutenções criadas.')
+
+    documentos = Documento.objects.bulk_create(
+        (
+            Documento(
+                imovel_id=contrato.imovel_id, locador_id=contrato.locador_id, locatario_id=contrato.locatario_id,
+                contrato=contrato, tipo_documento='Contrato de Locação',
+                descricao_documento=f'Contrato assinado em {contrato.data_assinatura}',
+                data_documento=contrato.data_assinatura, arquivo_documento=f'documentos/contrato-{contrato.pk}.pdf',
+            )
+            for contrato in lista_contratos
+        ),
+        batch_size=lote,
+    )
+    contagem['documentos'] = len(documentos)
+    log(f'{len(documentos)} documentos criados.')
+
+    # bulk_create não dispara sinais: atualiza o Dashboard e as versões (ETags).
+    for model in (Locador, Locatario, Fiador, Intermediario, Imovel, Contrato, Pagamento, Manutencao, Documento):
+        registrar_alteracao(model)
+    for nome, linhas in reconstruir_resumos(tamanho_lote=lote).items():
+        contagem[nome] = linhas
+        log(f'{linhas} linhas de {nome} calculadas.')
+    return contagem
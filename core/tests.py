@@ -1,3 +1,1202 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.test import APIClient
+
+from . import cobrancas
+from .cobrancas import atualizar_atrasos
+from .management.commands.benchmark_api import comparar
+from .extratos import reconstruir_extratos
+from .fotos import processar_pendentes
+from .importacao import importar
+from .metricas import Coleta, Registro, registro
+from .signals import registrar_alteracao
+from .sintetico import gerar_portfolio
+from .views import ContratoViewSet, DashboardView, ModelViewSetBase, PagamentoViewSet
+from .models import (
+    Imovel, Locador, Locatario, Fiador, Intermediario, Contrato, Pagamento, Manutencao, Documento, ExtratoMensal,
+    ResumoMensalImovel, Importacao, FotoImovel,
+)
+from .serializers import ContratoSerializer, LocadorSerializer
+
+
+def criar_contrato(sufixo='1', **extra):
+    """Cria um contrato completo (imóvel, locador e locatário) para os testes."""
+    imovel = Imovel.objects.create(
+        tipo_imovel='Casa', endereco=f'Rua {sufixo}', area_util=50, valor_aluguel=1000
+    )
+    locador = Locador.objects.create(
+        nome=f'Locador {sufixo}', email=f'locador{sufixo}@teste.com', telefone='1',
+        cpf_cnpj=f'L{sufixo}', endereco='Rua X'
+    )
+    locatario = Locatario.objects.create(
+        nome=f'Locatário {sufixo}', email=f'locatario{sufixo}@teste.com', telefone='1',
+        cpf_cnpj=f'T{sufixo}', endereco='Rua Y'
+    )
+    dados = dict(
+        imovel=imovel, locador=locador, locatario=locatario,
+        data_inicio=date(2025, 1, 1), data_fim=date(2025, 12, 31), valor_aluguel=1500,
+        data_assinatura=date(2024, 12, 20), data_vencimento_pagamento=5, multa_rescisoria=3000,
+    )
+    dados.update(extra)
+    return Contrato.objects.create(**dados)
+
+
+class FiltrosTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.ativo = criar_contrato('1')
+        self.encerrado = criar_contrato('2', status_contrato='Encerrado', data_fim=date(2024, 6, 30))
+        Pagamento.objects.create(
+            contrato=self.ativo, data_pagamento=date(2025, 2, 5), valor_pago=1500,
+            forma_pagamento='PIX', status_pagamento='Pendente'
+        )
+        Pagamento.objects.create(
+            contrato=self.encerrado, data_pagamento=date(2024, 3, 5), valor_pago=1500,
+            forma_pagamento='PIX', status_pagamento='Pago'
+        )
+
+    def test_filtro_por_status(self):
+        resposta = self.client.get('/api/contratos/', {'status_contrato': 'Ativo'})
+        self.assertEqual([c['id'] for c in resposta.json()['results']], [self.ativo.id])
+
+    def test_filtro_in_chave_estrangeira_e_intervalo_de_datas(self):
+        resposta = self.client.get('/api/pagamentos/', {
+            'contrato_id__in': f'{self.ativo.id},{self.encerrado.id}',
+            'data_pagamento__gte': '2025-01-01',
+        })
+        self.assertEqual(len(resposta.json()['results']), 1)
+
+    def test_valor_invalido_retorna_400(self):
+        resposta = self.client.get('/api/contratos/', {'data_fim__gte': 'ontem'})
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('data_fim__gte', resposta.json())
+
+
+class PaginacaoTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        contrato = criar_contrato()
+        # Várias linhas com a mesma data: o desempate precisa ser feito pelo id.
+        for dia in (5, 5, 5, 10, 10, 15, 20):
+            Pagamento.objects.create(
+                contrato=contrato, data_pagamento=date(2025, 3, dia), valor_pago=1500,
+                forma_pagamento='PIX'
+            )
+
+    def test_percorre_todas_as_paginas_sem_repetir(self):
+        esperado = list(Pagamento.objects.order_by('-data_pagamento', '-id').values_list('id', flat=True))
+        vistos = []
+        url = '/api/pagamentos/?page_size=2'
+        while url:
+            dados = self.client.get(url).json()
+            vistos += [p['id'] for p in dados['results']]
+            url = dados['next']
+        self.assertEqual(vistos, esperado)
+
+    def test_pagina_anterior(self):
+        primeira = self.client.get('/api/pagamentos/?page_size=3').json()
+        segunda = self.client.get(primeira['next']).json()
+        anterior = self.client.get(segunda['previous']).json()
+        self.assertEqual(anterior['results'], primeira['results'])
+        self.assertIsNone(anterior['previous'])
+
+    def test_cursor_invalido(self):
+        self.assertEqual(self.client.get('/api/pagamentos/?cursor=invalido').status_code, 404)
+
+
+class ConsultasTests(TestCase):
+    ENDPOINTS = [
+        '/api/imoveis/', '/api/locadores/', '/api/locatarios/', '/api/fiadores/',
+        '/api/intermediarios/', '/api/contratos/', '/api/pagamentos/',
+        '/api/manutencoes/', '/api/documentos/',
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.total = 0
+
+    def _popular(self, quantidade):
+        for _ in range(quantidade):
+            self.total += 1
+            sufixo = str(self.total)
+            contrato = criar_contrato(sufixo)
+            Pagamento.objects.create(
+                contrato=contrato, data_pagamento=date(2025, 2, 5), valor_pago=1500, forma_pagamento='PIX'
+            )
+            Manutencao.objects.create(imovel=contrato.imovel, data_solicitacao=date(2025, 2, 1), descricao='x')
+            Documento.objects.create(
+                imovel=contrato.imovel, locador=contrato.locador, locatario=contrato.locatario,
+                contrato=contrato, tipo_documento='Contrato', descricao_documento='x',
+                data_documento=date(2025, 1, 1), arquivo_documento='x.pdf'
+            )
+            for model in (Fiador, Intermediario):
+                model.objects.create(
+                    nome=sufixo, email=f'{model.__name__}{sufixo}@teste.com', telefone='1',
+                    cpf_cnpj=f'{model.__name__}{sufixo}', endereco='Rua Z'
+                )
+
+    def _contar_consultas(self):
+        contagem = {}
+        for endpoint in self.ENDPOINTS:
+            with CaptureQueriesContext(connection) as consultas:
+                self.assertEqual(self.client.get(endpoint).status_code, 200)
+            contagem[endpoint] = len(consultas)
+        return contagem
+
+    def test_numero_de_consultas_nao_depende_do_numero_de_linhas(self):
+        self._popular(1)
+        com_uma_linha = self._contar_consultas()
+        self._popular(5)
+        self.assertEqual(self._contar_consultas(), com_uma_linha)
+        for endpoint, quantidade in com_uma_linha.items():
+            # A versão das tabelas (ETag, core/condicional.py) + a própria lista.
+            self.assertEqual(quantidade, 2, endpoint)
+
+    def test_lista_rapida_identica_ao_serializer(self):
+        self._popular(3)
+        Pagamento.objects.create(
+            contrato=Contrato.objects.first(), data_pagamento=date(2025, 3, 5), valor_pago=Decimal('1234.5'),
+            forma_pagamento='PIX', multa_juros=Decimal('0.1')
+        )
+        consultas = ['', '?fields=id,contrato,valor_pago', '?page_size=2']
+        with mock.patch.object(ModelViewSetBase, 'cache_respostas', False):
+            for endpoint in self.ENDPOINTS:
+                for consulta in consultas:
+                    rapida = self.client.get(endpoint + consulta).content
+                    with mock.patch.object(ModelViewSetBase, 'lista_rapida', False):
+                        normal = self.client.get(endpoint + consulta).content
+                    self.assertEqual(rapida, normal, endpoint + consulta)
+
+
+class IndicesTests(TestCase):
+    INDICES = {
+        Pagamento: ('pagamento_status_data_idx', 'pagamento_pendente_idx'),
+        Contrato: ('contrato_ativo_fim_idx',),
+        Manutencao: ('manutencao_status_data_idx',),
+    }
+
+    def test_declarados_no_modelo_e_criados_pela_migracao(self):
+        with connection.cursor() as cursor:
+            for model, nomes in self.INDICES.items():
+                restricoes = connection.introspection.get_constraints(cursor, model._meta.db_table)
+                for nome in nomes:
+                    self.assertIn(nome, {indice.name for indice in model._meta.indexes})
+                    self.assertTrue(restricoes[nome]['index'], nome)
+        # O Meta dos modelos e as migrações não divergem.
+        call_command('makemigrations', 'core', check=True, dry_run=True, verbosity=0)
+
+    def test_pendentes_vencidos_lidos_pelo_indice(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plano de consulta conferido no SQLite.')
+        consulta = Pagamento.objects.filter(status_pagamento='Pendente', data_pagamento__lt=date(2025, 3, 1))
+        sql, parametros = consulta.values('id').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', parametros)
+            plano = ' '.join(str(linha[-1]) for linha in cursor.fetchall())
+        self.assertRegex(plano, r'USING (COVERING )?INDEX (pagamento_pendente_idx|pagamento_status_data_idx)')
+
+
+class OpcoesTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.contrato = criar_contrato('1')
+        criar_contrato('2')
+
+    def test_lista_compacta_com_busca(self):
+        resposta = self.client.get('/api/contratos/opcoes/', {'q': 'Rua 1'})
+        self.assertEqual(resposta.json(), [{'id': self.contrato.id, 'label': str(self.contrato)}])
+
+    def test_etag_devolve_304(self):
+        primeira = self.client.get('/api/locatarios/opcoes/')
+        with CaptureQueriesContext(connection) as consultas:
+            # ETag fraco também vale.
+            segunda = self.client.get('/api/locatarios/opcoes/', HTTP_IF_NONE_MATCH=f"W/{primeira['ETag']}")
+        self.assertEqual(segunda.status_code, 304)
+        # Só a consulta das versões: as opções não são buscadas.
+        self.assertEqual(len(consultas), 1)
+        locatario = Locatario.objects.get(pk=self.contrato.locatario_id)
+        locatario.nome = 'Outro nome'
+        locatario.save()
+        terceira = self.client.get('/api/locatarios/opcoes/', HTTP_IF_NONE_MATCH=primeira['ETag'])
+        self.assertEqual(terceira.status_code, 200)
+
+    def test_etag_muda_com_a_tabela_da_busca(self):
+        primeira = self.client.get('/api/pagamentos/opcoes/', {'q': 'Outro'})
+        locatario = Locatario.objects.get(pk=self.contrato.locatario_id)
+        locatario.nome = 'Outro nome'
+        locatario.save()
+        segunda = self.client.get('/api/pagamentos/opcoes/', {'q': 'Outro'}, HTTP_IF_NONE_MATCH=primeira['ETag'])
+        self.assertEqual(segunda.status_code, 200)
+
+
+class CamposDinamicosTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        criar_contrato()
+
+    def test_fields_limita_json_e_colunas(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get('/api/imoveis/', {'fields': 'id,endereco'})
+        self.assertEqual(list(resposta.json()['results'][0]), ['id', 'endereco'])
+        self.assertNotIn('descricao', consultas[0]['sql'])
+
+    def test_exclude(self):
+        resposta = self.client.get('/api/contratos/', {'exclude': 'imovel,clausulas_especificas'})
+        item = resposta.json()['results'][0]
+        self.assertNotIn('imovel', item)
+        self.assertIn('locatario', item)
+
+
+class LoteTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.contrato = criar_contrato()
+
+    def _pagamento(self, **extra):
+        dados = {
+            'contrato_id': self.contrato.id, 'data_pagamento': '2025-03-05',
+            'valor_pago': '1500.00', 'forma_pagamento': 'PIX',
+        }
+        dados.update(extra)
+        return dados
+
+    def test_cria_em_lote_com_erros_por_item(self):
+        itens = [self._pagamento(), self._pagamento(contrato_id=9999), self._pagamento(data_pagamento='2025-04-05')]
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.post('/api/pagamentos/lote/', itens, format='json')
+        self.assertEqual(resposta.status_code, 207)
+        self.assertEqual(resposta.json()['total'], 2)
+        self.assertEqual([erro['indice'] for erro in resposta.json()['erros']], [1])
+        # Uma consulta para os contratos + o INSERT em lote (e o controle da transação)
+        # + o UPDATE da versão da tabela.
+        self.assertLessEqual(len(consultas), 5)
+        self.assertEqual(Pagamento.objects.count(), 2)
+
+    def test_altera_e_exclui_em_lote(self):
+        ids = self.client.post('/api/pagamentos/lote/', [self._pagamento(), self._pagamento()], format='json').json()['ids']
+        resposta = self.client.patch(
+            '/api/pagamentos/lote/', [{'id': i, 'status_pagamento': 'Pago'} for i in ids], format='json'
+        )
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(Pagamento.objects.filter(status_pagamento='Pago').count(), 2)
+        resposta = self.client.delete('/api/pagamentos/lote/', {'ids': ids}, format='json')
+        self.assertEqual(resposta.json(), {'excluidos': 2})
+
+    def test_conflito_nao_expoe_o_erro_do_banco(self):
+        itens = [self._pagamento(competencia='2025-03-01'), self._pagamento(competencia='2025-03-01')]
+        with self.assertLogs('core.lote', 'ERROR'):
+            resposta = self.client.post('/api/pagamentos/lote/', itens, format='json')
+        self.assertEqual(resposta.status_code, 409)
+        self.assertNotIn('UNIQUE', resposta.json()['detail'])
+        self.assertEqual(Pagamento.objects.count(), 0)
+
+
+class GeracaoPagamentosTests(TestCase):
+    def test_gera_uma_vez_por_mes(self):
+        ativo = criar_contrato('1', data_vencimento_pagamento=31)
+        criar_contrato('2', status_contrato='Encerrado')
+        criar_contrato('3', data_inicio=date(2025, 6, 1))
+        client = APIClient()
+
+        resposta = client.post('/api/pagamentos/gerar/', {'mes': '2025-02'}, format='json')
+        self.assertEqual(resposta.json()['criados'], 1)
+        pagamento = Pagamento.objects.get()
+        self.assertEqual(pagamento.contrato, ativo)
+        self.assertEqual(pagamento.data_pagamento, date(2025, 2, 28))
+        self.assertEqual(pagamento.competencia, date(2025, 2, 1))
+
+        resposta = client.post('/api/pagamentos/gerar/', {'mes': '2025-02'}, format='json')
+        self.assertEqual(resposta.json()['criados'], 0)
+        self.assertEqual(Pagamento.objects.count(), 1)
+
+    def test_conta_so_os_pagamentos_inseridos(self):
+        contratos = [criar_contrato(sufixo) for sufixo in '123']
+        # Pagamento do mês criado por outra execução depois da consulta dos contratos.
+        original = cobrancas.contratos_sem_cobranca
+
+        def com_concorrente(competencia):
+            base = list(original(competencia))
+            Pagamento.objects.create(
+                contrato=contratos[0], competencia=competencia, data_pagamento=date(2025, 2, 5),
+                valor_pago=1500, forma_pagamento='PIX',
+            )
+            return Contrato.objects.filter(pk__in=[contrato.pk for contrato in base])
+
+        with mock.patch.object(cobrancas, 'contratos_sem_cobranca', com_concorrente):
+            resumo = cobrancas.gerar_pagamentos_do_mes(date(2025, 2, 1))
+        self.assertEqual(resumo['criados'], 2)
+        self.assertEqual(Pagamento.objects.count(), 3)
+
+
+class AtrasosTests(TestCase):
+    def test_marca_atraso_e_calcula_multa_juros(self):
+        contrato = criar_contrato()
+        vencido = Pagamento.objects.create(
+            contrato=contrato, data_pagamento=date(2025, 3, 5), valor_pago=1000, forma_pagamento='PIX'
+        )
+        em_dia = Pagamento.objects.create(
+            contrato=contrato, data_pagamento=date(2025, 4, 5), valor_pago=1000, forma_pagamento='PIX'
+        )
+
+        previa = atualizar_atrasos(hoje=date(2025, 3, 20), dry_run=True)
+        self.assertEqual(previa['novos_em_atraso'], 1)
+        self.assertEqual(Pagamento.objects.filter(status_pagamento='Em Atraso').count(), 0)
+
+        resumo = atualizar_atrasos(hoje=date(2025, 3, 20))
+        self.assertEqual(resumo['novos_em_atraso'], 1)
+        vencido.refresh_from_db()
+        em_dia.refresh_from_db()
+        self.assertEqual(vencido.status_pagamento, 'Em Atraso')
+        # 2% de multa + 1% ao mês pro rata por 15 dias = 20,00 + 5,00
+        self.assertEqual(vencido.multa_juros, Decimal('25.00'))
+        self.assertEqual(em_dia.status_pagamento, 'Pendente')
+
+        self.assertEqual(atualizar_atrasos(hoje=date(2025, 3, 20))['multas_recalculadas'], 0)
+        self.assertEqual(atualizar_atrasos(hoje=date(2025, 3, 26))['multas_recalculadas'], 1)
+
+
+class VencimentosTests(TestCase):
+    def test_agenda_unificada_e_ordenada(self):
+        hoje = timezone.localdate()
+        contrato = criar_contrato(data_fim=hoje + timedelta(days=10))
+        Imovel.objects.filter(pk=contrato.imovel_id).update(
+            seguro_vencimento=hoje + timedelta(days=20),
+            avcb_vencimento=hoje + timedelta(days=5),
+            vencimento_extintores=hoje + timedelta(days=90),
+            vencimento_dedetizacao=hoje - timedelta(days=3),
+        )
+        resposta = APIClient().get('/api/vencimentos/', {'dias': 30})
+        self.assertEqual([item['tipo'] for item in resposta.json()], ['AVCB', 'Fim do Contrato', 'Seguro'])
+        self.assertEqual(resposta.json()[1]['contrato_id'], contrato.id)
+
+        resposta = APIClient().get('/api/vencimentos/', {'dias': 30, 'vencidos': 'true'})
+        self.assertEqual(resposta.json()[0]['dias_restantes'], -3)
+
+
+class ExportacaoTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        contrato = criar_contrato()
+        for status_pagamento in ('Pago', 'Pendente', 'Pendente'):
+            Pagamento.objects.create(
+                contrato=contrato, data_pagamento=date(2025, 3, 5), valor_pago=1500,
+                forma_pagamento='PIX', status_pagamento=status_pagamento
+            )
+
+    def test_csv_com_filtros_e_rotulos(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get('/api/pagamentos/exportar/', {
+                'status_pagamento': 'Pendente', 'fields': 'id,contrato,valor_pago',
+            })
+            conteudo = b''.join(resposta.streaming_content).decode('utf-8-sig')
+        linhas = conteudo.strip().splitlines()
+        self.assertEqual(linhas[0], 'id,contrato,valor_pago')
+        self.assertEqual(len(linhas), 3)
+        self.assertIn('Rua 1', linhas[1])
+        self.assertEqual(len(consultas), 1)
+
+    def test_csv_sem_formulas(self):
+        Pagamento.objects.update(comprovante_pagamento='=HYPERLINK("http://x")', valor_pago=-10)
+        resposta = self.client.get('/api/pagamentos/exportar/', {'fields': 'id,valor_pago,comprovante_pagamento'})
+        linhas = b''.join(resposta.streaming_content).decode('utf-8-sig').strip().splitlines()
+        self.assertTrue(linhas[1].endswith(',-10.00,"\'=HYPERLINK(""http://x"")"'), linhas[1])
+
+    def test_separador_do_csv(self):
+        resposta = self.client.get('/api/pagamentos/exportar/', {'fields': 'id,valor_pago', 'separador': ';'})
+        linhas = b''.join(resposta.streaming_content).decode('utf-8-sig').strip().splitlines()
+        self.assertEqual(linhas[0], 'id;valor_pago')
+        for separador in ('"', '\n', '\r', ';;'):
+            resposta = self.client.get('/api/pagamentos/exportar/', {'separador': separador})
+            self.assertEqual(resposta.status_code, 400, repr(separador))
+
+    def test_xlsx_valido(self):
+        resposta = self.client.get('/api/pagamentos/exportar/', {'formato': 'xlsx'})
+        arquivo = zipfile.ZipFile(io.BytesIO(b''.join(resposta.streaming_content)))
+        planilha = arquivo.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(planilha.count('<row>'), 4)
+
+
+class ImportacaoTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_csv_de_locadores_com_erros_por_linha(self):
+        Locador.objects.create(nome='Antigo', email='a@x.com', telefone='1', cpf_cnpj='111', endereco='R')
+        conteudo = (
+            'nome;email;telefone;cpf_cnpj;endereco\n'
+            'Ana;ana@x.com;1;222;Rua A\n'
+            'Repetido;b@x.com;1;111;Rua B\n'
+            'Bia;bia@x.com;1;333;Rua C\n'
+        ).encode()
+        resposta = self.client.post('/api/locadores/importar/', {
+            'arquivo': SimpleUploadedFile('locadores.csv', conteudo),
+        }, format='multipart')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.data['criados'], 2)
+        self.assertEqual([erro['linha'] for erro in resposta.data['erros']], [2])
+        self.assertIn('cpf_cnpj', resposta.data['erros'][0]['erros'])
+
+        # O mesmo arquivo de novo: a importação já foi concluída, nada é duplicado.
+        resposta = self.client.post('/api/locadores/importar/', {
+            'arquivo': SimpleUploadedFile('locadores.csv', conteudo),
+        }, format='multipart')
+        self.assertEqual(resposta.data['linhas'], 0)
+        self.assertEqual(Locador.objects.count(), 3)
+
+    def test_conflito_no_banco_recusa_so_as_linhas_em_conflito(self):
+        Locador.objects.create(nome='Antigo', email='a@x.com', telefone='1', cpf_cnpj='111', endereco='R')
+        conteudo = (
+            'nome;email;telefone;cpf_cnpj;endereco\n'
+            'Ana;ana@x.com;1;222;Rua A\n'
+            'Paralelo;b@x.com;1;111;Rua B\n'
+            'Bia;bia@x.com;1;333;Rua C\n'
+        ).encode()
+        # Simula o cpf_cnpj '111' gravado por outra requisição depois da conferência.
+        with mock.patch('core.importacao._conferir_unicos', lambda model, unicos, validos, erros: validos):
+            resumo = importar(io.BytesIO(conteudo), LocadorSerializer, 'locadores.csv')
+        self.assertEqual(resumo['criados'], 2)
+        self.assertEqual([erro['linha'] for erro in resumo['erros']], [2])
+        self.assertEqual(set(Locador.objects.values_list('cpf_cnpj', flat=True)), {'111', '222', '333'})
+        self.assertEqual(Importacao.objects.get(pk=resumo['importacao_id']).criados, 2)
+
+    def test_contratos_por_chave_natural_e_retomada(self):
+        criar_contrato()
+        linha = {
+            'imovel__endereco': 'Rua 1', 'locador__cpf_cnpj': 'L1', 'locatario__email': 'locatario1@teste.com',
+            'data_inicio': '2026-01-01', 'data_fim': '2026-12-31', 'valor_aluguel': '1800.00',
+            'data_assinatura': '2025-12-20', 'data_vencimento_pagamento': 10, 'multa_rescisoria': '3600.00',
+        }
+        # Um ano por linha: contratos ativos do mesmo imóvel não podem se sobrepor.
+        linhas = [
+            dict(linha, data_inicio=f'{2026 + i}-01-01', data_fim=f'{2026 + i}-12-31') for i in range(5)
+        ] + [dict(linha, locador__cpf_cnpj='nao-existe')]
+        arquivo = io.BytesIO('\n'.join(json.dumps(item) for item in linhas).encode())
+
+        # Simula uma interrupção depois do segundo bloco (4 linhas).
+        class Interrompida(Exception):
+            pass
+
+        def interromper(parcial):
+            if parcial['linhas'] == 4:
+                raise Interrompida
+
+        with self.assertRaises(Interrompida):
+            importar(arquivo, ContratoSerializer, 'contratos.jsonl', tamanho_lote=2, ao_progredir=interromper)
+        self.assertEqual(Contrato.objects.count(), 5)
+        arquivo.seek(0)
+        with CaptureQueriesContext(connection) as consultas:
+            resumo = importar(arquivo, ContratoSerializer, 'contratos.jsonl', tamanho_lote=100)
+        self.assertEqual(resumo['retomada_da_linha'], 4)
+        self.assertEqual(resumo['linhas'], 2)
+        self.assertEqual(resumo['criados'], 1)
+        self.assertEqual(Contrato.objects.count(), 6)
+        self.assertEqual(resumo['erros'][0]['linha'], 6)
+        self.assertIn('locador__cpf_cnpj', resumo['erros'][0]['erros'])
+        # Um bloco: consultas fixas, independentes do número de linhas
+        # (inclui o recálculo das tabelas de resumo, core/resumos.py).
+        self.assertLess(len(consultas), 25)
+
+
+class BuscaTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.contrato = criar_contrato('1')
+        Locatario.objects.create(
+            nome='Maria Silva', email='maria@teste.com', telefone='1', cpf_cnpj='123.456.789-00', endereco='Rua Z'
+        )
+        Imovel.objects.create(
+            tipo_imovel='Casa', endereco='Avenida Brasil 100', descricao='Perto da rua Silva Jardim',
+            area_util=80, valor_aluguel=2000
+        )
+
+    def test_ranking_e_tipos(self):
+        resposta = self.client.get('/api/busca/', {'q': 'silva'})
+        self.assertEqual(resposta.status_code, 200)
+        tipos = [item['tipo'] for item in resposta.data['resultados']]
+        # O nome (peso A) vem antes da descrição (peso C).
+        self.assertEqual(tipos, ['locatarios', 'imoveis'])
+
+        resposta = self.client.get('/api/busca/', {'q': '456.789'})
+        self.assertEqual(resposta.data['resultados'][0]['titulo'], 'Maria Silva')
+
+    def test_contrato_pelo_endereco_do_imovel(self):
+        resposta = self.client.get('/api/busca/', {'q': 'rua 1', 'tipos': 'contratos'})
+        self.assertEqual(
+            [(item['tipo'], item['id']) for item in resposta.data['resultados']],
+            [('contratos', self.contrato.pk)],
+        )
+
+    def test_texto_curto_e_tipo_invalido(self):
+        self.assertEqual(self.client.get('/api/busca/', {'q': 'a'}).data['total'], 0)
+        self.assertEqual(self.client.get('/api/busca/', {'q': 'silva', 'tipos': 'x'}).status_code, 400)
+
+
+class RequisicoesCondicionaisTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.contrato = criar_contrato('1')
+
+    def test_lista_sem_alteracoes_devolve_304_sem_consultar_a_tabela(self):
+        resposta = self.client.get('/api/contratos/')
+        etag = resposta['ETag']
+        self.assertIn('Last-Modified', resposta)
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get('/api/contratos/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 304)
+        self.assertEqual(len(consultas), 1)
+        # Outra URL (filtros, ?fields=, cursor) tem outro ETag.
+        self.assertNotEqual(self.client.get('/api/contratos/?fields=id')['ETag'], etag)
+
+    def test_alteracao_em_modelo_exibido_muda_o_etag(self):
+        etag_lista = self.client.get('/api/contratos/')['ETag']
+        etag_detalhe = self.client.get(f'/api/contratos/{self.contrato.pk}/')['ETag']
+        # O __str__ do Contrato mostra o endereço do Imóvel.
+        imovel = self.contrato.imovel
+        imovel.endereco = 'Rua Nova'
+        imovel.save()
+        self.assertEqual(self.client.get('/api/contratos/', HTTP_IF_NONE_MATCH=etag_lista).status_code, 200)
+        resposta = self.client.get(f'/api/contratos/{self.contrato.pk}/', HTTP_IF_NONE_MATCH=etag_detalhe)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.data['imovel'], 'Casa - Rua Nova')
+
+
+class CacheRespostasTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.contrato = criar_contrato('1')
+
+    def _contadores(self):
+        return self.client.get('/api/cache/').data.get('core.contrato', {'acertos': 0, 'faltas': 0})
+
+    def test_acerto_e_invalidacao_por_modelo_dependente(self):
+        antes = self._contadores()
+        self.client.get('/api/contratos/')
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get('/api/contratos/')
+        # Só a consulta das versões: nem a tabela nem o serializer são usados.
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(resposta.data['results'][0]['imovel'], 'Casa - Rua 1')
+
+        imovel = self.contrato.imovel
+        imovel.endereco = 'Rua Nova'
+        imovel.save()
+        resposta = self.client.get('/api/contratos/')
+        self.assertEqual(resposta.data['results'][0]['imovel'], 'Casa - Rua Nova')
+
+        depois = self._contadores()
+        self.assertEqual(depois['acertos'] - antes['acertos'], 1)
+        self.assertEqual(depois['faltas'] - antes['faltas'], 2)
+
+    def test_links_da_paginacao_nao_vazam_entre_hosts(self):
+        criar_contrato('2')
+        for host in ('localhost', '127.0.0.1'):
+            resposta = self.client.get('/api/contratos/', {'page_size': 1}, HTTP_HOST=host)
+            self.assertTrue(resposta.data['next'].startswith(f'http://{host}/'), resposta.data['next'])
+        resposta = self.client.get('/api/contratos/', {'page_size': 1}, HTTP_HOST='localhost', secure=True)
+        self.assertTrue(resposta.data['next'].startswith('https://localhost/'), resposta.data['next'])
+
+
+class DashboardTests(TestCase):
+    def test_cache_segue_a_versao_das_tabelas(self):
+        client = APIClient()
+        contrato = criar_contrato()
+        self.assertEqual(client.get('/api/dashboard/').json()['pagamentos']['total'], 0)
+        with CaptureQueriesContext(connection) as consultas:
+            client.get('/api/dashboard/')
+        # Só a consulta das versões.
+        self.assertEqual(len(consultas), 1)
+
+        # Escrita em massa, sem sinais: só registrar_alteracao muda a chave.
+        Pagamento.objects.bulk_create([Pagamento(
+            contrato=contrato, data_pagamento=date(2025, 2, 5), valor_pago=1500, forma_pagamento='PIX',
+        )])
+        registrar_alteracao(Pagamento)
+        self.assertEqual(client.get('/api/dashboard/').json()['pagamentos']['total'], 1)
+
+
+class AssincronoTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for sufixo in ('1', '2', '3'):
+            contrato = criar_contrato(sufixo)
+            Pagamento.objects.create(
+                contrato=contrato, data_pagamento=date(2025, 2, 5), valor_pago=1500, forma_pagamento='PIX'
+            )
+        self.contrato = contrato
+
+    async def test_mesmo_json_dos_endpoints_normais(self):
+        cliente = AsyncClient()
+        for consulta in ('contratos/?page_size=2', 'pagamentos/?fields=id,contrato', 'contratos/?status_contrato=Ativo'):
+            normal = await cliente.get(f'/api/{consulta}', headers={'Accept': 'application/json'})
+            assincrona = await cliente.get(f'/api/assincrono/{consulta}')
+            self.assertEqual(assincrona.json()['results'], normal.json()['results'], consulta)
+            self.assertEqual(assincrona.json()['next'] is None, normal.json()['next'] is None, consulta)
+
+        detalhe = f'contratos/{self.contrato.pk}/'
+        normal = await cliente.get(f'/api/{detalhe}', headers={'Accept': 'application/json'})
+        assincrona = await cliente.get(f'/api/assincrono/{detalhe}')
+        self.assertEqual(assincrona.content, normal.content)
+        resposta = await cliente.get(f'/api/assincrono/{detalhe}', headers={'If-None-Match': assincrona['ETag']})
+        self.assertEqual(resposta.status_code, 304)
+
+        self.assertEqual((await cliente.get('/api/assincrono/contratos/999/')).status_code, 404)
+        self.assertEqual((await cliente.get('/api/assincrono/pagamentos/?data_pagamento__gte=x')).status_code, 400)
+
+    async def test_dashboard(self):
+        cliente = AsyncClient()
+        normal = (await cliente.get('/api/dashboard/', headers={'Accept': 'application/json'})).json()
+        assincrono = (await cliente.get('/api/assincrono/dashboard/')).json()
+        self.assertEqual(assincrono, normal)
+        self.assertEqual(assincrono['pagamentos']['total'], 3)
+
+
+    async def test_so_leitura_e_filtros_no_detalhe(self):
+        cliente = AsyncClient()
+        for url in ('/api/assincrono/imoveis/', f'/api/assincrono/contratos/{self.contrato.pk}/',
+                    '/api/assincrono/dashboard/'):
+            self.assertEqual((await cliente.delete(url)).status_code, 405, url)
+            self.assertEqual((await cliente.post(url)).status_code, 405, url)
+            self.assertEqual((await cliente.head(url)).status_code, 200, url)
+        # Fora do filtro: 404, como no endpoint normal.
+        url = f'/api/contratos/{self.contrato.pk}/?status_contrato=Encerrado'
+        normal = await cliente.get(url, headers={'Accept': 'application/json'})
+        assincrono = await cliente.get(url.replace('/api/', '/api/assincrono/'))
+        self.assertEqual((normal.status_code, assincrono.status_code), (404, 404))
+
+    async def test_mesmas_permissoes_do_endpoint_normal(self):
+        cliente = AsyncClient()
+        with mock.patch.object(PagamentoViewSet, 'permission_classes', [IsAuthenticated]), \
+                mock.patch.object(ContratoViewSet, 'permission_classes', [IsAuthenticated]), \
+                mock.patch.object(DashboardView, 'permission_classes', [IsAuthenticated]):
+            for url in ('/api/assincrono/pagamentos/', f'/api/assincrono/contratos/{self.contrato.pk}/',
+                        '/api/assincrono/dashboard/'):
+                normal = await cliente.get(url.replace('/assincrono', ''), headers={'Accept': 'application/json'})
+                resposta = await cliente.get(url)
+                self.assertEqual((resposta.status_code, resposta.json()), (403, normal.json()), url)
+                self.assertEqual(normal.status_code, 403)
+
+
+@override_settings(METRICAS_ATIVAS=True, METRICAS_AMOSTRAGEM=1.0, METRICAS_TOKEN='segredo')
+class MetricasTests(TestCase):
+    def setUp(self):
+        registro.limpar()
+        caches['metricas'].clear()
+        self.client = APIClient()
+        criar_contrato('1')
+
+    def _metricas(self):
+        resposta = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer segredo')
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.content.decode()
+
+    def test_requisicoes_consultas_e_histogramas_por_rota(self):
+        self.client.get('/api/contratos/')
+        self.client.get('/api/contratos/')
+        texto = self._metricas()
+        rotulos = 'rota="contrato-list",acao="list"'
+        self.assertIn(f'api_requisicoes_total{{{rotulos}}} 2', texto)
+        self.assertIn(f'api_duracao_segundos_count{{{rotulos}}} 2', texto)
+        # 1ª: versões das tabelas + lista; 2ª: só as versões (cache de respostas).
+        self.assertIn(f'api_consultas_sum{{{rotulos}}} 3', texto)
+        self.assertIn(f'api_resposta_bytes_bucket{{{rotulos},le="+Inf"}} 2', texto)
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+    def test_consultas_repetidas(self):
+        coleta = Coleta()
+        coleta.sqls['SELECT * FROM core_imovel WHERE id = %s'] = 5
+        coleta.sqls['SELECT * FROM core_contrato WHERE id IN (%s, %s)'] = 1
+        registro.registrar('contrato-list', 'list', 0.01, coleta, 0.001, 100)
+        texto = self._metricas()
+        self.assertIn(
+            'api_consultas_repetidas_total{rota="contrato-list",acao="list",'
+            'sql="SELECT * FROM core_imovel WHERE id = %s"} 1', texto
+        )
+        self.assertIn('api_com_n_mais_1_total{rota="contrato-list",acao="list"} 1', texto)
+        self.assertNotIn('core_contrato WHERE', texto)
+
+    def test_soma_os_processos_e_esquece_os_que_pararam(self):
+        outros = []
+        for pid in (101, 102):
+            outro = Registro()
+            outro.registrar('contrato-list', 'list', 0.01)
+            with mock.patch('core.metricas.os.getpid', return_value=pid):
+                outro.publicar()
+            outros.append(outro)
+        texto = self._metricas()
+        self.assertIn('api_processos 3', texto)
+        self.assertIn('api_requisicoes_total{rota="contrato-list",acao="list"} 2', texto)
+        # Sem publicar, a vaga e os números do processo 101 expiram.
+        caches['metricas'].delete_many([f'metricas:vaga:{outros[0]._vaga}', 'metricas:processo:101'])
+        self.assertIn('api_processos 2', self._metricas())
+
+    @override_settings(METRICAS_TOKEN='')
+    def test_fechado_sem_token_configurado(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+
+class BenchmarkTests(TestCase):
+    def test_portfolio_sintetico_preenche_as_nove_tabelas(self):
+        contagem = gerar_portfolio(imoveis=10, contratos_por_imovel=2, meses_por_contrato=3)
+        self.assertEqual(contagem['contratos'], 20)
+        self.assertEqual(Pagamento.objects.count(), 60)
+        self.assertEqual(Documento.objects.count(), 20)
+        for model in (Imovel, Locador, Locatario, Fiador, Intermediario, Contrato, Manutencao):
+            self.assertTrue(model.objects.exists(), model.__name__)
+        # Um contrato ativo, no máximo, por imóvel.
+        self.assertLessEqual(Contrato.objects.filter(status_contrato='Ativo').count(), 10)
+
+    def test_comparacao_com_linha_de_base(self):
+        base = {'200': {'pagamentos list': {'ms': 10.0, 'consultas': 3}}}
+        self.assertEqual(comparar({'200': {'pagamentos list': {'ms': 12.0, 'consultas': 3}}}, base, 0.5), [])
+        regressoes = comparar({'200': {'pagamentos list': {'ms': 40.0, 'consultas': 4}}}, base, 0.5)
+        self.assertEqual(len(regressoes), 2)
+        # Linha de base de outro banco: só as consultas contam.
+        self.assertEqual(len(comparar({'200': {'pagamentos list': {'ms': 40.0, 'consultas': 3}}}, base, 0.5, False)), 0)
+
+
+class ExtratosTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.contrato = criar_contrato()
+        Imovel.objects.filter(pk=self.contrato.imovel_id).update(condominio_valor=200, iptu_valor=50)
+        self.pagamento = Pagamento.objects.create(
+            contrato=self.contrato, data_pagamento=date(2025, 2, 5), competencia=date(2025, 2, 1),
+            valor_pago=1500, forma_pagamento='PIX', status_pagamento='Pago',
+        )
+
+    def _extrato(self, locador_id=None, mes='2025-02'):
+        locador_id = locador_id or self.contrato.locador_id
+        resposta = self.client.get(f'/api/locadores/{locador_id}/extrato/', {'mes': mes})
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()
+
+    def test_extrato_atualizado_a_cada_alteracao(self):
+        extrato = self._extrato()
+        self.assertEqual(extrato['mes'], '2025-02')
+        self.assertEqual(extrato['pagamentos'], 1)
+        self.assertEqual(extrato['taxa_administracao'], '150.00')
+        self.assertEqual(extrato['valor_repasse'], '1100.00')
+
+        Manutencao.objects.create(
+            imovel=self.contrato.imovel, data_solicitacao=date(2025, 1, 20), data_conclusao=date(2025, 2, 10),
+            descricao='x', status_manutencao='Concluído', custo_manutencao=300,
+        )
+        self.assertEqual(self._extrato()['valor_repasse'], '800.00')
+
+        self.pagamento.status_pagamento = 'Pendente'
+        self.pagamento.save()
+        extrato = self._extrato()
+        self.assertEqual(extrato['pagamentos'], 0)
+        self.assertEqual(extrato['valor_repasse'], '-300.00')
+
+    def test_troca_de_locador_move_o_extrato(self):
+        novo = Locador.objects.create(nome='Novo', email='novo@teste.com', telefone='1', cpf_cnpj='N1', endereco='R')
+        antigo = self.contrato.locador_id
+        self.contrato.locador = novo
+        self.contrato.save()
+        self.assertEqual(self._extrato(antigo)['pagamentos'], 0)
+        self.assertEqual(self._extrato(novo.pk)['aluguel_recebido'], '1500.00')
+
+    def test_lote_e_reconstrucao_completa(self):
+        resposta = self.client.post('/api/pagamentos/lote/', [{
+            'contrato_id': self.contrato.pk, 'data_pagamento': '2025-03-05', 'valor_pago': '1500.00',
+            'forma_pagamento': 'PIX', 'status_pagamento': 'Pago',
+        }], format='json')
+        self.assertEqual(resposta.status_code, 201)
+        self.assertEqual(self._extrato(mes='2025-03')['valor_repasse'], '1100.00')
+
+        incremental = list(ExtratoMensal.objects.order_by('mes').values('mes', 'valor_repasse', 'pagamentos'))
+        self.assertEqual(reconstruir_extratos(), 2)
+        self.assertEqual(list(ExtratoMensal.objects.order_by('mes').values('mes', 'valor_repasse', 'pagamentos')), incremental)
+
+    def test_contrato_novo_nao_procura_pagamentos(self):
+        # Nenhum pagamento aponta ainda para um contrato recém-criado.
+        with mock.patch('core.extratos._pagamentos_recebidos') as extratos, \
+                mock.patch('core.rentabilidade._pagamentos_recebidos') as rentabilidade:
+            criar_contrato('2')
+        extratos.assert_not_called()
+        rentabilidade.assert_not_called()
+
+    def test_manutencao_muda_de_locador_com_o_contrato(self):
+        # O contrato de A termina em fevereiro; a manutenção de março é dele
+        # até existir um contrato mais recente iniciado antes dela.
+        Contrato.objects.filter(pk=self.contrato.pk).update(data_fim=date(2025, 2, 28))
+        Manutencao.objects.create(
+            imovel=self.contrato.imovel, data_solicitacao=date(2025, 3, 1), data_conclusao=date(2025, 3, 10),
+            descricao='x', status_manutencao='Concluído', custo_manutencao=500,
+        )
+        locador_b = Locador.objects.create(nome='B', email='b@teste.com', telefone='1', cpf_cnpj='B1', endereco='R')
+
+        def custos():
+            return (self._extrato(mes='2025-03')['manutencoes'], self._extrato(locador_b.pk, mes='2025-03')['manutencoes'])
+
+        self.assertEqual(custos(), ('500.00', '0.00'))
+        novo = Contrato.objects.create(
+            imovel=self.contrato.imovel, locador=locador_b, locatario=self.contrato.locatario,
+            data_inicio=date(2025, 3, 1), data_fim=date(2025, 12, 31), valor_aluguel=1500,
+            data_assinatura=date(2025, 2, 20), data_vencimento_pagamento=5, multa_rescisoria=3000,
+        )
+        self.assertEqual(custos(), ('0.00', '500.00'))
+
+        novo.data_inicio = date(2025, 3, 15)
+        novo.save()
+        self.assertEqual(custos(), ('500.00', '0.00'))
+        novo.data_inicio = date(2025, 3, 1)
+        novo.save()
+        self.assertEqual(custos(), ('0.00', '500.00'))
+
+        novo.delete()
+        self.assertEqual(custos(), ('500.00', '0.00'))
+        incremental = list(ExtratoMensal.objects.order_by('locador', 'mes').values('locador', 'mes', 'manutencoes'))
+        reconstruir_extratos()
+        self.assertEqual(
+            list(ExtratoMensal.objects.order_by('locador', 'mes').values('locador', 'mes', 'manutencoes')), incremental
+        )
+
+    def test_extratos_do_mes_em_uma_consulta(self):
+        with self.assertNumQueries(1):
+            resposta = self.client.get('/api/locadores/extratos/', {'mes': '2025-02'})
+        self.assertEqual([extrato['locador'] for extrato in resposta.json()], [self.contrato.locador_id])
+        self.assertEqual(self.client.get('/api/locadores/extratos/', {'mes': 'x'}).status_code, 400)
+
+
+class RentabilidadeTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.contrato = criar_contrato()
+        Imovel.objects.filter(pk=self.contrato.imovel_id).update(
+            valor_aquisicao=300000, iptu_valor=50, condominio_valor=200, data_aquisicao=date(2020, 1, 1)
+        )
+        self.pagamentos = [
+            Pagamento.objects.create(
+                contrato=self.contrato, data_pagamento=date(2025, mes, 5), competencia=date(2025, mes, 1),
+                valor_pago=1500, forma_pagamento='PIX', status_pagamento='Pago',
+            )
+            for mes in (1, 2, 3)
+        ]
+        Manutencao.objects.create(
+            imovel=self.contrato.imovel, data_solicitacao=date(2025, 2, 1), data_conclusao=date(2025, 2, 10),
+            descricao='x', status_manutencao='Concluído', custo_manutencao=300,
+        )
+
+    def _imovel(self):
+        with self.assertNumQueries(2):
+            resposta = self.client.get('/api/rentabilidade/', {'meses': 3, 'ate': '2025-03'})
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()['imoveis'][0]
+
+    def test_indicadores_do_periodo(self):
+        imovel = self._imovel()
+        self.assertEqual(imovel['dias_no_periodo'], 90)
+        self.assertEqual(imovel['receita'], '4500.00')
+        self.assertEqual(imovel['custos_fixos'], '739.73')
+        self.assertEqual(imovel['resultado_liquido'], '3460.27')
+        self.assertEqual(imovel['dias_vagos'], 0)
+        self.assertEqual(imovel['indice_manutencao'], 6.67)
+        self.assertEqual(imovel['rendimento_bruto'], 6.08)
+        tipos = self.client.get('/api/rentabilidade/', {'meses': 3, 'ate': '2025-03'}).json()['por_tipo']
+        self.assertEqual([(tipo['tipo_imovel'], tipo['imoveis'], tipo['receita']) for tipo in tipos], [('Casa', 1, '4500.00')])
+
+    def test_resumo_incremental_igual_a_reconstrucao(self):
+        self.pagamentos[2].delete()
+        self.contrato.data_fim = date(2025, 2, 14)
+        self.contrato.save()
+        imovel = self._imovel()
+        self.assertEqual(imovel['receita'], '3000.00')
+        self.assertEqual(imovel['dias_vagos'], 90 - 31 - 14)
+
+        campos = ('imovel_id', 'mes', 'receita', 'manutencoes', 'dias_ocupados')
+        incremental = list(ResumoMensalImovel.objects.order_by('mes').values_list(*campos))
+        self.assertEqual(self.client.post('/api/rentabilidade/').json()['linhas'], len(incremental))
+        self.assertEqual(list(ResumoMensalImovel.objects.order_by('mes').values_list(*campos)), incremental)
+
+
+class OcupacaoTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.contrato = criar_contrato()
+        self.imovel = self.contrato.imovel
+
+    def _novo_contrato(self, inicio, fim, **extra):
+        dados = {
+            'imovel_id': self.imovel.pk, 'locador_id': self.contrato.locador_id,
+            'locatario_id': self.contrato.locatario_id, 'data_inicio': inicio, 'data_fim': fim,
+            'valor_aluguel': '1500.00', 'data_assinatura': '2024-12-01', 'data_vencimento_pagamento': 5,
+            'multa_rescisoria': '3000.00',
+        }
+        dados.update(extra)
+        return self.client.post('/api/contratos/', dados, format='json')
+
+    def test_banco_recusa_contratos_ativos_sobrepostos(self):
+        self.assertEqual(self._novo_contrato('2025-12-01', '2026-06-30').status_code, 409)
+        self.assertEqual(self._novo_contrato('2025-06-01', '2025-05-01').status_code, 400)
+        self.assertEqual(self._novo_contrato('2026-01-01', '2026-12-31').status_code, 201)
+        # Só os ativos: um contrato encerrado pode coincidir com o vigente.
+        resposta = self._novo_contrato('2025-03-01', '2025-04-30', status_contrato='Encerrado')
+        self.assertEqual(resposta.status_code, 201)
+        encerrado = Contrato.objects.get(pk=resposta.json()['id'])
+        self.assertEqual(
+            self.client.patch(f'/api/contratos/{encerrado.pk}/', {'status_contrato': 'Ativo'}, format='json').status_code,
+            409,
+        )
+        # Também fora da API (gravações em massa incluídas).
+        encerrado.status_contrato = 'Ativo'
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Contrato.objects.bulk_update([encerrado], ['status_contrato'])
+        self.assertEqual(Contrato.objects.filter(status_contrato='Ativo').count(), 2)
+
+    def test_restricao_existe_depois_de_todas_as_migracoes(self):
+        # No SQLite, uma migração que recrie core_contrato apaga os gatilhos
+        # sem aviso (core/migrations/0013); este teste acusa o sumiço.
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'core_contrato'")
+                esperados = {'contrato_sem_sobreposicao_insert', 'contrato_sem_sobreposicao_update'}
+            else:
+                cursor.execute("SELECT conname FROM pg_constraint WHERE conrelid = 'core_contrato'::regclass")
+                esperados = {'contrato_sem_sobreposicao'}
+            nomes = {linha[0] for linha in cursor.fetchall()}
+        self.assertLessEqual(esperados, nomes)
+
+    def test_linha_do_tempo_do_imovel(self):
+        with self.assertNumQueries(2):
+            resposta = self.client.get('/api/ocupacao/', {'imovel': self.imovel.pk, 'de': '2024-11', 'ate': '2026-02'})
+        dados = resposta.json()
+        self.assertEqual(
+            [(periodo['situacao'], periodo['inicio'], periodo['fim']) for periodo in dados['periodos']],
+            [('Vago', '2024-11-01', '2024-12-31'), ('Ocupado', '2025-01-01', '2025-12-31'),
+             ('Vago', '2026-01-01', '2026-02-28')],
+        )
+        self.assertEqual(dados['periodos'][1]['contratos'][0]['id'], self.contrato.pk)
+        self.assertEqual((dados['dias'], dados['dias_ocupados']), (485, 365))
+
+    def test_serie_mensal_da_carteira(self):
+        Imovel.objects.create(tipo_imovel='Casa', endereco='Rua Vaga', area_util=40, valor_aluguel=900)
+        Imovel.objects.create(
+            tipo_imovel='Casa', endereco='Rua Futura', area_util=40, valor_aluguel=900, data_aquisicao=date(2026, 1, 1)
+        )
+        with self.assertNumQueries(2):
+            resposta = self.client.get('/api/ocupacao/', {'de': '2025-12', 'ate': '2026-01'})
+        meses = resposta.json()['meses']
+        self.assertEqual(
+            [(mes['mes'], mes['imoveis'], mes['ocupados'], mes['vagos'], mes['taxa_ocupacao']) for mes in meses],
+            [('2025-12', 2, 1, 1, 50.0), ('2026-01', 3, 0, 3, 0.0)],
+        )
+        self.assertEqual(self.client.get('/api/ocupacao/', {'de': '2026-01', 'ate': '2025-01'}).status_code, 400)
+
+
+class ArquivosTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.raiz = tempfile.TemporaryDirectory()
+        self.addCleanup(self.raiz.cleanup)
+        configuracao = override_settings(ARQUIVOS_RAIZ=self.raiz.name, ARQUIVOS_ENVIO_SERVIDOR='')
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.conteudo = bytes(range(256)) * 1000
+
+    def _parte(self, chave, inicio, fim):
+        return self.client.generic(
+            'PUT', f'/api/arquivos/envios/{chave}/', self.conteudo[inicio:fim + 1],
+            content_type='application/octet-stream', HTTP_CONTENT_RANGE=f'bytes {inicio}-{fim}/{len(self.conteudo)}',
+        )
+
+    def _enviar(self, nome='contrato.pdf'):
+        envio = self.client.post('/api/arquivos/envios/', {'nome': nome, 'tamanho': len(self.conteudo)}, format='json')
+        self.assertEqual(envio.status_code, 201)
+        chave = envio.json()['chave']
+        self.assertEqual(self._parte(chave, 0, 99_999).status_code, 200)
+        return chave
+
+    def _baixar(self, url, **cabecalhos):
+        resposta = self.client.get(url, **cabecalhos)
+        corpo = b''.join(resposta.streaming_content) if resposta.streaming else resposta.content
+        resposta.close()
+        return resposta, corpo
+
+    def test_envio_em_partes_retomado_e_deduplicado(self):
+        chave = self._enviar()
+        # Parte fora de ordem: 409 com o ponto de retomada.
+        resposta = self._parte(chave, 200_000, len(self.conteudo) - 1)
+        self.assertEqual((resposta.status_code, resposta.json()['recebido']), (409, 100_000))
+        self.assertEqual(self.client.get(f'/api/arquivos/envios/{chave}/').json()['recebido'], 100_000)
+        resposta = self._parte(chave, 100_000, len(self.conteudo) - 1)
+        self.assertEqual(resposta.status_code, 201)
+        arquivo = resposta.json()['arquivo']
+        self.assertEqual(arquivo['sha256'], hashlib.sha256(self.conteudo).hexdigest())
+        self.assertEqual(arquivo['tipo_conteudo'], 'application/pdf')
+
+        # O mesmo conteúdo de novo: o mesmo Arquivo, um só no disco.
+        outra = self._enviar('copia.pdf')
+        self.assertEqual(self._parte(outra, 100_000, len(self.conteudo) - 1).json()['arquivo']['id'], arquivo['id'])
+        self.assertEqual(len([p for p in Path(self.raiz.name).rglob('*') if p.is_file()]), 1)
+
+        contrato = criar_contrato()
+        for sufixo in ('a', 'b'):
+            resposta = self.client.post('/api/documentos/', {
+                'contrato_id': contrato.pk, 'tipo_documento': 'Contrato', 'descricao_documento': sufixo,
+                'data_documento': '2025-01-01', 'arquivo': arquivo['id'],
+            }, format='json')
+            self.assertEqual(resposta.status_code, 201)
+        _, corpo = self._baixar(f"/api/documentos/{resposta.json()['id']}/arquivo/")
+        self.assertEqual(corpo, self.conteudo)
+
+    def test_download_com_range_e_etag(self):
+        chave = self._enviar()
+        arquivo = self._parte(chave, 100_000, len(self.conteudo) - 1).json()['arquivo']
+        url = arquivo['url']
+
+        resposta, corpo = self._baixar(url, HTTP_ACCEPT='application/pdf')
+        self.assertEqual((resposta.status_code, corpo), (200, self.conteudo))
+        self.assertEqual(resposta['Accept-Ranges'], 'bytes')
+
+        resposta, corpo = self._baixar(url, HTTP_RANGE='bytes=1000-1999')
+        self.assertEqual((resposta.status_code, corpo), (206, self.conteudo[1000:2000]))
+        self.assertEqual(resposta['Content-Range'], f'bytes 1000-1999/{len(self.conteudo)}')
+        _, corpo = self._baixar(url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(corpo, self.conteudo[-10:])
+        self.assertEqual(self._baixar(url, HTTP_RANGE=f'bytes={len(self.conteudo)}-')[0].status_code, 416)
+        # If-Range de outra versão: o arquivo inteiro.
+        self.assertEqual(self._baixar(url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"outro"')[0].status_code, 200)
+        self.assertEqual(self._baixar(url, HTTP_IF_NONE_MATCH=f'"{arquivo["sha256"]}"')[0].status_code, 304)
+
+        with override_settings(ARQUIVOS_ENVIO_SERVIDOR='x-accel-redirect'):
+            resposta, corpo = self._baixar(url)
+        self.assertEqual(corpo, b'')
+        self.assertTrue(resposta['X-Accel-Redirect'].endswith(arquivo['sha256']))
+
+
+    def test_tipos_ativos_baixados_como_anexo_em_sandbox(self):
+        envio = self.client.post('/api/arquivos/envios/', {
+            'nome': 'pagina.html', 'tamanho': 25, 'tipo_conteudo': 'text/html',
+        }, format='json').json()
+        resposta = self.client.generic(
+            'PUT', f"/api/arquivos/envios/{envio['chave']}/", b'<script>alert(1)</script>',
+            content_type='application/octet-stream',
+        )
+        resposta, corpo = self._baixar(resposta.json()['arquivo']['url'])
+        self.assertEqual(corpo, b'<script>alert(1)</script>')
+        self.assertEqual(resposta['Content-Type'], 'application/octet-stream')
+        self.assertTrue(resposta['Content-Disposition'].startswith('attachment'))
+        self.assertEqual(resposta['Content-Security-Policy'], 'sandbox')
+
+        # PDF continua sendo exibido no navegador, também em sandbox.
+        chave = self._enviar()
+        resposta, _ = self._baixar(self._parte(chave, 100_000, len(self.conteudo) - 1).json()['arquivo']['url'])
+        self.assertEqual((resposta['Content-Type'], resposta['Content-Security-Policy']), ('application/pdf', 'sandbox'))
+        self.assertTrue(resposta['Content-Disposition'].startswith('inline'))
+
+
+class FotosTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.raiz = tempfile.TemporaryDirectory()
+        self.addCleanup(self.raiz.cleanup)
+        # Sem pool: a fila é processada pelo próprio teste.
+        configuracao = override_settings(ARQUIVOS_RAIZ=self.raiz.name, ARQUIVOS_ENVIO_SERVIDOR='', FOTOS_WORKERS=0)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.imovel = criar_contrato().imovel
+
+    def _jpeg(self, cor, tamanho=(2000, 1000)):
+        saida = io.BytesIO()
+        Image.new('RGB', tamanho, cor).save(saida, 'JPEG')
+        return saida.getvalue()
+
+    def _enviar(self, conteudo, nome='sala.jpg', tipo='image/jpeg', imovel=None, **dados):
+        return self.client.post(f'/api/imoveis/{(imovel or self.imovel).pk}/fotos/', {
+            'arquivo': SimpleUploadedFile(nome, conteudo, tipo), **dados,
+        }, format='multipart')
+
+    def _imagem(self, url):
+        resposta = self.client.get(url)
+        corpo = b''.join(resposta.streaming_content)
+        resposta.close()
+        return resposta, Image.open(io.BytesIO(corpo))
+
+    def test_variantes_geradas_fora_da_requisicao(self):
+        resposta = self._enviar(self._jpeg('red'), legenda='Sala')
+        self.assertEqual(resposta.status_code, 202)
+        self.assertEqual((resposta.json()['status'], resposta.json()['miniatura']), ('Pendente', None))
+        self.assertEqual(self._enviar(b'texto', nome='notas.txt', tipo='text/plain').status_code, 400)
+
+        self.assertEqual(processar_pendentes(), {'Pronta': 1})
+        foto = self.client.get(f'/api/imoveis/{self.imovel.pk}/fotos/').json()[0]
+        self.assertEqual((foto['status'], foto['largura'], foto['altura']), ('Pronta', 2000, 1000))
+
+        resposta, imagem = self._imagem(foto['miniatura'])
+        self.assertEqual((resposta['Content-Type'], imagem.format, imagem.size), ('image/webp', 'WEBP', (320, 240)))
+        self.assertIn('immutable', resposta['Cache-Control'])
+        self.assertEqual(self._imagem(foto['web'])[1].size, (1600, 800))
+        self.assertEqual(self.client.get(foto['web'].replace('-v1', '-v0')).status_code, 404)
+
+        # A lista de imóveis só traz a URL da miniatura.
+        item = self.client.get('/api/imoveis/').json()['results'][0]
+        self.assertEqual(item['miniatura'], foto['miniatura'])
+
+    def test_falha_volta_ao_pool_com_espera_crescente(self):
+        with override_settings(FOTOS_WORKERS=1, FOTOS_ESPERA_NOVA_TENTATIVA_SEGUNDOS=5), \
+                mock.patch('core.fotos.connections'), mock.patch('core.fotos._executor') as executor, \
+                mock.patch('core.fotos.threading.Timer') as temporizador:
+            executor.return_value.submit.side_effect = lambda funcao, pk: funcao(pk)
+            with self.captureOnCommitCallbacks(execute=True):
+                foto = self._enviar(b'quebrado', nome='quebrado.jpg').json()
+            for espera in (5, 10):
+                self.assertEqual(temporizador.call_args.args[0], espera)
+                with self.captureOnCommitCallbacks(execute=True):
+                    temporizador.call_args.args[1]()
+        # Terceira tentativa (FOTOS_TENTATIVAS_MAXIMAS): erro, sem novo agendamento.
+        self.assertEqual(temporizador.call_count, 2)
+        self.assertEqual(FotoImovel.objects.get(pk=foto['id']).status, 'Erro')
+
+    def test_erro_inesperado_nao_deixa_a_foto_processando(self):
+        foto = self._enviar(self._jpeg('red')).json()
+        with mock.patch('core.fotos.gerar_variantes', side_effect=RuntimeError('falhou')), \
+                self.assertLogs('core.fotos', 'ERROR'):
+            self.assertEqual(processar_pendentes(), {'Pendente': 1})
+        self.assertIn('RuntimeError', FotoImovel.objects.get(pk=foto['id']).erro)
+
+    def test_svg_nao_e_aceito_como_foto(self):
+        svg = b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>'
+        self.assertEqual(self._enviar(svg, nome='planta.svg', tipo='image/svg+xml').status_code, 400)
+
+    def test_capa_segue_ordem_e_reaproveita_derivados(self):
+        vermelha = self._enviar(self._jpeg('red')).json()
+        azul = self._enviar(self._jpeg('blue')).json()
+        outro = criar_contrato('2', data_inicio=date(2026, 1, 1), data_fim=date(2026, 12, 31)).imovel
+        self._enviar(self._jpeg('red'), imovel=outro)
+        # Um "JPEG" que não é imagem termina em erro, sem travar a fila.
+        with override_settings(FOTOS_TENTATIVAS_MAXIMAS=1):
+            self._enviar(b'quebrado', nome='quebrado.jpg')
+            self.assertEqual(processar_pendentes(workers=1), {'Pronta': 3, 'Erro': 1})
+        # O mesmo original em dois imóveis: as variantes existem uma vez só.
+        self.assertEqual(len(list(Path(self.raiz.name, 'derivados').rglob('miniatura-*'))), 2)
+
+        def capa():
+            return self.client.get(f'/api/imoveis/{self.imovel.pk}/').json()['miniatura']
+
+        fotos = {foto['id']: foto for foto in self.client.get(f'/api/imoveis/{self.imovel.pk}/fotos/').json()}
+        self.assertEqual(capa(), fotos[vermelha['id']]['miniatura'])
+        resposta = self.client.patch(f"/api/fotos/{azul['id']}/", {'ordem': 0}, format='json')
+        self.assertEqual(resposta.status_code, 200)
+        self.client.patch(f"/api/fotos/{vermelha['id']}/", {'ordem': 1}, format='json')
+        self.assertEqual(capa(), fotos[azul['id']]['miniatura'])
+        self.assertEqual(self.client.delete(f"/api/fotos/{azul['id']}/").status_code, 204)
+        self.assertEqual(capa(), fotos[vermelha['id']]['miniatura'])
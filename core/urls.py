@@ -1,5 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import assincrono
 from .views import (
     ImovelViewSet,
     LocadorViewSet,
@@ -9,7 +10,20 @@ from .views import (
     ContratoViewSet,
     PagamentoViewSet,
     ManutencaoViewSet,
-    DocumentoViewSet
+    DocumentoViewSet,
+    DashboardView,
+    VencimentosView,
+    BuscaView,
+    CacheRespostasView,
+    MetricasView,
+    RentabilidadeView,
+    OcupacaoView,
+    EnvioArquivoView,
+    EnvioArquivoDetalheView,
+    ArquivoView,
+    ArquivoConteudoView,
+    FotoImovelView,
+    ImagemView,
 )
 
 # O Router do DRF cria automaticamente todas as URLs para um ViewSet.
@@ -24,7 +38,31 @@ router.register(r'documentos', DocumentoViewSet)
 router.register(r'fiadores', FiadorViewSet)
 router.register(r'intermediarios', IntermediarioViewSet)
 
+# Leituras assíncronas (ASGI) de cada endpoint do router, em /api/assincrono/.
+rotas_assincronas = [path('assincrono/dashboard/', assincrono.dashboard, name='dashboard-assincrono')]
+for prefixo, viewset, basename in router.registry:
+    rotas_assincronas += [
+        path(f'assincrono/{prefixo}/', assincrono.listar, {'viewset': viewset},
+             name=f'{basename}-list-assincrono'),
+        path(f'assincrono/{prefixo}/<int:pk>/', assincrono.detalhar, {'viewset': viewset},
+             name=f'{basename}-detail-assincrono'),
+    ]
+
 # As URLs da API são determinadas automaticamente pelo router.
 urlpatterns = [
+    *rotas_assincronas,
+    path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('vencimentos/', VencimentosView.as_view(), name='vencimentos'),
+    path('busca/', BuscaView.as_view(), name='busca'),
+    path('cache/', CacheRespostasView.as_view(), name='cache-respostas'),
+    path('metrics/', MetricasView.as_view(), name='metricas'),
+    path('rentabilidade/', RentabilidadeView.as_view(), name='rentabilidade'),
+    path('ocupacao/', OcupacaoView.as_view(), name='ocupacao'),
+    path('arquivos/envios/', EnvioArquivoView.as_view(), name='arquivo-envios'),
+    path('arquivos/envios/<uuid:chave>/', EnvioArquivoDetalheView.as_view(), name='arquivo-envio'),
+    path('arquivos/<int:pk>/', ArquivoView.as_view(), name='arquivo'),
+    path('arquivos/<int:pk>/conteudo/', ArquivoConteudoView.as_view(), name='arquivo-conteudo'),
+    path('fotos/<int:pk>/', FotoImovelView.as_view(), name='foto-imovel'),
+    path('imagens/<str:sha256>/<str:nome>', ImagemView.as_view(), name='imagem'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
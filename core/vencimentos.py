@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.db.models import BigIntegerField, CharField, F, Value
+from django.utils import timezone
+
+from .models import Imovel, Contrato
+
+# -----------------------------------------------------------------------------
+# Explicação:
+# Agenda de vencimentos. Junta, numa única lista ordenada por data, tudo o que
+# vence nos próximos N dias: seguro, AVCB, extintores, dedetização, caixa
+# d'água (colunas do Imovel) e o fim dos contratos ativos.
+#
+# Cada coluna é consultada separadamente pelo seu próprio índice
+# (WHERE coluna BETWEEN hoje AND hoje + N) e os resultados são unidos no banco
+# com UNION ALL. O custo depende de quantos itens vencem, não do tamanho da
+# carteira.
+# -----------------------------------------------------------------------------
+
+VENCIMENTOS_IMOVEL = [
+    ('seguro_vencimento', 'Seguro'),
+    ('avcb_vencimento', 'AVCB'),
+    ('vencimento_extintores', 'Extintores'),
+    ('vencimento_dedetizacao', 'Dedetização'),
+    ('vencimento_caixa_dagua', "Caixa d'Água"),
+]
+
+DIAS_PADRAO = 30
+DIAS_MAXIMO = 365
+LIMITE_PADRAO = 200
+LIMITE_MAXIMO = 1000
+
+
+def _intervalo(campo, inicio, fim):
+    filtro = {f'{campo}__lte': fim}
+    if inicio is not None:
+        filtro[f'{campo}__gte'] = inicio
+    return filtro
+
+
+def proximos_vencimentos(dias=DIAS_PADRAO, incluir_vencidos=False, limite=LIMITE_PADRAO, hoje=None):
+    """
+    Devolve os vencimentos até 'hoje + dias', do mais próximo ao mais distante.
+    Com incluir_vencidos=True, também traz o que já venceu e não foi renovado.
+    """
+    hoje = hoje or timezone.localdate()
+    inicio = None if incluir_vencidos else hoje
+    fim = hoje + timedelta(days=dias)
+    texto = CharField()
+
+    colunas = ('tipo', 'data', 'imovel_ref', 'endereco_ref', 'contrato_ref')
+    consultas = [
+        Imovel.objects.filter(**_intervalo(campo, inicio, fim)).order_by().annotate(
+            tipo=Value(tipo, output_field=texto),
+            data=F(campo),
+            imovel_ref=F('id'),
+            endereco_ref=F('endereco'),
+            contrato_ref=Value(None, output_field=BigIntegerField()),
+        ).values_list(*colunas)
+        for campo, tipo in VENCIMENTOS_IMOVEL
+    ]
+    consultas.append(
+        Contrato.objects.filter(status_contrato='Ativo', **_intervalo('data_fim', inicio, fim)).order_by().annotate(
+            tipo=Value('Fim do Contrato', output_field=texto),
+            data=F('data_fim'),
+            imovel_ref=F('imovel_id'),
+            endereco_ref=F('imovel__endereco'),
+            contrato_ref=F('id'),
+        ).values_list(*colunas)
+    )
+    uniao = consultas[0].union(*consultas[1:], all=True).order_by('data', 'tipo')[:limite]
+
+    return [
+        {
+            'tipo': tipo,
+            'data': data.isoformat(),
+            'dias_restantes': (data - hoje).days,
+            'imovel_id': imovel_id,
+            'imovel': endereco,
+            'contrato_id': contrato_id,
+        }
+        for tipo, data, imovel_id, endereco, contrato_id in uniao
+    ]
@@ -1,8 +1,17 @@
+import hmac
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django.views.generic import TemplateView
 from rest_framework import viewsets
-from rest_framework import viewsets
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django.db.models import ProtectedError
 
 from .models import (
@@ -14,7 +23,11 @@ from .models import (
     Contrato,
     Pagamento,
     Manutencao,
-    Documento
+    Documento,
+    ExtratoMensal,
+    Arquivo,
+    EnvioArquivo,
+    FotoImovel,
 )
 from .serializers import (
     ImovelSerializer,
@@ -25,8 +38,36 @@ from .serializers import (
     ContratoSerializer,
     PagamentoSerializer,
     ManutencaoSerializer,
-    DocumentoSerializer
+    DocumentoSerializer,
+    ExtratoMensalSerializer,
+)
+from .arquivos import (
+    ConflitoEnvio, SemNegociacao, cancelar_envio, dados_do_arquivo, dados_do_envio, guardar_upload, iniciar_envio,
+    interpretar_content_range, receber_parte, resposta_download,
 )
+from .cache_respostas import estatisticas as estatisticas_cache
+from .busca import LIMITE_MAXIMO_BUSCA, LIMITE_PADRAO_BUSCA, TIPOS, buscar
+from .cobrancas import gerar_pagamentos_do_mes, interpretar_mes
+from .condicional import RequisicaoCondicionalMixin
+from .consultas import ConsultaOtimizadaMixin
+from .leitura_rapida import ListaRapidaMixin
+from .lote import LoteMixin
+from .metricas import texto_prometheus
+from .ocupacao import MESES_MAXIMO_OCUPACAO, eh_sobreposicao, linha_do_tempo, ocupacao_da_carteira, periodo_padrao
+from .opcoes import OpcoesMixin
+from .rentabilidade import (
+    LIMITE_MAXIMO_RENTABILIDADE, LIMITE_PADRAO_RENTABILIDADE, MESES_MAXIMO, MESES_PADRAO,
+    calcular_rentabilidade, reconstruir_rentabilidade,
+)
+from .dashboard import obter_estatisticas
+from .exportacao import ExportacaoMixin
+from .calculos import ultimo_dia
+from .extratos import extrato_do_mes
+from .fotos import (
+    adicionar_foto, atualizar_foto, dados_da_foto, eh_imagem, excluir_foto, interpretar_ordem, resposta_variante,
+)
+from .importacao import ImportacaoMixin
+from .vencimentos import DIAS_MAXIMO, DIAS_PADRAO, LIMITE_MAXIMO, LIMITE_PADRAO, proximos_vencimentos
 
 # -----------------------------------------------------------------------------
 # Explicação:
@@ -34,18 +75,48 @@ from .serializers import (
 # para um modelo específico. Ela define qual conjunto de dados (queryset)
 # e qual tradutor (serializer_class) usar.
 # Usamos 'ModelViewSet' porque ele fornece todas as ações CRUD por padrão.
+# O atributo 'filtros' lista os campos que podem ser filtrados pela URL
+# (veja core/filters.py), por exemplo: /api/pagamentos/?status_pagamento=Pendente
+# O atributo 'ordenacao' define a ordem das listas e a chave da paginação por
+# cursor (veja core/pagination.py); deve existir um índice com essas colunas.
 # -----------------------------------------------------------------------------
 
 class AppView(TemplateView):
     template_name = 'index.html'
 
+
+class ModelViewSetBase(RequisicaoCondicionalMixin, ListaRapidaMixin, ConsultaOtimizadaMixin, OpcoesMixin, LoteMixin,
+                       ExportacaoMixin, ImportacaoMixin, viewsets.ModelViewSet):
+    """
+    Base de todos os ViewSets do app. Monta o select_related/prefetch_related/
+    only() de cada consulta a partir dos campos do serializer (core/consultas.py),
+    responde com ETag/Last-Modified e 304 quando nada mudou (core/condicional.py),
+    monta as listas direto de values() quando possível (core/leitura_rapida.py),
+    oferece a lista compacta '<endpoint>/opcoes/' para os selects (core/opcoes.py),
+    as operações em massa em '<endpoint>/lote/' (core/lote.py), a exportação
+    CSV/XLSX em '<endpoint>/exportar/' (core/exportacao.py) e a importação de
+    arquivos em '<endpoint>/importar/' (core/importacao.py).
+    """
+
 # --- 1. VIEWSET PARA IMÓVEIS ---
-class ImovelViewSet(viewsets.ModelViewSet):
+class ImovelViewSet(ModelViewSetBase):
     """
     Endpoint da API que permite que os imóveis sejam visualizados ou editados.
     """
     queryset = Imovel.objects.all().order_by('-data_cadastro')
     serializer_class = ImovelSerializer
+    ordenacao = ('-data_cadastro', '-id')
+    busca_opcoes = ('endereco',)
+    filtros = {
+        'tipo_imovel': ['exact', 'in'],
+        'status_imovel': ['exact', 'in'],
+        'seguro_vencimento': ['gte', 'lte', 'isnull'],
+        'avcb_vencimento': ['gte', 'lte', 'isnull'],
+        'vencimento_extintores': ['gte', 'lte', 'isnull'],
+        'vencimento_dedetizacao': ['gte', 'lte', 'isnull'],
+        'vencimento_caixa_dagua': ['gte', 'lte', 'isnull'],
+    }
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         try:
@@ -60,66 +131,498 @@ class ImovelViewSet(viewsets.ModelViewSet):
             }
             return Response(error_message, status=status.HTTP_409_CONFLICT)
 
+    @action(detail=True, methods=['get', 'post'], pagination_class=None, filter_backends=[])
+    def fotos(self, request, pk=None):
+        """
+        Fotos do imóvel (core/fotos.py).
+        GET  a galeria, na ordem de exibição;
+        POST multipart com 'arquivo' (a imagem), ou {"arquivo": <id>} de um
+             upload em partes, e 'legenda'/'ordem' opcionais. Responde 202:
+             as miniaturas são geradas em segundo plano.
+        """
+        imovel = get_object_or_404(Imovel.objects.only('id'), pk=pk)
+        if request.method == 'GET':
+            fotos = FotoImovel.objects.filter(imovel=imovel).select_related('arquivo')
+            return Response([dados_da_foto(foto) for foto in fotos])
+
+        enviado = request.FILES.get('arquivo')
+        try:
+            ordem = interpretar_ordem(request.data['ordem']) if request.data.get('ordem') not in (None, '') else None
+            if enviado is not None:
+                if not eh_imagem(enviado.content_type, enviado.name):
+                    raise ValueError('O arquivo enviado não é uma imagem.')
+                arquivo = guardar_upload(enviado)
+            else:
+                arquivo_id = str(request.data.get('arquivo') or '')
+                arquivo = Arquivo.objects.filter(pk=arquivo_id).first() if arquivo_id.isdigit() else None
+                if arquivo is None or not eh_imagem(arquivo.tipo_conteudo):
+                    raise ValueError("Envie a imagem em 'arquivo' (ou o id de um arquivo de imagem já enviado).")
+        except ValueError as erro:
+            return Response({'detail': str(erro)}, status=status.HTTP_400_BAD_REQUEST)
+        foto = adicionar_foto(imovel, arquivo, request.data.get('legenda') or '', ordem)
+        return Response(dados_da_foto(foto), status=status.HTTP_202_ACCEPTED)
+
 
 # --- 2. VIEWSET PARA LOCADORES ---
-class LocadorViewSet(viewsets.ModelViewSet):
+class LocadorViewSet(ModelViewSetBase):
     """
     Endpoint da API que permite que os locadores sejam visualizados ou editados.
     """
     queryset = Locador.objects.all()
     serializer_class = LocadorSerializer
+    ordenacao = ('-id',)
+    busca_opcoes = ('nome', 'cpf_cnpj', 'email')
+    filtros = {
+        'tipo_pessoa': ['exact', 'in'],
+        'tipo_documento': ['exact', 'in'],
+        'cpf_cnpj': ['exact'],
+        'email': ['exact'],
+    }
+
+    @action(detail=True, methods=['get'], pagination_class=None, filter_backends=[])
+    def extrato(self, request, pk=None):
+        """
+        Extrato de repasse do locador no mês (?mes=AAAA-MM; padrão: mês atual),
+        lido da tabela pré-calculada (core/extratos.py).
+        """
+        try:
+            mes = interpretar_mes(request.query_params.get('mes'))
+        except ValueError as erro:
+            return Response({'mes': [str(erro)]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(ExtratoMensalSerializer(extrato_do_mes(self.get_object(), mes)).data)
+
+    @action(detail=False, methods=['get'], pagination_class=None, filter_backends=[])
+    def extratos(self, request):
+        """
+        Extratos de todos os locadores com movimento no mês (?mes=AAAA-MM),
+        em uma única consulta pelo índice (mes, locador).
+        """
+        try:
+            mes = interpretar_mes(request.query_params.get('mes'))
+        except ValueError as erro:
+            return Response({'mes': [str(erro)]}, status=status.HTTP_400_BAD_REQUEST)
+        extratos = ExtratoMensal.objects.filter(mes=mes).select_related('locador').order_by('locador_id')
+        return Response(ExtratoMensalSerializer(extratos, many=True).data)
 
 
 # --- 3. VIEWSET PARA LOCATÁRIOS ---
-class LocatarioViewSet(viewsets.ModelViewSet):
+class LocatarioViewSet(ModelViewSetBase):
     """
     Endpoint da API que permite que os locatários sejam visualizados ou editados.
     """
     queryset = Locatario.objects.all()
     serializer_class = LocatarioSerializer
+    ordenacao = ('-id',)
+    busca_opcoes = ('nome', 'cpf_cnpj', 'email')
+    filtros = {
+        'tipo_pessoa': ['exact', 'in'],
+        'tipo_documento': ['exact', 'in'],
+        'cpf_cnpj': ['exact'],
+        'email': ['exact'],
+    }
 
 
-class FiadorViewSet(viewsets.ModelViewSet):
+class FiadorViewSet(ModelViewSetBase):
     queryset = Fiador.objects.all()
     serializer_class = FiadorSerializer
+    ordenacao = ('-id',)
+    busca_opcoes = ('nome', 'cpf_cnpj', 'email')
+    filtros = {
+        'tipo_pessoa': ['exact', 'in'],
+        'tipo_documento': ['exact', 'in'],
+        'cpf_cnpj': ['exact'],
+        'email': ['exact'],
+    }
 
 
-class IntermediarioViewSet(viewsets.ModelViewSet):
+class IntermediarioViewSet(ModelViewSetBase):
     queryset = Intermediario.objects.all()
     serializer_class = IntermediarioSerializer
+    ordenacao = ('-id',)
+    busca_opcoes = ('nome', 'cpf_cnpj', 'email')
+    filtros = {
+        'tipo_pessoa': ['exact', 'in'],
+        'tipo_documento': ['exact', 'in'],
+        'cpf_cnpj': ['exact'],
+        'email': ['exact'],
+    }
 
 
 # --- 4. VIEWSET PARA CONTRATOS ---
-class ContratoViewSet(viewsets.ModelViewSet):
+class ContratoViewSet(ModelViewSetBase):
     """
     Endpoint da API que permite que os contratos sejam visualizados ou editados.
     """
     queryset = Contrato.objects.all()
     serializer_class = ContratoSerializer
+    ordenacao = ('-data_inicio', '-id')
+    busca_opcoes = ('imovel__endereco', 'locatario__nome')
+    filtros = {
+        'status_contrato': ['exact', 'in'],
+        'imovel_id': ['exact', 'in'],
+        'locador_id': ['exact', 'in'],
+        'locatario_id': ['exact', 'in'],
+        'data_inicio': ['gte', 'lte'],
+        'data_fim': ['gte', 'lte'],
+    }
+
+    # Contratos ativos sobrepostos no mesmo imóvel são recusados pelo próprio
+    # banco (core/ocupacao.py); o erro vira uma resposta 409 Conflict.
+    def create(self, request, *args, **kwargs):
+        return self._sem_sobreposicao(super().create, request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        return self._sem_sobreposicao(super().update, request, *args, **kwargs)
+
+    def _sem_sobreposicao(self, gravar, request, *args, **kwargs):
+        try:
+            with transaction.atomic():
+                return gravar(request, *args, **kwargs)
+        except IntegrityError as erro:
+            if not eh_sobreposicao(erro):
+                raise
+            return Response(
+                {"detail": "Já existe um contrato ativo deste imóvel com vigência nesse período."},
+                status=status.HTTP_409_CONFLICT,
+            )
 
 
 # --- 5. VIEWSET PARA PAGAMENTOS ---
-class PagamentoViewSet(viewsets.ModelViewSet):
+class PagamentoViewSet(ModelViewSetBase):
     """
     Endpoint da API que permite que os pagamentos sejam visualizados ou editados.
     """
     queryset = Pagamento.objects.all()
     serializer_class = PagamentoSerializer
+    ordenacao = ('-data_pagamento', '-id')
+    busca_opcoes = ('contrato__locatario__nome',)
+    filtros = {
+        'status_pagamento': ['exact', 'in'],
+        'forma_pagamento': ['exact', 'in'],
+        'contrato_id': ['exact', 'in'],
+        'data_pagamento': ['gte', 'lte'],
+        'competencia': ['exact', 'gte', 'lte'],
+    }
+
+    @action(detail=False, methods=['post'], pagination_class=None, filter_backends=[])
+    def gerar(self, request):
+        """
+        Gera as cobranças do mês informado ({"mes": "AAAA-MM"}) para todos os
+        contratos ativos. Pode ser chamado mais de uma vez sem duplicar nada.
+        """
+        try:
+            competencia = interpretar_mes(request.data.get('mes'))
+        except ValueError as erro:
+            return Response({'mes': [str(erro)]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(gerar_pagamentos_do_mes(competencia))
+
+    @action(detail=True, methods=['get'], pagination_class=None, filter_backends=[],
+            content_negotiation_class=SemNegociacao)
+    def comprovante(self, request, pk=None):
+        """Download do comprovante enviado (core/arquivos.py); aceita 'Range'."""
+        arquivo = get_object_or_404(Arquivo, pagamentos__pk=pk)
+        return resposta_download(request, arquivo, anexo='download' in request.query_params)
 
 
 # --- 6. VIEWSET PARA MANUTENÇÃO ---
-class ManutencaoViewSet(viewsets.ModelViewSet):
+class ManutencaoViewSet(ModelViewSetBase):
     """
     Endpoint da API que permite que as manutenções sejam visualizadas ou editadas.
     """
     queryset = Manutencao.objects.all()
     serializer_class = ManutencaoSerializer
+    ordenacao = ('-data_solicitacao', '-id')
+    busca_opcoes = ('imovel__endereco',)
+    filtros = {
+        'status_manutencao': ['exact', 'in'],
+        'imovel_id': ['exact', 'in'],
+        'data_solicitacao': ['gte', 'lte'],
+    }
 
 
 # --- 7. VIEWSET PARA DOCUMENTOS ---
-class DocumentoViewSet(viewsets.ModelViewSet):
+class DocumentoViewSet(ModelViewSetBase):
     """
     Endpoint da API que permite que os documentos sejam visualizados ou editados.
     """
     queryset = Documento.objects.all()
-    serializer_class = DocumentoSerializer
\ No newline at end of file
+    serializer_class = DocumentoSerializer
+    ordenacao = ('-data_documento', '-id')
+    busca_opcoes = ('tipo_documento', 'descricao_documento')
+    filtros = {
+        'tipo_documento': ['exact'],
+        'imovel_id': ['exact', 'in'],
+        'locador_id': ['exact', 'in'],
+        'locatario_id': ['exact', 'in'],
+        'contrato_id': ['exact', 'in'],
+        'data_documento': ['gte', 'lte'],
+    }
+
+    @action(detail=True, methods=['get'], pagination_class=None, filter_backends=[],
+            content_negotiation_class=SemNegociacao)
+    def arquivo(self, request, pk=None):
+        """Download do arquivo do documento (core/arquivos.py); aceita 'Range'."""
+        arquivo = get_object_or_404(Arquivo, documentos__pk=pk)
+        return resposta_download(request, arquivo, anexo='download' in request.query_params)
+
+
+# --- 8. DASHBOARD ---
+class DashboardView(APIView):
+    """
+    Endpoint da API com os indicadores do Dashboard (contagens, somas e
+    distribuição por status), calculados com consultas agregadas no banco.
+    """
+    def get(self, request, *args, **kwargs):
+        return Response(obter_estatisticas())
+
+
+# --- 9. AGENDA DE VENCIMENTOS ---
+class VencimentosView(APIView):
+    """
+    Endpoint da API com os próximos vencimentos (seguros, certificados e fim
+    de contratos ativos), ordenados por data.
+    Parâmetros: ?dias=30, ?vencidos=true (inclui os já vencidos), ?limite=200.
+    """
+    def get(self, request, *args, **kwargs):
+        try:
+            dias = int(request.query_params.get('dias', DIAS_PADRAO))
+            limite = int(request.query_params.get('limite', LIMITE_PADRAO))
+        except ValueError:
+            return Response({'detail': "'dias' e 'limite' precisam ser números inteiros."}, status=status.HTTP_400_BAD_REQUEST)
+        incluir_vencidos = request.query_params.get('vencidos', '').lower() in ('true', '1', 'sim')
+        return Response(proximos_vencimentos(
+            dias=min(max(dias, 0), DIAS_MAXIMO),
+            incluir_vencidos=incluir_vencidos,
+            limite=min(max(limite, 1), LIMITE_MAXIMO),
+        ))
+
+
+# --- 10. BUSCA ---
+class BuscaView(APIView):
+    """
+    Endpoint da API com a busca textual em imóveis, pessoas e contratos,
+    ordenada por relevância (core/busca.py).
+    Parâmetros: ?q=texto, ?limite=20, ?tipos=imoveis,locadores (opcional).
+    """
+    def get(self, request, *args, **kwargs):
+        texto = request.query_params.get('q', '')
+        try:
+            limite = int(request.query_params.get('limite', LIMITE_PADRAO_BUSCA))
+        except ValueError:
+            return Response({'detail': "'limite' precisa ser um número inteiro."}, status=status.HTTP_400_BAD_REQUEST)
+        tipos = [tipo for tipo in request.query_params.get('tipos', '').split(',') if tipo]
+        invalidos = set(tipos) - set(TIPOS)
+        if invalidos:
+            return Response({'detail': f"Tipos inválidos: {', '.join(sorted(invalidos))}."}, status=status.HTTP_400_BAD_REQUEST)
+        resultados = buscar(texto, limite=min(max(limite, 1), LIMITE_MAXIMO_BUSCA), tipos=tipos)
+        return Response({'q': texto, 'total': len(resultados), 'resultados': resultados})
+
+
+# --- 11. CACHE DE RESPOSTAS ---
+class CacheRespostasView(APIView):
+    """
+    Endpoint da API com os acertos e faltas do cache de respostas, por modelo
+    (core/cache_respostas.py).
+    """
+    def get(self, request, *args, **kwargs):
+        return Response(estatisticas_cache())
+
+
+# --- 12. MÉTRICAS ---
+class MetricasView(APIView):
+    """
+    Endpoint com as métricas por rota no formato texto do Prometheus
+    (core/metricas.py). Exige 'Authorization: Bearer <METRICAS_TOKEN>'; sem
+    token configurado o endpoint fica fechado, pois a saída inclui trechos
+    de SQL.
+    """
+    def perform_content_negotiation(self, request, force=False):
+        # O corpo é sempre texto; não recusa (406) um 'Accept: text/plain'.
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, *args, **kwargs):
+        token = settings.METRICAS_TOKEN
+        if not token or not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return Response({'detail': 'Token de métricas inválido.'}, status=status.HTTP_403_FORBIDDEN)
+        return HttpResponse(texto_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# --- 13. RENTABILIDADE ---
+class RentabilidadeView(APIView):
+    """
+    Endpoint da API com a rentabilidade por imóvel e por tipo de imóvel, lida
+    das tabelas de resumo (core/rentabilidade.py).
+    GET  ?meses=12, ?ate=AAAA-MM (último mês do período), ?tipo_imovel=Casa, ?limite=200.
+    POST recalcula a tabela de resumo do zero.
+    """
+    def get(self, request, *args, **kwargs):
+        try:
+            meses = int(request.query_params.get('meses', MESES_PADRAO))
+            limite = int(request.query_params.get('limite', LIMITE_PADRAO_RENTABILIDADE))
+        except ValueError:
+            return Response({'detail': "'meses' e 'limite' precisam ser números inteiros."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ate = interpretar_mes(request.query_params['ate']) if request.query_params.get('ate') else None
+        except ValueError as erro:
+            return Response({'ate': [str(erro)]}, status=status.HTTP_400_BAD_REQUEST)
+        tipo_imovel = request.query_params.get('tipo_imovel') or None
+        if tipo_imovel and tipo_imovel not in dict(Imovel.TIPO_IMOVEL_CHOICES):
+            return Response({'tipo_imovel': [f"Tipo inválido: {tipo_imovel}."]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(calcular_rentabilidade(
+            meses=min(max(meses, 1), MESES_MAXIMO),
+            ate=ate,
+            tipo_imovel=tipo_imovel,
+            limite=min(max(limite, 1), LIMITE_MAXIMO_RENTABILIDADE),
+        ))
+
+    def post(self, request, *args, **kwargs):
+        inicio = time.perf_counter()
+        linhas = reconstruir_rentabilidade()
+        return Response({'linhas': linhas, 'segundos': round(time.perf_counter() - inicio, 3)})
+
+
+# --- 14. OCUPAÇÃO ---
+class OcupacaoView(APIView):
+    """
+    Endpoint da API com a linha do tempo de ocupação e vacância (core/ocupacao.py).
+    Parâmetros: ?de=AAAA-MM e ?ate=AAAA-MM (padrão: 11 meses atrás até 12 à
+    frente), ?imovel=<id> (períodos do imóvel) ou ?tipo_imovel=Casa (série
+    mensal da carteira).
+    """
+    def get(self, request, *args, **kwargs):
+        inicio, fim = periodo_padrao(timezone.localdate())
+        try:
+            if request.query_params.get('de'):
+                inicio = interpretar_mes(request.query_params['de'])
+            if request.query_params.get('ate'):
+                fim = ultimo_dia(interpretar_mes(request.query_params['ate']))
+        except ValueError as erro:
+            return Response({'detail': str(erro)}, status=status.HTTP_400_BAD_REQUEST)
+        meses = (fim.year - inicio.year) * 12 + fim.month - inicio.month + 1
+        if meses < 1 or meses > MESES_MAXIMO_OCUPACAO:
+            return Response(
+                {'detail': f"'ate' deve vir depois de 'de', com no máximo {MESES_MAXIMO_OCUPACAO} meses."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if request.query_params.get('imovel'):
+            try:
+                pk = int(request.query_params['imovel'])
+            except ValueError:
+                return Response({'imovel': ["Informe o id do imóvel."]}, status=status.HTTP_400_BAD_REQUEST)
+            imovel = get_object_or_404(Imovel.objects.only('id', 'endereco', 'tipo_imovel'), pk=pk)
+            return Response(linha_do_tempo(imovel, inicio, fim))
+
+        tipo_imovel = request.query_params.get('tipo_imovel') or None
+        if tipo_imovel and tipo_imovel not in dict(Imovel.TIPO_IMOVEL_CHOICES):
+            return Response({'tipo_imovel': [f"Tipo inválido: {tipo_imovel}."]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(ocupacao_da_carteira(inicio, fim, tipo_imovel=tipo_imovel))
+
+
+# --- 15. ARQUIVOS ---
+class EnvioArquivoView(APIView):
+    """
+    Inicia um upload em partes (core/arquivos.py).
+    POST {"nome": "contrato.pdf", "tamanho": 1048576, "tipo_conteudo": "application/pdf"}
+    """
+    def post(self, request, *args, **kwargs):
+        dados = request.data if isinstance(request.data, dict) else {}
+        try:
+            envio = iniciar_envio(dados.get('nome'), dados.get('tamanho'), dados.get('tipo_conteudo'))
+        except ValueError as erro:
+            return Response({'detail': str(erro)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(dados_do_envio(envio), status=status.HTTP_201_CREATED)
+
+
+class EnvioArquivoDetalheView(APIView):
+    """
+    Um upload em andamento.
+    GET    quanto já foi recebido (para retomar depois de uma falha);
+    PUT    uma parte, com o corpo cru e 'Content-Range: bytes início-fim/tamanho';
+    DELETE cancela o envio.
+    """
+    def _envio(self, chave):
+        return get_object_or_404(EnvioArquivo.objects.select_related('arquivo'), chave=chave)
+
+    def get(self, request, chave, *args, **kwargs):
+        return Response(dados_do_envio(self._envio(chave)))
+
+    def put(self, request, chave, *args, **kwargs):
+        envio = self._envio(chave)
+        try:
+            tamanho_corpo = int(request.META.get('CONTENT_LENGTH') or 0)
+            inicio, quantidade = interpretar_content_range(request.headers.get('Content-Range'), envio, tamanho_corpo)
+            # O corpo é lido direto do fluxo da requisição, em blocos (sem request.data).
+            envio = receber_parte(envio, inicio, quantidade, request.stream)
+        except ValueError as erro:
+            return Response({'detail': str(erro)}, status=status.HTTP_400_BAD_REQUEST)
+        except ConflitoEnvio as erro:
+            return Response({'detail': str(erro), **dados_do_envio(erro.envio)}, status=status.HTTP_409_CONFLICT)
+        concluido = envio.status == 'Concluído'
+        return Response(dados_do_envio(envio), status=status.HTTP_201_CREATED if concluido else status.HTTP_200_OK)
+
+    def delete(self, request, chave, *args, **kwargs):
+        envio = self._envio(chave)
+        if envio.status == 'Concluído':
+            return Response({'detail': 'O envio já foi concluído.'}, status=status.HTTP_409_CONFLICT)
+        cancelar_envio(envio)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ArquivoView(APIView):
+    """Dados de um arquivo armazenado (nome, hash, tamanho e URL do conteúdo)."""
+    def get(self, request, pk, *args, **kwargs):
+        return Response(dados_do_arquivo(get_object_or_404(Arquivo, pk=pk)))
+
+
+class ArquivoConteudoView(APIView):
+    """
+    Download do conteúdo, em streaming, com suporte a 'Range'.
+    ?download=1 pede para o navegador salvar em vez de abrir.
+    """
+    content_negotiation_class = SemNegociacao
+
+    def get(self, request, pk, *args, **kwargs):
+        arquivo = get_object_or_404(Arquivo, pk=pk)
+        return resposta_download(request, arquivo, anexo='download' in request.query_params)
+
+
+# --- 16. FOTOS DOS IMÓVEIS ---
+class FotoImovelView(APIView):
+    """
+    Uma foto de imóvel (core/fotos.py).
+    GET    dados e URLs das variantes;
+    PATCH  {"legenda": "...", "ordem": 0};
+    DELETE exclui a foto.
+    """
+    def _foto(self, pk):
+        return get_object_or_404(FotoImovel.objects.select_related('arquivo'), pk=pk)
+
+    def get(self, request, pk, *args, **kwargs):
+        return Response(dados_da_foto(self._foto(pk)))
+
+    def patch(self, request, pk, *args, **kwargs):
+        foto = self._foto(pk)
+        try:
+            atualizar_foto(foto, request.data if isinstance(request.data, dict) else {})
+        except ValueError as erro:
+            return Response({'detail': str(erro)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(dados_da_foto(foto))
+
+    def delete(self, request, pk, *args, **kwargs):
+        excluir_foto(self._foto(pk))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ImagemView(APIView):
+    """
+    Variante de uma foto (miniatura ou versão web). A URL muda junto com o
+    conteúdo, então a resposta pode ficar em cache para sempre.
+    """
+    content_negotiation_class = SemNegociacao
+
+    def get(self, request, sha256, nome, *args, **kwargs):
+        resposta = resposta_variante(request, sha256, nome)
+        if resposta is None:
+            raise Http404
+        return resposta